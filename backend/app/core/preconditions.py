@@ -0,0 +1,29 @@
+from typing import Optional
+from fastapi import Header, HTTPException, status
+
+
+def version_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def if_match_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    # The ETag handed out for a row is its version. No header (or "*") keeps
+    # the old unconditional write. W/ is tolerated because proxies that
+    # compress responses weaken the tags they pass through.
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip().removeprefix("W/")
+    if len(tag) < 3 or tag[0] != '"' or tag[-1] != '"' or not tag[1:-1].isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="If-Match must be a single ETag returned by this API",
+        )
+    return int(tag[1:-1])
+
+
+def conflict(what: str, version: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{what} was changed by someone else; reload it and try again",
+        headers={"ETag": version_etag(version)},
+    )
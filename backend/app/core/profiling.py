@@ -0,0 +1,167 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    from pyinstrument import Profiler, renderers
+    from pyinstrument.session import Session as ProfileSession
+except ImportError:  # optional: pip install pyinstrument
+    Profiler = None
+
+# The active rule and the captured profiles live in a directory shared by
+# every worker process, so a rule set through one worker applies to all of
+# them and any worker can serve the downloads.
+RULE_FILE = "rule.json"
+RULE_CHECK_SECONDS = 1.0
+
+FORMATS = {
+    "speedscope": ("application/json", "json"),
+    "html": ("text/html; charset=utf-8", "html"),
+    "text": ("text/plain; charset=utf-8", "txt"),
+}
+
+
+class ProfileStore:
+    def __init__(self, directory: str, keep: int):
+        self.directory = Path(directory)
+        self.keep = keep
+        self._ids = itertools.count()
+
+    def set_rule(self, rule: Optional[dict]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / RULE_FILE
+        if rule is None:
+            path.unlink(missing_ok=True)
+            return
+        # Written under a temporary name and renamed, so no worker reads half a rule.
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(rule))
+        tmp.replace(path)
+
+    def rule(self) -> Optional[dict]:
+        try:
+            rule = json.loads((self.directory / RULE_FILE).read_text())
+        except FileNotFoundError:
+            return None
+        return rule if rule["until"] > time.time() else None
+
+    def save(self, session, meta: dict) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{int(time.time() * 1000)}-{os.getpid()}-{next(self._ids)}"
+        session.save(self.directory / f"{profile_id}.pyisession")
+        (self.directory / f"{profile_id}.json").write_text(json.dumps({"id": profile_id, **meta}))
+        for old in self._metas()[self.keep:]:
+            self.delete(old.stem)
+        return profile_id
+
+    def _metas(self) -> list[Path]:
+        # Ids start with the capture time in ms: newest first.
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            (p for p in self.directory.glob("*.json") if p.name != RULE_FILE),
+            key=lambda p: [int(part) for part in p.stem.split("-")],
+            reverse=True,
+        )
+
+    def profiles(self) -> list[dict]:
+        profiles = []
+        for path in self._metas():
+            try:
+                profiles.append(json.loads(path.read_text()))
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue  # pruned or being written by another worker
+        return profiles
+
+    def render(self, profile_id: str, fmt: str) -> Optional[str]:
+        path = self.directory / f"{profile_id}.pyisession"
+        if not re.fullmatch(r"\d+-\d+-\d+", profile_id) or not path.is_file():
+            return None
+        session = ProfileSession.load(path)
+        if fmt == "speedscope":
+            return renderers.SpeedscopeRenderer().render(session)
+        if fmt == "html":
+            return renderers.HTMLRenderer().render(session)
+        return renderers.ConsoleRenderer(unicode=True, color=False, show_all=False).render(session)
+
+    def delete(self, profile_id: str) -> None:
+        for suffix in (".json", ".pyisession"):
+            (self.directory / f"{profile_id}{suffix}").unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    # Samples the requests the admin-set rule selects. With no rule active
+    # a request costs one clock comparison; the rule file is re-read at most
+    # once per RULE_CHECK_SECONDS.
+    def __init__(self, app: ASGIApp, store: ProfileStore):
+        self.app = app
+        self.store = store
+        self._rule: Optional[dict] = None
+        self._pattern: Optional[re.Pattern] = None
+        self._next_check = 0.0
+
+    def _refresh(self, now: float) -> None:
+        self._next_check = now + RULE_CHECK_SECONDS
+        rule = self.store.rule()
+        if rule != self._rule:
+            self._rule = rule
+            self._pattern = re.compile(rule["pattern"]) if rule and rule["pattern"] else None
+
+    def _selects(self, scope: Scope) -> bool:
+        rule = self._rule
+        if rule is None or rule["until"] <= time.time():
+            return False
+        if rule["method"] and scope["method"] != rule["method"]:
+            return False
+        if self._pattern and not self._pattern.search(scope["path"]):
+            return False
+        return rule["sample_rate"] >= 1 or random.random() < rule["sample_rate"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._refresh(now)
+            if self._rule is not None and self._selects(scope):
+                await self._profile(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profiler = Profiler(interval=self._rule["interval_ms"] / 1000, async_mode="enabled")
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session = profiler.stop()
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "captured_at": datetime.now(timezone.utc).isoformat(),
+            }
+            await asyncio.to_thread(self.store.save, session, meta)
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_KEEP)
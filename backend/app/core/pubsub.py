@@ -0,0 +1,198 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", course_id: Optional[int], maxsize: int):
+        self.broker = broker
+        self.course_id = course_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def wants(self, payload: dict) -> bool:
+        return self.course_id is None or payload.get("course_id") == self.course_id
+
+    def _put(self, payload: dict) -> None:
+        # Runs on the subscriber's loop. A consumer too slow to keep up is
+        # cut off; the client reconnects and reloads instead of drifting.
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait({"type": "reset"})
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscriptions: set[Subscription] = set()
+        self._listeners: list = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, course_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(self, course_id, self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def add_listener(self, listener) -> None:
+        # Listeners run synchronously on whichever thread dispatches, so they
+        # must be quick and must not block on I/O.
+        self._listeners.append(listener)
+
+    def dispatch(self, payload: dict) -> None:
+        # Safe from any thread: each subscriber's queue is only touched on
+        # its own event loop.
+        for listener in self._listeners:
+            try:
+                listener(payload)
+            except Exception:
+                logger.exception("Event listener failed")
+        with self._lock:
+            targets = [s for s in self._subscriptions if s.wants(payload)]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, payload)
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+
+class LocalBackend:
+    def __init__(self, broker: EventBroker):
+        self.broker = broker
+
+    def publish(self, payload: dict) -> None:
+        self.broker.dispatch(payload)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class PostgresBackend:
+    # Every API process LISTENs on one channel and NOTIFY fans events out to
+    # all of them, including the one that published.
+    def __init__(self, broker: EventBroker, url: str, channel: str):
+        import psycopg2
+
+        self._psycopg2 = psycopg2
+        self.broker = broker
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self._publisher = None
+        self._publish_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _connect(self):
+        conn = self._psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        return conn
+
+    def publish(self, payload: dict) -> None:
+        message = json.dumps(payload, default=str)
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None or self._publisher.closed:
+                        self._publisher = self._connect()
+                    with self._publisher.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, message))
+                    return
+                except self._psycopg2.Error:
+                    self._publisher = None
+                    if attempt:
+                        logger.exception("Could not publish event")
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], 5)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            note = conn.notifies.pop(0)
+                            self.broker.dispatch(json.loads(note.payload))
+                conn.close()
+            except self._psycopg2.Error:
+                logger.exception("Event listener lost its connection; reconnecting")
+                time.sleep(1)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._listen, name="event-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+broker = EventBroker(settings.SSE_QUEUE_SIZE)
+backend = (
+    PostgresBackend(broker, settings.DATABASE_URL, settings.EVENTS_CHANNEL)
+    if settings.EVENTS_BACKEND == "postgres"
+    else LocalBackend(broker)
+)
+
+
+def queue_event(db: Session, event_type: str, **data) -> None:
+    # Published only once the session commits; dropped on rollback.
+    db.info.setdefault("pending_events", []).append({
+        "type": event_type,
+        "occurred_at": datetime.now(timezone.utc).isoformat(),
+        **data,
+    })
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for payload in session.info.pop("pending_events", ()):
+        backend.publish(payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop("pending_events", None)
+
+
+async def event_stream(subscription: Subscription, heartbeat: float):
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {payload['type']}\ndata: {json.dumps(payload, default=str)}\n\n"
+            if payload["type"] == "reset":
+                return
+    finally:
+        subscription.close()
@@ -0,0 +1,153 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from fastapi import HTTPException, Request, status
+from app.core.config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    # "20/minute" -> bucket of 20 tokens refilled at 20 per 60 seconds.
+    count, _, period = rate.partition("/")
+    capacity = int(count)
+    seconds = PERIODS[period.strip().rstrip("s")]
+    return capacity, capacity / seconds
+
+
+class InMemoryBackend:
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_rate: float, cost: float = 1) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            if tokens >= cost:
+                tokens -= cost
+                allowed, retry_after = True, 0.0
+            else:
+                allowed, retry_after = False, (cost - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBackend:
+    # Same bucket arithmetic as InMemoryBackend, run atomically in Redis so
+    # every worker and host shares one budget per key.
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    local allowed = 0
+    local retry = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    else
+        retry = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+    return {allowed, tostring(retry)}
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis  # optional: pip install redis
+
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self._script = self.client.register_script(self.SCRIPT)
+
+    def consume(self, key: str, capacity: int, refill_rate: float, cost: float = 1) -> tuple[bool, float]:
+        allowed, retry_after = self._script(
+            keys=[self.prefix + key], args=[capacity, refill_rate, cost]
+        )
+        return bool(allowed), float(retry_after)
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            _backend = RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+        else:
+            _backend = InMemoryBackend()
+    return _backend
+
+
+def set_backend(backend) -> None:
+    global _backend
+    _backend = backend
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    def __init__(self, scope: str, per_ip: Optional[str] = None, per_email: Optional[str] = None):
+        self.scope = scope
+        self.per_ip = parse_rate(per_ip) if per_ip else None
+        self.per_email = parse_rate(per_email) if per_email else None
+
+    async def _email(self, request: Request) -> Optional[str]:
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        email = body.get("email_id") if isinstance(body, dict) else None
+        return email.strip().lower() if isinstance(email, str) else None
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        backend = get_backend()
+        checks = []
+        if self.per_ip:
+            checks.append((f"{self.scope}:ip:{client_ip(request)}", self.per_ip))
+        if self.per_email:
+            email = await self._email(request)
+            if email:
+                checks.append((f"{self.scope}:email:{email}", self.per_email))
+
+        for key, (capacity, refill_rate) in checks:
+            allowed, retry_after = backend.consume(key, capacity, refill_rate)
+            if not allowed:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many attempts. Try again later.",
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+
+
+login_rate_limit = RateLimiter(
+    "login",
+    per_ip=settings.LOGIN_RATE_LIMIT_PER_IP,
+    per_email=settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+)
+signup_rate_limit = RateLimiter("signup", per_ip=settings.SIGNUP_RATE_LIMIT_PER_IP)
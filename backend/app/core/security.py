@@ -1,16 +1,20 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(
+        password.encode("utf-8"), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    ).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -19,6 +23,25 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     )
 
 
+def hash_rounds(hashed_password: str) -> int:
+    # "$2b$12$<salt+digest>" -> 12
+    return int(hashed_password.split("$")[2])
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    return hash_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+
+@lru_cache(maxsize=None)
+def _dummy_hash(rounds: int) -> str:
+    return bcrypt.hashpw(b"dummy-password", bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def dummy_verify(plain_password: str) -> None:
+    # Same work as checking a real hash, so unknown emails cost the same time.
+    verify_password(plain_password, _dummy_hash(settings.BCRYPT_ROUNDS))
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
@@ -57,6 +80,30 @@ def require_role(*allowed_roles: str):
     return role_checker
 
 
+def require_stream_role(*allowed_roles: str):
+    # EventSource cannot send headers, so event streams also accept the
+    # access token as ?access_token=.
+    async def role_checker(
+        header_token: Optional[str] = Depends(optional_oauth2_scheme),
+        access_token: Optional[str] = Query(None),
+    ) -> dict:
+        token = header_token or access_token
+        if not token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        current_user = decode_access_token(token)
+        if current_user.get("role") not in allowed_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Access denied. Required role(s): {', '.join(allowed_roles)}",
+            )
+        return current_user
+    return role_checker
+
+
 require_student = require_role("student")
 require_instructor = require_role("instructor")
 require_analyst = require_role("analyst")
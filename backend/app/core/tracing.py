@@ -0,0 +1,330 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Spans follow the OpenTelemetry data model and are exported as OTLP/JSON,
+# so any OpenTelemetry collector, Jaeger or Tempo can read them. Context
+# crosses process boundaries as W3C trace context (`traceparent`).
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+UNSET, OK, ERROR = 0, 1, 2
+TRACEPARENT = re.compile(r"00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+MAX_STATEMENT_LENGTH = 2000
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "end", "attributes", "status", "message")
+
+    def __init__(self, name: str, kind: int, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end = 0
+        self.attributes = attributes
+        self.status = UNSET
+        self.message = ""
+
+    def fail(self, exc: BaseException) -> None:
+        self.attributes["exception.type"] = type(exc).__name__
+        # A 4xx raised by a service is the caller's mistake, not a failure.
+        if not (isinstance(exc, HTTPException) and exc.status_code < 500):
+            self.status = ERROR
+            self.message = str(exc)[:200]
+
+    def finish(self) -> None:
+        self.end = time.time_ns()
+        exporter.add(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": _attributes(self.attributes),
+            "status": {"code": self.status, "message": self.message} if self.status else {},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _attributes(values: dict) -> list[dict]:
+    attributes = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        attributes.append({"key": key, "value": typed})
+    return attributes
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(name: str, kind: int = INTERNAL, **attributes) -> Optional[Span]:
+    # Only inside a sampled trace; work outside a request is not traced.
+    parent = _current.get()
+    if parent is None:
+        return None
+    return Span(name, kind, parent.trace_id, parent.span_id, attributes)
+
+
+def traced(name: str):
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                span = start_span(name)
+                if span is None:
+                    return await fn(*args, **kwargs)
+                token = _current.set(span)
+                try:
+                    return await fn(*args, **kwargs)
+                except BaseException as exc:
+                    span.fail(exc)
+                    raise
+                finally:
+                    _current.reset(token)
+                    span.finish()
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            span = start_span(name)
+            if span is None:
+                return fn(*args, **kwargs)
+            token = _current.set(span)
+            try:
+                return fn(*args, **kwargs)
+            except BaseException as exc:
+                span.fail(exc)
+                raise
+            finally:
+                _current.reset(token)
+                span.finish()
+        return wrapper
+    return decorate
+
+
+def trace_module(module_name: str) -> None:
+    # Called at the bottom of each app/services module: wraps every public
+    # function defined there, so calls from routers and from other services
+    # (which import them afterwards) become spans. With tracing off nothing
+    # is wrapped and the functions cost exactly what they did before.
+    if not settings.TRACING_ENABLED:
+        return
+    module = sys.modules[module_name]
+    prefix = module_name.rsplit(".", 1)[-1]
+    for name, fn in list(vars(module).items()):
+        if name.startswith("_") or not inspect.isfunction(fn) or fn.__module__ != module_name:
+            continue
+        if inspect.isgeneratorfunction(fn) or inspect.isasyncgenfunction(fn):
+            continue
+        setattr(module, name, traced(f"{prefix}.{name}")(fn))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = start_span(
+        statement.split(None, 1)[0].upper() if statement else "SQL",
+        CLIENT,
+        **{"db.system": conn.dialect.name, "db.statement": statement[:MAX_STATEMENT_LENGTH]},
+    )
+    if span is not None:
+        context._trace_span = span
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.attributes["db.rows"] = cursor.rowcount
+        context._trace_span = None
+        span.finish()
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.fail(exception_context.original_exception)
+        exception_context.execution_context._trace_span = None
+        span.finish()
+
+
+def instrument_sql() -> None:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+class TracingMiddleware:
+    # One SERVER span per request, named after the matched route, continuing
+    # the caller's trace when a sampled `traceparent` header is sent.
+    def __init__(self, app: ASGIApp, sample_rate: float, exclude: tuple[str, ...] = ("/health/",)):
+        self.app = app
+        self.sample_rate = sample_rate
+        # Probe traffic would otherwise fill the traces.
+        self.exclude = exclude
+
+    def _root(self, scope: Scope) -> Optional[Span]:
+        if scope["path"].startswith(self.exclude):
+            return None
+        parent_id = None
+        header = dict(scope["headers"]).get(b"traceparent")
+        match = TRACEPARENT.fullmatch(header.decode("latin-1").strip()) if header else None
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            if not int(flags, 16) & 1:
+                return None
+        elif random.random() < self.sample_rate:
+            trace_id = os.urandom(16).hex()
+        else:
+            return None
+        return Span(
+            f"{scope['method']} {scope['path']}",
+            SERVER,
+            trace_id,
+            parent_id,
+            {"http.request.method": scope["method"], "url.path": scope["path"]},
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        span = self._root(scope) if scope["type"] == "http" else None
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.attributes["http.response.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    span.status = ERROR
+                headers = MutableHeaders(scope=message)
+                headers["traceresponse"] = f"00-{span.trace_id}-{span.span_id}-01"
+            await send(message)
+
+        token = _current.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            span.fail(exc)
+            raise
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{scope['method']} {route.path}"
+                span.attributes["http.route"] = route.path
+            endpoint = scope.get("endpoint")
+            if endpoint is not None:
+                span.attributes["code.function"] = f"{endpoint.__module__}.{endpoint.__qualname__}"
+            span.finish()
+
+
+class SpanExporter:
+    # Finished spans are queued and shipped in batches from one background
+    # thread, so a request never waits on the file or the collector. When
+    # the queue is full new spans are dropped and counted.
+    def __init__(self, max_queue: int, interval: float):
+        self.interval = interval
+        self._queue: deque = deque()
+        self._max_queue = max_queue
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.Client] = None
+
+    def add(self, span: Span) -> None:
+        if len(self._queue) >= self._max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+
+    def _payload(self, spans: list) -> dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": _attributes({
+                "service.name": settings.TRACING_SERVICE_NAME,
+                "process.pid": os.getpid(),
+            })},
+            "scopeSpans": [{"scope": {"name": "app"}, "spans": [s.to_otlp() for s in spans]}],
+        }]}
+
+    def flush(self) -> int:
+        spans = []
+        while self._queue:
+            spans.append(self._queue.popleft())
+        if not spans:
+            return 0
+        body = json.dumps(self._payload(spans), separators=(",", ":"))
+        try:
+            if settings.TRACING_EXPORTER == "otlp":
+                if self._client is None:
+                    self._client = httpx.Client(timeout=10)
+                self._client.post(
+                    settings.TRACING_OTLP_ENDPOINT,
+                    content=body,
+                    headers={"Content-Type": "application/json"},
+                ).raise_for_status()
+            else:
+                path = Path(settings.TRACING_FILE)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # One write per batch, so batches from several workers
+                # appending to the same file do not interleave.
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(body + "\n")
+        except (OSError, httpx.HTTPError):
+            logger.exception("Could not export %d spans", len(spans))
+        return len(spans)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+        self.flush()
+
+
+exporter = SpanExporter(settings.TRACING_MAX_QUEUE, settings.TRACING_EXPORT_SECONDS)
@@ -1,17 +1,168 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import itertools
+import sqlite3
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+
+def engine_options(url: str) -> dict:
+    options = {"query_cache_size": settings.DB_QUERY_CACHE_SIZE}
+    if make_url(url).drivername == "postgresql+psycopg":
+        # psycopg 3 switches a statement to a server-side prepared statement
+        # once a connection has run it this many times. psycopg2 has no
+        # equivalent, so this only applies to postgresql+psycopg:// URLs.
+        threshold = settings.DB_PREPARE_THRESHOLD if settings.DB_SERVER_SIDE_PREPARE else None
+        options["connect_args"] = {"prepare_threshold": threshold}
+    if settings.DB_CONNECTION_BUDGET and make_url(url).get_backend_name() != "sqlite":
+        # Every worker process gets an equal share and no overflow, so the
+        # workers together never open more than the budget.
+        options["pool_size"] = max(settings.DB_CONNECTION_BUDGET // settings.worker_count, 1)
+        options["max_overflow"] = 0
+    if make_url(url).get_backend_name() == "postgresql" and settings.ENROLLMENT_PARTITIONS:
+        # Lets GROUP BY course_id aggregates run per partition.
+        connect_args = options.setdefault("connect_args", {})
+        connect_args["options"] = "-c enable_partitionwise_aggregate=on"
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores ON DELETE actions unless this is set on every connection.
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+class ReplicaRouter:
+    def __init__(self, urls: list[str], primary: Engine, retry_after: float = 30.0):
+        self.primary = primary
+        self.replicas = [
+            create_engine(url, pool_pre_ping=True, **engine_options(url)) for url in urls
+        ]
+        self.retry_after = retry_after
+        self._down_until = [0.0] * len(self.replicas)
+        self._cursor = itertools.count()
+        self._lock = threading.Lock()
+
+    def mark_down(self, index: int) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_after
+
+    def is_healthy(self, index: int) -> bool:
+        return self._down_until[index] <= time.monotonic()
+
+    def candidates(self) -> list[int]:
+        # Round-robin start, then every other replica in order, so one bad
+        # replica costs a single failed connect before falling through.
+        n = len(self.replicas)
+        if n == 0:
+            return []
+        start = next(self._cursor) % n
+        order = [(start + i) % n for i in range(n)]
+        return [i for i in order if self.is_healthy(i)]
+
+    def connect(self):
+        for index in self.candidates():
+            try:
+                return self.replicas[index].connect()
+            except DBAPIError:
+                self.mark_down(index)
+        return self.primary.connect()
+
+
+replicas = ReplicaRouter(
+    settings.database_replica_urls_list,
+    engine,
+    retry_after=settings.REPLICA_HEALTH_CHECK_SECONDS,
+)
+
+
+def _reject_writes(session, flush_context, instances):
+    raise RuntimeError("Attempted to write through a read-only replica session")
+
+
+def open_read_session(router: Optional[ReplicaRouter] = None) -> Session:
+    router = router or replicas
+    conn = router.connect()
+    db = Session(bind=conn, autoflush=False)
+    db.info["read_only"] = True
+    db.info["connection"] = conn
+    event.listen(db, "before_flush", _reject_writes)
+    return db
+
+
+def close_read_session(db: Session) -> None:
+    try:
+        db.close()
+    finally:
+        db.info["connection"].close()
+
+
+def try_transaction_lock(db: Session, name: str) -> bool:
+    # A PostgreSQL advisory lock held until the transaction ends, for work only
+    # one worker should do at a time. Elsewhere there is nothing to take and
+    # this returns True; callers must still be correct when they overlap.
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return db.scalar(text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": name})
+
+
+def after_commit(db: Session, callback) -> None:
+    # Side effects outside the database (files, caches) that must only happen
+    # once the request's transaction is durable.
+    db.info.setdefault("after_commit", []).append(callback)
+
+
+def after_rollback(db: Session, callback) -> None:
+    db.info.setdefault("after_rollback", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    session.info.pop("after_rollback", None)
+    for callback in session.info.pop("after_commit", ()):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _run_after_rollback(session: Session) -> None:
+    session.info.pop("after_commit", None)
+    for callback in session.info.pop("after_rollback", ()):
+        callback()
+
+
 def get_db():
+    # One transaction per request. Services flush as they go and never commit;
+    # the commit happens here once the handler and response serialization are
+    # done. Depend on it with scope="function" so that is before the response
+    # is sent, not after.
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
     finally:
         db.close()
+
+
+def get_read_db():
+    # For read-only routes that can tolerate replica lag. Anything that must
+    # see the caller's own writes keeps using get_db.
+    db = open_read_session()
+    try:
+        yield db
+    finally:
+        close_read_session(db)
@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.profiling import Profiler, ProfilingMiddleware, profile_store
+from app.core.tracing import TracingMiddleware, exporter, instrument_sql
 from app.database import engine, Base, SessionLocal
-from app.routers import auth, students, instructors, courses, content, admin, analyst
+from app.migrations import run_migrations
+from app.routers import auth, students, instructors, courses, content, admin, analyst, health
 
 import app.models
 
@@ -20,6 +24,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.compression_encodings_list,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        levels=settings.compression_levels,
+    )
+
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware, sample_rate=settings.TRACING_SAMPLE_RATE)
+    instrument_sql()
+
+if settings.PROFILING_ENABLED and Profiler is not None:
+    # Added last so it is outermost and profiles the other middleware too.
+    app.add_middleware(ProfilingMiddleware, store=profile_store)
+
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(students.router, prefix="/api/students", tags=["Students"])
 app.include_router(instructors.router, prefix="/api/instructors", tags=["Instructors"])
@@ -27,12 +47,30 @@ app.include_router(courses.router, prefix="/api/courses", tags=["Courses"])
 app.include_router(content.router, prefix="/api/content", tags=["Content"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 app.include_router(analyst.router, prefix="/api/analyst", tags=["Analyst"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
 
 
-@app.on_event("startup")
-def on_startup():
+def prepare_database():
+    # Once per deploy, not once per worker: main.py runs this before
+    # starting workers, which would otherwise race on the migrations.
+    from app.services.job_service import purge_expired_jobs
+
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     _seed_admin()
+    _purge_expired_sessions()
+    db = SessionLocal()
+    try:
+        purge_expired_jobs(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def on_startup():
+    if settings.PREPARE_DATABASE_ON_STARTUP:
+        prepare_database()
 
 
 def _seed_admin():
@@ -54,6 +92,70 @@ def _seed_admin():
         db.close()
 
 
+@app.on_event("startup")
+async def start_job_runner():
+    from app.services.job_service import runner
+
+    runner.start()
+
+
+@app.on_event("startup")
+def start_event_backend():
+    from app.core.pubsub import backend
+
+    backend.start()
+
+
+# The link checker and purger start in every worker. They coordinate through
+# the database (a claim UPDATE, an advisory lock), like the job runner does.
+@app.on_event("startup")
+async def start_link_checker():
+    from app.services.link_checker import link_checker
+
+    if settings.LINK_CHECK_ENABLED:
+        link_checker.start()
+
+
+@app.on_event("startup")
+async def start_purger():
+    from app.services.purge_service import purger
+
+    if settings.PURGE_ENABLED:
+        purger.start()
+
+
+@app.on_event("startup")
+async def start_span_exporter():
+    if settings.TRACING_ENABLED:
+        exporter.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_work():
+    from app.core.pubsub import backend
+    from app.services.job_service import runner
+    from app.services.link_checker import link_checker
+    from app.services.purge_service import purger
+
+    backend.stop()
+    await runner.stop()
+    await link_checker.stop()
+    await purger.stop()
+    if settings.TRACING_ENABLED:
+        await exporter.stop()
+
+
+def _purge_expired_sessions():
+    from app.services.session_service import purge_expired_sessions
+
+    db = SessionLocal()
+    try:
+        purge_expired_sessions(db)
+        db.commit()
+    finally:
+        db.close()
+
+
 @app.get("/", tags=["Root"])
 async def root():
     return {"message": "Quintet DBMS API is running"}
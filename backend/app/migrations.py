@@ -0,0 +1,219 @@
+from datetime import datetime, timezone
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import Base
+from app.models.schema_migration import SchemaMigration
+
+# create_all() only creates missing tables. Columns and indexes added to
+# existing tables after the first deploy are applied here, in order, once per
+# database. Every step must be idempotent because a fresh database already
+# has the current schema from create_all().
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {ddl}"))
+
+
+def _create_indexes(conn: Connection, table: str) -> None:
+    for index in Base.metadata.tables[table].indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _0001_grading_policies(conn: Connection) -> None:
+    from app.services.grading_service import ensure_default_policy, refresh_passed_flags
+
+    _add_column(conn, "enrollments", "passed", "passed BOOLEAN NOT NULL DEFAULT FALSE")
+    _create_indexes(conn, "enrollments")
+    db = Session(bind=conn)
+    ensure_default_policy(db)
+    refresh_passed_flags(db)
+    db.flush()
+
+
+def _0002_enrollment_timestamps(conn: Connection) -> None:
+    _add_column(conn, "enrollments", "enrolled_at", "enrolled_at TIMESTAMP WITH TIME ZONE")
+
+
+def _0003_foreign_key_actions(conn: Connection) -> None:
+    # ON DELETE cannot be altered in place, so constraints whose action differs
+    # from the model are dropped and re-added. SQLite cannot alter constraints
+    # at all; SQLite databases created before this keep their old FKs.
+    if conn.dialect.name != "postgresql":
+        return
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = inspector.get_foreign_keys(table.name)
+        for fk in table.foreign_key_constraints:
+            if fk.ondelete is None:
+                continue
+            columns = [c.name for c in fk.columns]
+            current = next((e for e in existing if e["constrained_columns"] == columns), None)
+            if current and (current["options"].get("ondelete") or "").upper() == fk.ondelete:
+                continue
+            name = current["name"] if current else f"{table.name}_{'_'.join(columns)}_fkey"
+            referred = fk.elements[0].column.table.name
+            referred_columns = ", ".join(e.column.name for e in fk.elements)
+            drop = f'DROP CONSTRAINT "{name}", ' if current else ""
+            conn.execute(text(
+                f'ALTER TABLE {table.name} {drop}ADD CONSTRAINT "{name}" '
+                f"FOREIGN KEY ({', '.join(columns)}) REFERENCES {referred} ({referred_columns}) "
+                f"ON DELETE {fk.ondelete}"
+            ))
+
+
+def _0004_content_files_and_link_checks(conn: Connection) -> None:
+    for ddl in (
+        "file_path VARCHAR",
+        "file_name VARCHAR",
+        "file_size BIGINT",
+        "media_type VARCHAR",
+        "checksum VARCHAR(64)",
+        "link_status INTEGER",
+        "link_checked_at TIMESTAMP WITH TIME ZONE",
+    ):
+        _add_column(conn, "contents", ddl.split()[0], ddl)
+    _create_indexes(conn, "contents")
+
+
+def count_seats_taken(conn: Connection) -> None:
+    # Sets seats_taken from the enrollments; also used by seed.py, whose
+    # enrollments are inserted after the migrations ran.
+    conn.execute(text(
+        "UPDATE courses SET seats_taken = "
+        "(SELECT COUNT(*) FROM enrollments WHERE enrollments.course_id = courses.course_id)"
+    ))
+
+
+def _0005_course_capacity(conn: Connection) -> None:
+    _add_column(conn, "courses", "capacity", "capacity INTEGER")
+    _add_column(conn, "courses", "seats_taken", "seats_taken INTEGER NOT NULL DEFAULT 0")
+    count_seats_taken(conn)
+
+
+def _0006_row_versions(conn: Connection) -> None:
+    _add_column(conn, "courses", "version", "version INTEGER NOT NULL DEFAULT 1")
+    _add_column(conn, "enrollments", "version", "version INTEGER NOT NULL DEFAULT 1")
+
+
+def _0007_soft_delete(conn: Connection) -> None:
+    for table in ("students", "instructors", "courses"):
+        _add_column(conn, table, "deleted_at", "deleted_at TIMESTAMP WITH TIME ZONE")
+        _create_indexes(conn, table)
+
+
+def enrollment_partitions(conn: Connection) -> int:
+    # Number of hash partitions under enrollments; 0 for a plain table.
+    return conn.execute(text(
+        "SELECT count(i.inhrelid) FROM pg_class c LEFT JOIN pg_inherits i ON i.inhparent = c.oid "
+        "WHERE c.oid = to_regclass('enrollments') AND c.relkind = 'p'"
+    )).scalar()
+
+
+def partition_enrollments(conn: Connection, partitions: int) -> None:
+    # Rebuilds enrollments as `partitions` hash partitions on course_id (0 for
+    # a plain table) and copies the rows across. The table is locked for the
+    # copy. Nothing references enrollments, so only its own primary key,
+    # indexes and foreign keys need recreating.
+    if conn.dialect.name != "postgresql" or enrollment_partitions(conn) == partitions:
+        return
+    table = Base.metadata.tables["enrollments"]
+    inspector = inspect(conn)
+    pk = inspector.get_pk_constraint("enrollments")["name"]
+    indexes = [i["name"] for i in inspector.get_indexes("enrollments")]
+    conn.execute(text("ALTER TABLE enrollments RENAME TO enrollments_old"))
+    conn.execute(text(f'ALTER TABLE enrollments_old DROP CONSTRAINT "{pk}"'))
+    for name in indexes:
+        conn.execute(text(f'DROP INDEX "{name}"'))
+
+    partition_by = " PARTITION BY HASH (course_id)" if partitions else ""
+    conn.execute(text(f"CREATE TABLE enrollments (LIKE enrollments_old INCLUDING DEFAULTS){partition_by}"))
+    for remainder in range(partitions):
+        conn.execute(text(
+            f"CREATE TABLE enrollments_p{remainder}_of_{partitions} PARTITION OF enrollments "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        ))
+    conn.execute(text("INSERT INTO enrollments SELECT * FROM enrollments_old"))
+    conn.execute(text("DROP TABLE enrollments_old"))
+
+    primary_key = ", ".join(c.name for c in table.primary_key.columns)
+    conn.execute(text(f"ALTER TABLE enrollments ADD PRIMARY KEY ({primary_key})"))
+    for fk in table.foreign_key_constraints:
+        columns = [c.name for c in fk.columns]
+        name = f"enrollments_{'_'.join(columns)}_fkey"
+        referred = fk.elements[0].column
+        ondelete = f" ON DELETE {fk.ondelete}" if fk.ondelete else ""
+        conn.execute(text(
+            f'ALTER TABLE enrollments ADD CONSTRAINT "{name}" '
+            f"FOREIGN KEY ({', '.join(columns)}) REFERENCES {referred.table.name} ({referred.name}){ondelete}"
+        ))
+    _create_indexes(conn, "enrollments")
+    conn.execute(text("ANALYZE enrollments"))
+
+
+def _0008_partition_enrollments(conn: Connection) -> None:
+    # Off unless ENROLLMENT_PARTITIONS is set when this runs; to change it on
+    # a database that is already past this version, use partition_enrollments.py.
+    if settings.ENROLLMENT_PARTITIONS:
+        partition_enrollments(conn, settings.ENROLLMENT_PARTITIONS)
+
+
+def _0009_report_job_leases(conn: Connection) -> None:
+    _add_column(conn, "report_jobs", "heartbeat_at", "heartbeat_at TIMESTAMP WITH TIME ZONE")
+
+
+def _0010_backfill_enrollment_events(conn: Connection) -> None:
+    # Enrollments from before migration 2 had no events, so the trend
+    # counted them as never enrolled. Idempotent: only pairs without an
+    # "enrolled" event are added.
+    from app.services.trend_service import backfill_enrollment_events
+
+    db = Session(bind=conn)
+    backfill_enrollment_events(db)
+    db.flush()
+
+
+MIGRATIONS = [
+    (1, "grading policies and enrollments.passed", _0001_grading_policies),
+    (2, "enrollments.enrolled_at", _0002_enrollment_timestamps),
+    (3, "ON DELETE actions on foreign keys", _0003_foreign_key_actions),
+    (4, "content files and link checks", _0004_content_files_and_link_checks),
+    (5, "course capacity and seat counts", _0005_course_capacity),
+    (6, "row versions on courses and enrollments", _0006_row_versions),
+    (7, "soft delete for students, instructors and courses", _0007_soft_delete),
+    (8, "hash partitioning of enrollments", _0008_partition_enrollments),
+    (9, "report_jobs.heartbeat_at", _0009_report_job_leases),
+    (10, "enrollment events for enrollments that predate them", _0010_backfill_enrollment_events),
+]
+
+
+def current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table(SchemaMigration.__tablename__):
+        return 0
+    versions = conn.execute(select(SchemaMigration.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def run_migrations(engine: Engine) -> int:
+    SchemaMigration.__table__.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(SchemaMigration.version)).scalars())
+
+    for version, description, step in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(
+                SchemaMigration.__table__.insert().values(
+                    version=version,
+                    description=description,
+                    applied_at=datetime.now(timezone.utc),
+                )
+            )
+
+    with engine.connect() as conn:
+        return current_version(conn)
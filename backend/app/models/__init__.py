@@ -9,6 +9,12 @@ from app.models.content import Content
 from app.models.enrollment import Enrollment
 from app.models.course_topic import CourseTopic
 from app.models.textbook_used import TextbookUsed
+from app.models.grading_policy import GradingPolicy, GradeBand
+from app.models.schema_migration import SchemaMigration
+from app.models.enrollment_event import EnrollmentEvent, EnrollmentRollup
+from app.models.user_session import UserSession
+from app.models.report_job import ReportJob
+from app.models.waitlist import WaitlistEntry
 
 __all__ = [
     "User",
@@ -22,4 +28,12 @@ __all__ = [
     "Enrollment",
     "CourseTopic",
     "TextbookUsed",
+    "GradingPolicy",
+    "GradeBand",
+    "SchemaMigration",
+    "EnrollmentEvent",
+    "EnrollmentRollup",
+    "UserSession",
+    "ReportJob",
+    "WaitlistEntry",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -7,8 +7,20 @@ class Content(Base):
     __tablename__ = "contents"
 
     content_id = Column(Integer, primary_key=True, index=True)
-    course_id = Column(Integer, ForeignKey("courses.course_id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.course_id", ondelete="CASCADE"), nullable=False)
     type = Column(String, nullable=False)
     content_url = Column(String, nullable=False)
 
+    # Set for files uploaded to local storage; file_path is relative to
+    # CONTENT_STORAGE_DIR. External links leave these empty.
+    file_path = Column(String, nullable=True)
+    file_name = Column(String, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
+    media_type = Column(String, nullable=True)
+    checksum = Column(String(64), nullable=True)
+
+    # Last link check for external URLs: HTTP status, or 0 if unreachable.
+    link_status = Column(Integer, nullable=True)
+    link_checked_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
     course = relationship("Course", back_populates="contents")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -10,12 +10,37 @@ class Course(Base):
     course_name = Column(String, nullable=False)
     duration = Column(String, nullable=False)
     program_type = Column(String, nullable=False)
-    instructor_id = Column(Integer, ForeignKey("instructors.instructor_id"), nullable=True)
+    instructor_id = Column(Integer, ForeignKey("instructors.instructor_id", ondelete="SET NULL"), nullable=True)
     university_id = Column(Integer, ForeignKey("universities.university_id"), nullable=False)
+    # NULL capacity means unlimited. seats_taken is only changed by
+    # enroll_service with conditional UPDATEs, never read-modify-write.
+    capacity = Column(Integer, nullable=True)
+    seats_taken = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    # Bumped by every edit (not by seat counting) and sent as the ETag, so
+    # concurrent edits are caught with a conditional UPDATE instead of a lock.
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
+    # Soft delete; purge_service removes the dependents in batches later.
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     instructor = relationship("Instructor", back_populates="courses")
     university = relationship("University", back_populates="courses")
-    enrollments = relationship("Enrollment", back_populates="course")
-    contents = relationship("Content", back_populates="course")
-    course_topics = relationship("CourseTopic", back_populates="course")
-    textbooks_used = relationship("TextbookUsed", back_populates="course")
+    enrollments = relationship("Enrollment", back_populates="course", passive_deletes=True)
+    contents = relationship("Content", back_populates="course", passive_deletes=True)
+    course_topics = relationship("CourseTopic", back_populates="course", passive_deletes=True)
+    textbooks_used = relationship("TextbookUsed", back_populates="course", passive_deletes=True)
+    grading_policy = relationship("GradingPolicy", back_populates="course", uselist=False, passive_deletes=True)
+
+    __table_args__ = (
+        Index(
+            "ix_courses_live_instructor",
+            "instructor_id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_courses_deleted",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
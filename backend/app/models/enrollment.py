@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, ForeignKey, Index, false, func, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -6,9 +6,28 @@ from app.database import Base
 class Enrollment(Base):
     __tablename__ = "enrollments"
 
-    student_id = Column(Integer, ForeignKey("students.student_id"), primary_key=True)
-    course_id = Column(Integer, ForeignKey("courses.course_id"), primary_key=True)
+    student_id = Column(Integer, ForeignKey("students.student_id", ondelete="CASCADE"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.course_id", ondelete="CASCADE"), primary_key=True)
     evaluation_score = Column(Float, nullable=False)
+    # Denormalised result of the course's grading policy, kept in sync by
+    # grading_service so pass-rate aggregates can be answered from an index.
+    passed = Column(Boolean, nullable=False, default=False, server_default=false())
+    enrolled_at = Column(DateTime(timezone=True), nullable=True, server_default=func.now())
+    # Bumped on every grade; see Course.version.
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
 
     student = relationship("Student", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
+
+    __table_args__ = (
+        Index("ix_enrollments_course_passed", "course_id", "passed"),
+        Index(
+            "ix_enrollments_passed",
+            "course_id",
+            postgresql_where=text("passed"),
+            sqlite_where=text("passed"),
+        ),
+    )
+    # New rows get `passed` (set from a SQL expression) and server defaults
+    # back through RETURNING on the INSERT instead of a SELECT afterwards.
+    __mapper_args__ = {"eager_defaults": True}
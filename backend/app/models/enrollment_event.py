@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Index
+from app.database import Base
+
+
+class EnrollmentEvent(Base):
+    __tablename__ = "enrollment_events"
+
+    # Append-only history; no foreign keys so events outlive the student or
+    # course they describe.
+    event_id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, nullable=False)
+    course_id = Column(Integer, nullable=False)
+    event_type = Column(String, nullable=False)
+    score = Column(Float, nullable=True)
+    previous_score = Column(Float, nullable=True)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_enrollment_events_course_occurred", "course_id", "occurred_at"),
+        Index("ix_enrollment_events_student_occurred", "student_id", "occurred_at"),
+    )
+
+
+class EnrollmentRollup(Base):
+    __tablename__ = "enrollment_rollups"
+
+    granularity = Column(String, primary_key=True)
+    bucket_start = Column(Date, primary_key=True)
+    course_id = Column(Integer, primary_key=True)
+    enrollments = Column(Integer, nullable=False, default=0)
+    drops = Column(Integer, nullable=False, default=0)
+    grades = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        Index("ix_enrollment_rollups_course_bucket", "granularity", "course_id", "bucket_start"),
+    )
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index, text
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class GradingPolicy(Base):
+    __tablename__ = "grading_policies"
+
+    policy_id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.course_id", ondelete="CASCADE"), nullable=True, unique=True)
+    program_type = Column(String, nullable=True)
+    pass_threshold = Column(Float, nullable=False)
+
+    course = relationship("Course", back_populates="grading_policy")
+    bands = relationship(
+        "GradeBand",
+        back_populates="policy",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="GradeBand.min_score.desc()",
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_grading_policies_program_type",
+            "program_type",
+            unique=True,
+            postgresql_where=text("course_id IS NULL"),
+            sqlite_where=text("course_id IS NULL"),
+        ),
+    )
+
+
+class GradeBand(Base):
+    __tablename__ = "grade_bands"
+
+    band_id = Column(Integer, primary_key=True, index=True)
+    policy_id = Column(Integer, ForeignKey("grading_policies.policy_id", ondelete="CASCADE"), nullable=False, index=True)
+    letter = Column(String, nullable=False)
+    min_score = Column(Float, nullable=False)
+
+    policy = relationship("GradingPolicy", back_populates="bands")
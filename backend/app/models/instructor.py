@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -7,9 +7,28 @@ class Instructor(Base):
     __tablename__ = "instructors"
 
     instructor_id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.user_id"), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), unique=True, nullable=False)
     name = Column(String, nullable=False)
     expertise = Column(String, nullable=False)
 
+    # Set by the admin remove; purge_service deletes the user (and with it
+    # this row) later, in batches, so the request never waits on cascades.
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
     user = relationship("User", back_populates="instructor")
-    courses = relationship("Course", back_populates="instructor")
+    courses = relationship("Course", back_populates="instructor", passive_deletes=True)
+
+    __table_args__ = (
+        Index(
+            "ix_instructors_live_user",
+            "user_id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_instructors_deleted",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from app.database import Base
+
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+
+    job_id = Column(String(32), primary_key=True)
+    report = Column(String, nullable=False)
+    params = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False)
+    requested_by = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    # Bumped by the worker while it runs the job; a running job whose
+    # heartbeat is older than JOB_LEASE_SECONDS is taken over by another worker.
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_report_jobs_status_created", "status", "created_at"),
+        Index("ix_report_jobs_requested_by", "requested_by", "created_at"),
+        Index("ix_report_jobs_expires_at", "expires_at"),
+    )
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    description = Column(String, nullable=False)
+    applied_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -7,11 +7,30 @@ class Student(Base):
     __tablename__ = "students"
 
     student_id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.user_id"), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), unique=True, nullable=False)
     age = Column(Integer, nullable=False)
     skill_level = Column(String, nullable=False)
     category = Column(String, nullable=False)
     country = Column(String, nullable=False)
 
+    # Set by the admin remove; purge_service deletes the user (and with it
+    # this row) later, in batches, so the request never waits on cascades.
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
     user = relationship("User", back_populates="student")
-    enrollments = relationship("Enrollment", back_populates="student")
+    enrollments = relationship("Enrollment", back_populates="student", passive_deletes=True)
+
+    __table_args__ = (
+        Index(
+            "ix_students_live_user",
+            "user_id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_students_deleted",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
@@ -11,5 +11,5 @@ class User(Base):
     role = Column(String, nullable=False)
     password = Column(String, nullable=False)
 
-    student = relationship("Student", back_populates="user", uselist=False)
-    instructor = relationship("Instructor", back_populates="user", uselist=False)
+    student = relationship("Student", back_populates="user", uselist=False, passive_deletes=True)
+    instructor = relationship("Instructor", back_populates="user", uselist=False, passive_deletes=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from app.database import Base
+
+
+class UserSession(Base):
+    __tablename__ = "user_sessions"
+
+    # One row per login. Refreshing rotates token_hash in place; the hash it
+    # replaced is kept so a replayed old token can be recognised.
+    session_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    previous_token_hash = Column(String(64), unique=True, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
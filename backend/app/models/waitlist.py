@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, UniqueConstraint, func
+from app.database import Base
+
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+
+    # Served first in, first out per course, in entry_id order.
+    entry_id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.student_id", ondelete="CASCADE"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.course_id", ondelete="CASCADE"), nullable=False)
+    joined_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("student_id", "course_id", name="uq_waitlist_entries_student_course"),
+        Index("ix_waitlist_entries_course_entry", "course_id", "entry_id"),
+    )
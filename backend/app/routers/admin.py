@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends
+from typing import Literal, Optional
+import time
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.core.config import settings
+from app.database import engine, get_db
+from app.core.preconditions import if_match_version, version_etag
+from app.core.profiling import FORMATS, Profiler, profile_store
 from app.core.security import require_admin
 from app.schemas.user import (
     AdminCreateInstructor,
     AdminCreateCourse,
     AdminAssignInstructor,
+    InstructorProfile,
+    StudentProfile,
 )
 from app.services.auth_service import (
     create_instructor,
@@ -22,8 +31,13 @@ from app.services.course_service import (
     assign_instructor,
     get_course_detail,
 )
-from app.services.enroll_service import enroll_student, drop_student
+from app.services.enroll_service import enroll_student, drop_student, set_capacity
+from app.services.grading_service import get_all_policies, save_policy, delete_policy
+from app.services.import_service import import_users
+from app.schemas.course import CourseCapacityUpdate, CourseResponse
 from app.schemas.enrollment import EnrollmentCreate
+from app.schemas.grading import GradingPolicyCreate, GradingPolicyResponse
+from app.schemas.profiling import ProfilingRuleCreate, ProfilingStatus
 
 router = APIRouter()
 
@@ -31,15 +45,36 @@ router = APIRouter()
 @router.post("/instructors", status_code=201)
 async def admin_create_instructor(
     data: AdminCreateInstructor,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     return create_instructor(db, data)
 
 
-@router.get("/instructors")
+@router.post("/import/{kind}")
+async def admin_import_users(
+    kind: Literal["instructors", "students"],
+    file: UploadFile,
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    current_user: dict = Depends(require_admin),
+):
+    if format is None:
+        name = (file.filename or "").lower()
+        format = "ndjson" if name.endswith((".ndjson", ".jsonl")) else "csv"
+
+    async def chunks():
+        while chunk := await file.read(64 * 1024):
+            yield chunk
+
+    return StreamingResponse(
+        import_users(engine, kind, chunks(), format),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/instructors", response_model=list[InstructorProfile])
 async def list_instructors(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     return get_all_instructors(db)
@@ -48,7 +83,7 @@ async def list_instructors(
 @router.get("/instructors/{instructor_id}")
 async def get_instructor_detail(
     instructor_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     return get_instructor_by_id(db, instructor_id)
@@ -57,7 +92,7 @@ async def get_instructor_detail(
 @router.post("/courses", status_code=201)
 async def admin_create_course(
     data: AdminCreateCourse,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     from app.schemas.course import CourseCreate
@@ -67,6 +102,7 @@ async def admin_create_course(
         program_type=data.program_type,
         instructor_id=data.instructor_id,
         university_id=data.university_id,
+        capacity=data.capacity,
     )
     return create_course(db, course_create)
 
@@ -74,7 +110,7 @@ async def admin_create_course(
 @router.get("/courses/{course_id}")
 async def admin_get_course_detail(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     return get_course_detail(db, course_id)
@@ -83,25 +119,43 @@ async def admin_get_course_detail(
 @router.delete("/courses/{course_id}")
 async def admin_delete_course(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     delete_course(db, course_id)
     return {"message": f"Course {course_id} deleted successfully"}
 
 
-@router.put("/courses/assign-instructor")
+@router.put("/courses/{course_id}/capacity")
+async def admin_set_course_capacity(
+    course_id: int,
+    data: CourseCapacityUpdate,
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_admin),
+):
+    course = set_capacity(db, course_id, data.capacity, expected_version)
+    response.headers["ETag"] = version_etag(course["version"])
+    return course
+
+
+@router.put("/courses/assign-instructor", response_model=CourseResponse)
 async def assign_instructor_to_course(
     data: AdminAssignInstructor,
-    db: Session = Depends(get_db),
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
-    return assign_instructor(db, data.course_id, data.instructor_id)
+    course = assign_instructor(db, data.course_id, data.instructor_id, expected_version)
+    response.headers["ETag"] = version_etag(course.version)
+    return course
 
 
-@router.get("/students")
+@router.get("/students", response_model=list[StudentProfile])
 async def list_students(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     return get_all_students(db)
@@ -110,7 +164,7 @@ async def list_students(
 @router.get("/students/{student_id}")
 async def get_student_detail(
     student_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     return get_student_by_id(db, student_id)
@@ -119,7 +173,7 @@ async def get_student_detail(
 @router.delete("/students/{student_id}")
 async def admin_remove_student(
     student_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     remove_student(db, student_id)
@@ -130,29 +184,120 @@ async def admin_remove_student(
 async def admin_enroll_student(
     student_id: int,
     course_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     enrollment_data = EnrollmentCreate(student_id=student_id, course_id=course_id)
-    return enroll_student(db, enrollment_data)
+    result = enroll_student(db, enrollment_data)
+    if isinstance(result, dict):
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
 
 
 @router.delete("/students/{student_id}/drop/{course_id}")
 async def admin_drop_student(
     student_id: int,
     course_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
-    drop_student(db, student_id, course_id)
-    return {"message": f"Student {student_id} dropped from course {course_id}"}
+    promoted = drop_student(db, student_id, course_id)
+    return {"message": f"Student {student_id} dropped from course {course_id}", "promoted": promoted}
 
 
 @router.delete("/instructors/{instructor_id}")
 async def admin_remove_instructor(
     instructor_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_admin),
 ):
     remove_instructor(db, instructor_id)
     return {"message": f"Instructor {instructor_id} removed successfully"}
+
+
+@router.get("/grading-policies", response_model=list[GradingPolicyResponse])
+async def list_grading_policies(
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_admin),
+):
+    return get_all_policies(db)
+
+
+@router.put("/grading-policies", response_model=GradingPolicyResponse)
+async def upsert_grading_policy(
+    data: GradingPolicyCreate,
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_admin),
+):
+    return save_policy(db, data)
+
+
+@router.delete("/grading-policies/{policy_id}")
+async def admin_delete_grading_policy(
+    policy_id: int,
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_admin),
+):
+    delete_policy(db, policy_id)
+    return {"message": f"Grading policy {policy_id} deleted"}
+
+
+def _profiling_status() -> dict:
+    return {
+        "available": Profiler is not None and settings.PROFILING_ENABLED,
+        "rule": profile_store.rule(),
+        "profiles": profile_store.profiles(),
+    }
+
+
+@router.get("/profiling", response_model=ProfilingStatus)
+async def get_profiling(current_user: dict = Depends(require_admin)):
+    return _profiling_status()
+
+
+@router.put("/profiling", response_model=ProfilingStatus)
+async def start_profiling(data: ProfilingRuleCreate, current_user: dict = Depends(require_admin)):
+    if Profiler is None or not settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Profiling needs pyinstrument installed and PROFILING_ENABLED",
+        )
+    profile_store.set_rule({
+        "pattern": data.pattern,
+        "method": data.method,
+        "until": time.time() + data.duration_seconds,
+        "sample_rate": data.sample_rate,
+        "interval_ms": data.interval_ms,
+    })
+    return _profiling_status()
+
+
+@router.delete("/profiling", response_model=ProfilingStatus)
+async def stop_profiling(current_user: dict = Depends(require_admin)):
+    profile_store.set_rule(None)
+    return _profiling_status()
+
+
+@router.get("/profiling/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: Literal["speedscope", "html", "text"] = "speedscope",
+    current_user: dict = Depends(require_admin),
+):
+    if Profiler is None:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="pyinstrument is not installed")
+    body = await run_in_threadpool(profile_store.render, profile_id, format)
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    media_type, extension = FORMATS[format]
+    return Response(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.{extension}"'},
+    )
+
+
+@router.delete("/profiling/profiles/{profile_id}", status_code=204)
+async def delete_profile(profile_id: str, current_user: dict = Depends(require_admin)):
+    profile_store.delete(profile_id)
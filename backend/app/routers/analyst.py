@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends
+from datetime import date, timedelta
+from typing import Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.core.security import require_analyst
+from app.database import get_db, get_read_db
+from app.core.config import settings
+from app.core.pubsub import broker, event_stream
+from app.core.security import require_analyst, require_stream_role
 from app.services.analyst_service import (
     get_general_statistics,
     get_courses_summary,
@@ -9,13 +14,31 @@ from app.services.analyst_service import (
     get_course_detail_for_analyst,
     get_student_detail_for_analyst,
 )
+from app.services.analytics_engine import run_query, refresh_snapshot, get_query_fields
+from app.schemas.analytics import AnalyticsQuery
+from app.schemas.jobs import ReportJobCreate
+from app.services.job_service import runner, submit_job, get_job, get_job_result, list_jobs
+from app.services.trend_service import (
+    get_enrollment_trend,
+    get_score_trend,
+    get_student_score_history,
+)
 
 router = APIRouter()
 
 
+@router.get("/events")
+async def live_events(current_user: dict = Depends(require_stream_role("analyst"))):
+    return StreamingResponse(
+        event_stream(broker.subscribe(), settings.SSE_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/statistics")
 async def get_statistics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_analyst),
 ):
     return get_general_statistics(db)
@@ -23,7 +46,7 @@ async def get_statistics(
 
 @router.get("/courses/summary")
 async def courses_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_analyst),
 ):
     return get_courses_summary(db)
@@ -31,7 +54,7 @@ async def courses_summary(
 
 @router.get("/enrollments/summary")
 async def enrollments_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_analyst),
 ):
     return get_enrollments_summary(db)
@@ -40,7 +63,7 @@ async def enrollments_summary(
 @router.get("/courses/{course_id}")
 async def course_detail(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_analyst),
 ):
     return get_course_detail_for_analyst(db, course_id)
@@ -49,7 +72,106 @@ async def course_detail(
 @router.get("/students/{student_id}")
 async def student_detail(
     student_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_analyst),
 ):
     return get_student_detail_for_analyst(db, student_id)
+
+
+def _default_start() -> date:
+    return date.today() - timedelta(days=29)
+
+
+@router.get("/trends/enrollments")
+async def enrollment_trend(
+    granularity: Literal["day", "week"] = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    course_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(require_analyst),
+):
+    return get_enrollment_trend(
+        db, granularity, start or _default_start(), end or date.today(), course_id
+    )
+
+
+@router.get("/trends/scores")
+async def score_trend(
+    granularity: Literal["day", "week"] = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    course_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(require_analyst),
+):
+    return get_score_trend(
+        db, granularity, start or _default_start(), end or date.today(), course_id
+    )
+
+
+@router.get("/trends/students/{student_id}")
+async def student_score_history(
+    student_id: int,
+    course_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(require_analyst),
+):
+    return get_student_score_history(db, student_id, course_id)
+
+
+@router.get("/query/fields")
+async def query_fields(current_user: dict = Depends(require_analyst)):
+    return get_query_fields()
+
+
+@router.post("/query")
+def ad_hoc_query(
+    spec: AnalyticsQuery,
+    current_user: dict = Depends(require_analyst),
+):
+    return run_query(spec)
+
+
+@router.post("/query/refresh")
+def refresh_query_snapshot(current_user: dict = Depends(require_analyst)):
+    return refresh_snapshot()
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_report_job(
+    data: ReportJobCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_analyst),
+):
+    job = submit_job(db, current_user["user_id"], data)
+    # Runs after the response, so after the job row has been committed.
+    background_tasks.add_task(runner.notify)
+    return job
+
+
+@router.get("/jobs")
+async def list_report_jobs(
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_analyst),
+):
+    return list_jobs(db, current_user["user_id"])
+
+
+@router.get("/jobs/{job_id}")
+async def report_job_status(
+    job_id: str,
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_analyst),
+):
+    return get_job(db, job_id, current_user["user_id"])
+
+
+@router.get("/jobs/{job_id}/result")
+async def report_job_result(
+    job_id: str,
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_analyst),
+):
+    return get_job_result(db, job_id, current_user["user_id"])
@@ -1,35 +1,65 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas.user import StudentSignup, UserLogin, Token
+from app.core.rate_limit import login_rate_limit, signup_rate_limit
+from app.core.security import get_current_user
+from app.schemas.user import StudentSignup, UserLogin, Token, RefreshRequest
 from app.services.auth_service import (
     register_student,
     login_user,
 )
+from app.services.session_service import (
+    refresh_session,
+    revoke_session,
+    revoke_user_sessions,
+)
 
 router = APIRouter()
 
 
-@router.post("/student/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def student_signup(data: StudentSignup, db: Session = Depends(get_db)):
+@router.post(
+    "/student/signup",
+    response_model=Token,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(signup_rate_limit)],
+)
+def student_signup(data: StudentSignup, db: Session = Depends(get_db, scope="function")):
     return register_student(db, data)
 
 
-@router.post("/student/login", response_model=Token)
-async def student_login(data: UserLogin, db: Session = Depends(get_db)):
+@router.post("/student/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
+def student_login(data: UserLogin, db: Session = Depends(get_db, scope="function")):
     return login_user(db, data.email_id, data.password, expected_role="student")
 
 
-@router.post("/instructor/login", response_model=Token)
-async def instructor_login(data: UserLogin, db: Session = Depends(get_db)):
+@router.post("/instructor/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
+def instructor_login(data: UserLogin, db: Session = Depends(get_db, scope="function")):
     return login_user(db, data.email_id, data.password, expected_role="instructor")
 
 
-@router.post("/analyst/login", response_model=Token)
-async def analyst_login(data: UserLogin, db: Session = Depends(get_db)):
+@router.post("/analyst/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
+def analyst_login(data: UserLogin, db: Session = Depends(get_db, scope="function")):
     return login_user(db, data.email_id, data.password, expected_role="analyst")
 
 
-@router.post("/admin/login", response_model=Token)
-async def admin_login(data: UserLogin, db: Session = Depends(get_db)):
+@router.post("/admin/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
+def admin_login(data: UserLogin, db: Session = Depends(get_db, scope="function")):
     return login_user(db, data.email_id, data.password, expected_role="admin")
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(data: RefreshRequest, db: Session = Depends(get_db, scope="function")):
+    return refresh_session(db, data.refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(data: RefreshRequest, db: Session = Depends(get_db, scope="function")):
+    revoke_session(db, data.refresh_token)
+
+
+@router.post("/logout/all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_everywhere(
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db, scope="function"),
+):
+    revoke_user_sessions(db, current_user["user_id"])
@@ -1,25 +1,31 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_read_db
 from app.core.security import get_current_user
-from app.models.content import Content
+from app.schemas.course import ContentResponse
+from app.services.content_service import list_course_content, serve_content_file
 
 router = APIRouter()
 
 
-@router.get("/{course_id}")
+@router.api_route("/files/{content_id}", methods=["GET", "HEAD"], name="download_content_file")
+async def download_content_file(
+    content_id: int,
+    request: Request,
+    expires: int,
+    signature: str,
+    db: Session = Depends(get_read_db),
+):
+    # No bearer token: the signed URL is the credential, so it works in
+    # <video src> and <a href> without custom headers.
+    return await serve_content_file(db, request, content_id, expires, signature)
+
+
+@router.get("/{course_id}", response_model=list[ContentResponse])
 async def get_course_content(
     course_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
-    contents = db.query(Content).filter(Content.course_id == course_id).all()
-    return [
-        {
-            "content_id": c.content_id,
-            "course_id": c.course_id,
-            "type": c.type,
-            "content_url": c.content_url,
-        }
-        for c in contents
-    ]
+    return list_course_content(db, request, course_id)
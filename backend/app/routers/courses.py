@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.core.preconditions import version_etag
 from app.core.security import get_current_user
 from app.schemas.course import CourseResponse
 from app.services.course_service import get_all_courses, get_course_by_id
@@ -9,17 +10,21 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[CourseResponse])
-async def list_courses(db: Session = Depends(get_db)):
+async def list_courses(db: Session = Depends(get_read_db)):
     return get_all_courses(db)
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
-async def get_course(course_id: int, db: Session = Depends(get_db)):
-    return get_course_by_id(db, course_id)
+async def get_course(course_id: int, response: Response, db: Session = Depends(get_db, scope="function")):
+    # From the primary: the ETag goes back in If-Match, and a lagging
+    # replica's older version would make that write fail with a 409.
+    course = get_course_by_id(db, course_id)
+    response.headers["ETag"] = version_etag(course.version)
+    return course
 
 
 @router.get("/{course_id}/textbooks")
-async def get_course_textbooks(course_id: int, db: Session = Depends(get_db)):
+async def get_course_textbooks(course_id: int, db: Session = Depends(get_read_db)):
     from app.models.textbook_used import TextbookUsed
     from app.models.textbook import Textbook
 
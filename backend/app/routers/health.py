@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Response, status
+from app.services.health_service import liveness, ready_probe
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def live(response: Response):
+    # Answers as long as the event loop does; never touches the database, so
+    # a database outage does not get every worker restarted.
+    response.headers["Cache-Control"] = "no-store"
+    return liveness()
+
+
+@router.get("/ready")
+async def ready(response: Response):
+    result = await ready_probe.get()
+    response.headers["Cache-Control"] = "no-store"
+    if result["status"] != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Form, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.database import get_db
-from app.core.security import require_instructor
+from app.core.config import settings
+from app.core.preconditions import if_match_version, version_etag
+from app.core.pubsub import broker, event_stream, queue_event
+from app.core.security import require_instructor, require_stream_role
+from app.schemas.course import CourseResponse
+from app.schemas.enrollment import CourseEnrollment
 from app.schemas.user import InstructorProfile
 from app.services.auth_service import get_instructor_profile
 from app.services.course_service import get_courses_by_instructor
+from app.services.content_service import delete_stored_file, store_upload
 from app.services.enroll_service import get_enrollments_by_course, grade_student
+from app.services.lookups import course_by_id, instructor_by_user_id
 
 router = APIRouter()
 
@@ -18,58 +27,70 @@ class AddContentRequest(BaseModel):
 
 @router.get("/profile")
 async def get_my_profile(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_instructor),
 ):
     return get_instructor_profile(db, current_user["user_id"])
 
 
-@router.get("/my-courses")
+@router.get("/my-courses", response_model=list[CourseResponse])
 async def my_courses(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_instructor),
 ):
-    from app.models.instructor import Instructor
-    instructor = db.query(Instructor).filter(
-        Instructor.user_id == current_user["user_id"]
-    ).first()
+    instructor = instructor_by_user_id(db, current_user["user_id"])
     if not instructor:
         return []
     return get_courses_by_instructor(db, instructor.instructor_id)
 
 
-@router.get("/courses/{course_id}/students")
+@router.get("/courses/{course_id}/students", response_model=list[CourseEnrollment])
 async def course_students(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_instructor),
 ):
     return get_enrollments_by_course(db, course_id)
 
 
+@router.get("/courses/{course_id}/events")
+async def course_events(
+    course_id: int,
+    current_user: dict = Depends(require_stream_role("instructor")),
+):
+    return StreamingResponse(
+        event_stream(broker.subscribe(course_id), settings.SSE_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/courses/{course_id}/grade")
 async def grade(
     course_id: int,
     student_id: int,
     score: float,
-    db: Session = Depends(get_db),
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_instructor),
 ):
-    return grade_student(db, course_id, student_id, score)
+    graded = grade_student(db, course_id, student_id, score, expected_version)
+    response.headers["ETag"] = version_etag(graded["version"])
+    return graded
 
 
 @router.post("/courses/{course_id}/content", status_code=201)
 async def add_content(
     course_id: int,
     body: AddContentRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_instructor),
 ):
     from app.models.content import Content
-    from app.models.course import Course
     from fastapi import HTTPException, status
 
-    course = db.query(Course).filter(Course.course_id == course_id).first()
+    course = course_by_id(db, course_id)
     if not course:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
 
@@ -79,8 +100,14 @@ async def add_content(
         content_url=body.content_url,
     )
     db.add(new_content)
-    db.commit()
-    db.refresh(new_content)
+    db.flush()
+    queue_event(
+        db, "content.added",
+        course_id=course_id,
+        content_id=new_content.content_id,
+        content_type=new_content.type,
+        content_url=new_content.content_url,
+    )
     return {
         "content_id": new_content.content_id,
         "course_id": new_content.course_id,
@@ -89,11 +116,36 @@ async def add_content(
     }
 
 
+@router.post("/courses/{course_id}/content/upload", status_code=201)
+async def upload_content(
+    course_id: int,
+    file: UploadFile,
+    type: str = Form(...),
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_instructor),
+):
+    from fastapi import HTTPException, status
+
+    if not course_by_id(db, course_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+    content = await store_upload(db, course_id, type, file)
+    return {
+        "content_id": content.content_id,
+        "course_id": content.course_id,
+        "type": content.type,
+        "content_url": content.content_url,
+        "file_name": content.file_name,
+        "file_size": content.file_size,
+        "media_type": content.media_type,
+    }
+
+
 @router.delete("/courses/{course_id}/content/{content_id}")
 async def delete_content(
     course_id: int,
     content_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_instructor),
 ):
     from app.models.content import Content
@@ -106,15 +158,17 @@ async def delete_content(
     if not content:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
 
+    delete_stored_file(db, content)
     db.delete(content)
-    db.commit()
+    db.flush()
+    queue_event(db, "content.deleted", course_id=course_id, content_id=content_id)
     return {"message": "Content deleted"}
 
 
 @router.get("/students/{student_id}")
 async def instructor_get_student_profile(
     student_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_instructor),
 ):
     from app.models.student import Student
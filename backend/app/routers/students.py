@@ -1,63 +1,115 @@
-from fastapi import APIRouter, Depends
+from typing import Union
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core.security import require_student
 from app.schemas.user import StudentProfile
-from app.schemas.enrollment import EnrollmentCreate, EnrollmentResponse
+from app.schemas.course import CourseResponse
+from app.schemas.enrollment import (
+    EnrollmentCreate,
+    EnrollmentResponse,
+    EnrollmentWithDetails,
+    WaitlistPosition,
+    WaitlistResponse,
+)
 from app.services.course_service import get_all_courses
-from app.services.enroll_service import enroll_student, drop_student, get_enrollments_by_student
+from app.services.enroll_service import (
+    enroll_student,
+    drop_student,
+    get_enrollments_by_student,
+    get_waitlist_by_student,
+    leave_waitlist,
+)
 from app.services.auth_service import get_student_profile
+from app.services.lookups import student_by_user_id
+from app.services.recommendation_service import recommend_courses
 
 router = APIRouter()
 
 
 @router.get("/profile")
 async def get_my_profile(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_student),
 ):
     return get_student_profile(db, current_user["user_id"])
 
 
-@router.get("/courses")
+@router.get("/courses", response_model=list[CourseResponse])
 async def browse_courses(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_student),
 ):
     return get_all_courses(db)
 
 
-@router.post("/enroll", response_model=EnrollmentResponse, status_code=201)
+@router.get("/recommendations")
+async def course_recommendations(
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_student),
+):
+    return recommend_courses(db, current_user["user_id"], limit)
+
+
+@router.post("/enroll", response_model=Union[EnrollmentResponse, WaitlistResponse], status_code=201)
 async def add_course(
     enrollment: EnrollmentCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_student),
 ):
-    return enroll_student(db, enrollment)
+    result = enroll_student(db, enrollment)
+    if isinstance(result, dict):
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
 
 
 @router.delete("/unenroll/{course_id}")
 async def unenroll_from_course(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_student),
 ):
-    from app.models.student import Student
-    student = db.query(Student).filter(Student.user_id == current_user["user_id"]).first()
+    student = student_by_user_id(db, current_user["user_id"])
     if not student:
-        from fastapi import HTTPException, status
+        from fastapi import HTTPException
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
     drop_student(db, student.student_id, course_id)
     return {"message": f"Successfully unenrolled from course {course_id}"}
 
 
-@router.get("/my-courses")
+@router.get("/my-courses", response_model=list[EnrollmentWithDetails])
 async def my_enrolled_courses(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     current_user: dict = Depends(require_student),
 ):
-    from app.models.student import Student
-    student = db.query(Student).filter(Student.user_id == current_user["user_id"]).first()
+    student = student_by_user_id(db, current_user["user_id"])
     if not student:
         return []
     return get_enrollments_by_student(db, student.student_id)
+
+
+@router.get("/waitlist", response_model=list[WaitlistPosition])
+async def my_waitlist(
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_student),
+):
+    student = student_by_user_id(db, current_user["user_id"])
+    if not student:
+        return []
+    return get_waitlist_by_student(db, student.student_id)
+
+
+@router.delete("/waitlist/{course_id}")
+async def leave_course_waitlist(
+    course_id: int,
+    db: Session = Depends(get_db, scope="function"),
+    current_user: dict = Depends(require_student),
+):
+    student = student_by_user_id(db, current_user["user_id"])
+    if not student:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    leave_waitlist(db, student.student_id, course_id)
+    return {"message": f"Left the waitlist for course {course_id}"}
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Any, Literal, Optional
+
+
+class QueryFilter(BaseModel):
+    field: str
+    op: Literal["eq", "ne", "lt", "lte", "gt", "gte", "in", "not_in"] = "eq"
+    value: Any
+
+
+class QueryAggregate(BaseModel):
+    fn: Literal["count", "count_distinct", "sum", "avg", "min", "max"]
+    field: Optional[str] = None
+    alias: Optional[str] = None
+
+
+class QueryOrder(BaseModel):
+    field: str
+    desc: bool = False
+
+
+class AnalyticsQuery(BaseModel):
+    dataset: Literal["enrollments", "students", "courses"] = "enrollments"
+    group_by: list[str] = []
+    filters: list[QueryFilter] = []
+    aggregates: list[QueryAggregate] = [QueryAggregate(fn="count")]
+    order_by: list[QueryOrder] = []
+    limit: Optional[int] = Field(default=None, ge=1, le=10000)
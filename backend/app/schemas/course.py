@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
 
 
 class CourseCreate(BaseModel):
@@ -7,6 +9,11 @@ class CourseCreate(BaseModel):
     program_type: str
     instructor_id: int
     university_id: int
+    capacity: Optional[int] = Field(default=None, ge=0)
+
+
+class CourseCapacityUpdate(BaseModel):
+    capacity: Optional[int] = Field(default=None, ge=0)
 
 
 class CourseResponse(BaseModel):
@@ -14,8 +21,11 @@ class CourseResponse(BaseModel):
     course_name: str
     duration: str
     program_type: str
-    instructor_id: int
+    instructor_id: Optional[int] = None
     university_id: int
+    capacity: Optional[int] = None
+    seats_taken: int = 0
+    version: int = 1
 
     class Config:
         from_attributes = True
@@ -31,3 +41,33 @@ class CourseWithInstructor(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ContentResponse(BaseModel):
+    content_id: int
+    course_id: int
+    type: str
+    content_url: str
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    media_type: Optional[str] = None
+    link_status: Optional[int] = None
+    link_checked_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ContentManifestItem(BaseModel):
+    type: str
+    url: str
+
+
+class ContentManifestCourse(BaseModel):
+    course_id: Optional[int] = None
+    course_name: Optional[str] = None
+    content: list[ContentManifestItem] = []
+
+
+class ContentManifest(BaseModel):
+    courses: list[ContentManifestCourse]
@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -10,6 +12,37 @@ class EnrollmentResponse(BaseModel):
     student_id: int
     course_id: int
     evaluation_score: float
+    passed: bool = False
+    version: int = 1
+
+    class Config:
+        from_attributes = True
+
+
+class WaitlistResponse(BaseModel):
+    student_id: int
+    course_id: int
+    position: int
+    status: str = "waitlisted"
+
+
+class WaitlistPosition(BaseModel):
+    course_id: int
+    course_name: str
+    position: int
+    joined_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CourseEnrollment(BaseModel):
+    student_id: int
+    course_id: int
+    evaluation_score: float
+    student_name: Optional[str] = None
+    student_email: Optional[str] = None
+    version: int = 1
 
     class Config:
         from_attributes = True
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class GradeBandSchema(BaseModel):
+    letter: str
+    min_score: float = Field(ge=0, le=100)
+
+
+class GradingPolicyCreate(BaseModel):
+    name: str
+    course_id: Optional[int] = None
+    program_type: Optional[str] = None
+    pass_threshold: float = Field(ge=0, le=100)
+    bands: list[GradeBandSchema] = []
+
+
+class GradingPolicyResponse(BaseModel):
+    policy_id: int
+    name: str
+    course_id: Optional[int] = None
+    program_type: Optional[str] = None
+    pass_threshold: float
+    bands: list[GradeBandSchema]
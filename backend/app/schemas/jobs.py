@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+
+
+class ReportJobCreate(BaseModel):
+    report: Literal["statistics", "courses_summary", "enrollments_summary", "course_detail", "student_detail"]
+    course_id: Optional[int] = None
+    student_id: Optional[int] = None
@@ -0,0 +1,45 @@
+import re
+from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional
+
+
+class ProfilingRuleCreate(BaseModel):
+    # Regular expression searched for in the request path; None profiles every route.
+    pattern: Optional[str] = None
+    method: Optional[Literal["GET", "POST", "PUT", "PATCH", "DELETE"]] = None
+    duration_seconds: int = Field(default=60, gt=0, le=3600)
+    sample_rate: float = Field(default=1.0, gt=0, le=1)
+    interval_ms: float = Field(default=1.0, ge=0.1, le=100)
+
+    @field_validator("pattern")
+    @classmethod
+    def compiles(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"invalid regular expression: {e}")
+        return value
+
+
+class ProfilingRule(BaseModel):
+    pattern: Optional[str]
+    method: Optional[str]
+    until: float
+    sample_rate: float
+    interval_ms: float
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    captured_at: str
+
+
+class ProfilingStatus(BaseModel):
+    available: bool
+    rule: Optional[ProfilingRule]
+    profiles: list[ProfileSummary]
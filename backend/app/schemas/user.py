@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 
 
@@ -12,6 +12,11 @@ class Token(BaseModel):
     token_type: str = "bearer"
     role: str
     user_id: int
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
@@ -69,12 +74,31 @@ class AdminCreateInstructor(BaseModel):
     expertise: str
 
 
+class ImportInstructorRow(BaseModel):
+    email_id: EmailStr
+    password: Optional[str] = None
+    password_hash: Optional[str] = None
+    name: str
+    expertise: str
+
+
+class ImportStudentRow(BaseModel):
+    email_id: EmailStr
+    password: Optional[str] = None
+    password_hash: Optional[str] = None
+    age: int
+    skill_level: str
+    category: str
+    country: str
+
+
 class AdminCreateCourse(BaseModel):
     course_name: str
     duration: str
     program_type: str
     instructor_id: int
     university_id: int
+    capacity: Optional[int] = Field(default=None, ge=0)
 
 
 class AdminAssignInstructor(BaseModel):
@@ -1,5 +1,6 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, exists, func, case
+from app.core.config import settings
 from app.models.student import Student
 from app.models.instructor import Instructor
 from app.models.course import Course
@@ -11,17 +12,36 @@ from app.models.topic import Topic
 from app.models.course_topic import CourseTopic
 from app.models.textbook import Textbook
 from app.models.textbook_used import TextbookUsed
+from app.services.grading_service import resolve_policy, letter_grade_expr
+from app.services.lookups import course_by_id
+from app.core.tracing import trace_module
+
+
+# Removed students and courses stay in their tables until purge_service gets
+# to them (or for good with PURGE_ENABLED off); none of the figures count them.
+def _live_student(student_id):
+    return exists().where(Student.student_id == student_id, Student.deleted_at.is_(None))
+
+
+def _live_course(course_id):
+    return exists().where(Course.course_id == course_id, Course.deleted_at.is_(None))
+
+
+def _live_enrollment():
+    return and_(_live_student(Enrollment.student_id), _live_course(Enrollment.course_id))
 
 
 def get_general_statistics(db: Session) -> dict:
-    total_students = db.query(func.count(Student.student_id)).scalar()
-    total_instructors = db.query(func.count(Instructor.instructor_id)).scalar()
-    total_courses = db.query(func.count(Course.course_id)).scalar()
-    total_enrollments = db.query(func.count()).select_from(Enrollment).scalar()
+    total_students = db.query(func.count(Student.student_id)).filter(Student.deleted_at.is_(None)).scalar()
+    total_instructors = (
+        db.query(func.count(Instructor.instructor_id)).filter(Instructor.deleted_at.is_(None)).scalar()
+    )
+    total_courses = db.query(func.count(Course.course_id)).filter(Course.deleted_at.is_(None)).scalar()
+    total_enrollments = db.query(func.count()).select_from(Enrollment).filter(_live_enrollment()).scalar()
     total_universities = db.query(func.count(University.university_id)).scalar()
-    total_contents = db.query(func.count(Content.content_id)).scalar()
+    total_contents = db.query(func.count(Content.content_id)).filter(_live_course(Content.course_id)).scalar()
 
-    avg_evaluation = db.query(func.avg(Enrollment.evaluation_score)).scalar()
+    avg_evaluation = db.query(func.avg(Enrollment.evaluation_score)).filter(_live_enrollment()).scalar()
 
     courses_per_university = (
         db.query(
@@ -29,6 +49,7 @@ def get_general_statistics(db: Session) -> dict:
             func.count(Course.course_id).label("course_count"),
         )
         .join(Course, Course.university_id == University.university_id)
+        .filter(Course.deleted_at.is_(None))
         .group_by(University.name)
         .all()
     )
@@ -38,6 +59,7 @@ def get_general_statistics(db: Session) -> dict:
             Student.country,
             func.count(Student.student_id).label("student_count"),
         )
+        .filter(Student.deleted_at.is_(None))
         .group_by(Student.country)
         .all()
     )
@@ -47,6 +69,7 @@ def get_general_statistics(db: Session) -> dict:
             Student.skill_level,
             func.count(Student.student_id).label("count"),
         )
+        .filter(Student.deleted_at.is_(None))
         .group_by(Student.skill_level)
         .all()
     )
@@ -56,20 +79,25 @@ def get_general_statistics(db: Session) -> dict:
         cnt = db.query(func.count()).select_from(Enrollment).filter(
             Enrollment.evaluation_score >= lo,
             Enrollment.evaluation_score <= hi,
+            _live_enrollment(),
         ).scalar()
         score_distribution.append({"range": label, "count": cnt or 0})
 
-    pass_count = db.query(func.count()).select_from(Enrollment).filter(Enrollment.evaluation_score >= 40).scalar() or 0
+    pass_count = (
+        db.query(func.count()).select_from(Enrollment).filter(Enrollment.passed, _live_enrollment()).scalar() or 0
+    )
     fail_count = (total_enrollments or 0) - pass_count
 
     students_per_category = (
         db.query(Student.category, func.count(Student.student_id))
+        .filter(Student.deleted_at.is_(None))
         .group_by(Student.category)
         .all()
     )
 
     courses_per_program = (
         db.query(Course.program_type, func.count(Course.course_id))
+        .filter(Course.deleted_at.is_(None))
         .group_by(Course.program_type)
         .all()
     )
@@ -77,6 +105,7 @@ def get_general_statistics(db: Session) -> dict:
     avg_score_per_program = (
         db.query(Course.program_type, func.avg(Enrollment.evaluation_score))
         .join(Enrollment, Enrollment.course_id == Course.course_id)
+        .filter(Course.deleted_at.is_(None), _live_student(Enrollment.student_id))
         .group_by(Course.program_type)
         .all()
     )
@@ -120,41 +149,40 @@ def get_general_statistics(db: Session) -> dict:
 
 
 def get_courses_summary(db: Session) -> list[dict]:
-    courses = db.query(Course).all()
+    enrollment_stats = {
+        row.course_id: row
+        for row in (
+            db.query(
+                Enrollment.course_id,
+                func.count().label("enrollment_count"),
+                func.avg(Enrollment.evaluation_score).label("avg_score"),
+                func.max(Enrollment.evaluation_score).label("max_score"),
+                func.min(Enrollment.evaluation_score).label("min_score"),
+                func.count().filter(Enrollment.passed).label("pass_count"),
+            )
+            .filter(_live_student(Enrollment.student_id))
+            .group_by(Enrollment.course_id)
+            .all()
+        )
+    }
+    content_counts = dict(
+        db.query(Content.course_id, func.count(Content.content_id))
+        .group_by(Content.course_id)
+        .all()
+    )
+
+    courses = (
+        db.query(Course)
+        .options(joinedload(Course.instructor), joinedload(Course.university))
+        .filter(Course.deleted_at.is_(None))
+        .all()
+    )
     result = []
     for course in courses:
-        enrollment_count = (
-            db.query(func.count())
-            .select_from(Enrollment)
-            .filter(Enrollment.course_id == course.course_id)
-            .scalar()
-        )
-        avg_score = (
-            db.query(func.avg(Enrollment.evaluation_score))
-            .filter(Enrollment.course_id == course.course_id)
-            .scalar()
-        )
-        max_score = (
-            db.query(func.max(Enrollment.evaluation_score))
-            .filter(Enrollment.course_id == course.course_id)
-            .scalar()
-        )
-        min_score = (
-            db.query(func.min(Enrollment.evaluation_score))
-            .filter(Enrollment.course_id == course.course_id)
-            .scalar()
-        )
-        pass_count = (
-            db.query(func.count())
-            .select_from(Enrollment)
-            .filter(Enrollment.course_id == course.course_id, Enrollment.evaluation_score >= 40)
-            .scalar()
-        ) or 0
-        content_count = (
-            db.query(func.count(Content.content_id))
-            .filter(Content.course_id == course.course_id)
-            .scalar()
-        )
+        stats = enrollment_stats.get(course.course_id)
+        enrollment_count = stats.enrollment_count if stats else 0
+        avg_score = stats.avg_score if stats else None
+        pass_count = (stats.pass_count if stats else 0) or 0
 
         result.append({
             "course_id": course.course_id,
@@ -165,20 +193,20 @@ def get_courses_summary(db: Session) -> list[dict]:
             "university_name": course.university.name if course.university else None,
             "enrollment_count": enrollment_count,
             "average_score": round(avg_score, 2) if avg_score else 0.0,
-            "max_score": max_score or 0.0,
-            "min_score": min_score or 0.0,
+            "max_score": (stats.max_score if stats else None) or 0.0,
+            "min_score": (stats.min_score if stats else None) or 0.0,
             "pass_count": pass_count,
-            "fail_count": (enrollment_count or 0) - pass_count,
-            "content_count": content_count or 0,
+            "fail_count": enrollment_count - pass_count,
+            "content_count": content_counts.get(course.course_id, 0),
         })
     return result
 
 
 def get_enrollments_summary(db: Session) -> dict:
-    total = db.query(func.count()).select_from(Enrollment).scalar()
-    avg_score = db.query(func.avg(Enrollment.evaluation_score)).scalar()
-    max_score = db.query(func.max(Enrollment.evaluation_score)).scalar()
-    min_score = db.query(func.min(Enrollment.evaluation_score)).scalar()
+    total = db.query(func.count()).select_from(Enrollment).filter(_live_enrollment()).scalar()
+    avg_score = db.query(func.avg(Enrollment.evaluation_score)).filter(_live_enrollment()).scalar()
+    max_score = db.query(func.max(Enrollment.evaluation_score)).filter(_live_enrollment()).scalar()
+    min_score = db.query(func.min(Enrollment.evaluation_score)).filter(_live_enrollment()).scalar()
 
     top_courses = (
         db.query(
@@ -186,6 +214,7 @@ def get_enrollments_summary(db: Session) -> dict:
             func.count(Enrollment.student_id).label("enrollment_count"),
         )
         .join(Enrollment, Enrollment.course_id == Course.course_id)
+        .filter(Course.deleted_at.is_(None), _live_student(Enrollment.student_id))
         .group_by(Course.course_name)
         .order_by(func.count(Enrollment.student_id).desc())
         .limit(5)
@@ -205,21 +234,24 @@ def get_enrollments_summary(db: Session) -> dict:
 
 
 def get_course_detail_for_analyst(db: Session, course_id: int) -> dict:
-    course = db.query(Course).filter(Course.course_id == course_id).first()
+    course = course_by_id(db, course_id)
     if not course:
         return {}
 
+    policy = resolve_policy(db, course_id)
+    letter_grade = letter_grade_expr(policy)
+
     rows = (
-        db.query(Enrollment, Student, User)
+        db.query(Enrollment, Student, User, letter_grade.label("letter_grade"))
         .join(Student, Enrollment.student_id == Student.student_id)
         .join(User, Student.user_id == User.user_id)
-        .filter(Enrollment.course_id == course_id)
+        .filter(Enrollment.course_id == course_id, Student.deleted_at.is_(None))
         .all()
     )
 
     enrolled_students = []
     scores = []
-    for enroll, student, user in rows:
+    for enroll, student, user, letter in rows:
         scores.append(enroll.evaluation_score)
         enrolled_students.append({
             "student_id": student.student_id,
@@ -229,6 +261,8 @@ def get_course_detail_for_analyst(db: Session, course_id: int) -> dict:
             "skill_level": student.skill_level,
             "category": student.category,
             "evaluation_score": enroll.evaluation_score,
+            "passed": enroll.passed,
+            "letter_grade": letter,
         })
 
     topics = (
@@ -258,19 +292,37 @@ def get_course_detail_for_analyst(db: Session, course_id: int) -> dict:
             Enrollment.course_id == course_id,
             Enrollment.evaluation_score >= lo,
             Enrollment.evaluation_score <= hi,
+            _live_student(Enrollment.student_id),
         ).scalar()
         score_dist.append({"range": label, "count": cnt or 0})
 
     skill_breakdown = (
         db.query(Student.skill_level, func.count(Student.student_id))
         .join(Enrollment, Enrollment.student_id == Student.student_id)
-        .filter(Enrollment.course_id == course_id)
+        .filter(Enrollment.course_id == course_id, Student.deleted_at.is_(None))
         .group_by(Student.skill_level)
         .all()
     )
 
+    graded = (
+        db.query(letter_grade.label("letter"))
+        .filter(Enrollment.course_id == course_id, _live_student(Enrollment.student_id))
+        .subquery()
+    )
+    grade_distribution = (
+        db.query(graded.c.letter, func.count())
+        .group_by(graded.c.letter)
+        .order_by(graded.c.letter)
+        .all()
+    )
+
+    pass_count = (
+        db.query(func.count())
+        .select_from(Enrollment)
+        .filter(Enrollment.course_id == course_id, Enrollment.passed, _live_student(Enrollment.student_id))
+        .scalar()
+    ) or 0
     avg_score = sum(scores) / len(scores) if scores else 0
-    pass_count = sum(1 for s in scores if s >= 40)
 
     return {
         "course_id": course.course_id,
@@ -287,6 +339,10 @@ def get_course_detail_for_analyst(db: Session, course_id: int) -> dict:
         "pass_count": pass_count,
         "fail_count": len(scores) - pass_count,
         "pass_rate": round(pass_count / len(scores) * 100, 1) if scores else 0,
+        "pass_threshold": policy.pass_threshold if policy else settings.DEFAULT_PASS_THRESHOLD,
+        "grade_distribution": [
+            {"letter": letter, "count": c} for letter, c in grade_distribution
+        ],
         "topics": [t[0] for t in topics],
         "textbooks": [
             {"title": tb.title, "author": tb.author, "link": tb.link}
@@ -304,7 +360,7 @@ def get_course_detail_for_analyst(db: Session, course_id: int) -> dict:
 
 
 def get_student_detail_for_analyst(db: Session, student_id: int) -> dict:
-    student = db.query(Student).filter(Student.student_id == student_id).first()
+    student = db.query(Student).filter(Student.student_id == student_id, Student.deleted_at.is_(None)).first()
     if not student:
         return {}
 
@@ -315,7 +371,7 @@ def get_student_detail_for_analyst(db: Session, student_id: int) -> dict:
         .join(Course, Enrollment.course_id == Course.course_id)
         .outerjoin(University, Course.university_id == University.university_id)
         .outerjoin(Instructor, Course.instructor_id == Instructor.instructor_id)
-        .filter(Enrollment.student_id == student_id)
+        .filter(Enrollment.student_id == student_id, Course.deleted_at.is_(None))
         .all()
     )
 
@@ -334,7 +390,7 @@ def get_student_detail_for_analyst(db: Session, student_id: int) -> dict:
         })
 
     avg_score = sum(scores) / len(scores) if scores else 0
-    pass_count = sum(1 for s in scores if s >= 40)
+    pass_count = sum(1 for enroll, _, _, _ in rows if enroll.passed)
 
     return {
         "student_id": student.student_id,
@@ -351,3 +407,6 @@ def get_student_detail_for_analyst(db: Session, student_id: int) -> dict:
         "fail_count": len(scores) - pass_count,
         "enrollments": enrollments,
     }
+
+
+trace_module(__name__)
@@ -0,0 +1,331 @@
+import math
+import operator
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+import numpy as np
+from sqlalchemy import select
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.database import open_read_session, close_read_session
+from app.models.student import Student
+from app.models.instructor import Instructor
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.university import University
+from app.schemas.analytics import AnalyticsQuery
+from app.core.tracing import trace_module
+
+STUDENT_FIELDS = [
+    ("student_id", Student.student_id, "int"),
+    ("student_age", Student.age, "int"),
+    ("student_country", Student.country, "str"),
+    ("student_skill_level", Student.skill_level, "str"),
+    ("student_category", Student.category, "str"),
+]
+
+COURSE_FIELDS = [
+    ("course_id", Course.course_id, "int"),
+    ("course_name", Course.course_name, "str"),
+    ("program_type", Course.program_type, "str"),
+    ("duration", Course.duration, "str"),
+    ("instructor_name", Instructor.name, "str"),
+    ("university_id", Course.university_id, "int"),
+    ("university_name", University.name, "str"),
+    ("university_country", University.country, "str"),
+]
+
+ENROLLMENT_FIELDS = [
+    ("evaluation_score", Enrollment.evaluation_score, "float"),
+    ("passed", Enrollment.passed, "bool"),
+]
+
+
+def _course_joins(stmt):
+    return (
+        stmt.outerjoin(Instructor, Course.instructor_id == Instructor.instructor_id)
+        .outerjoin(University, Course.university_id == University.university_id)
+    )
+
+
+# Soft-deleted students and courses, and their enrollments, are left out
+# even before purge_service removes them.
+DATASETS = {
+    "students": (
+        STUDENT_FIELDS,
+        lambda columns: select(*columns).select_from(Student).where(Student.deleted_at.is_(None)),
+    ),
+    "courses": (
+        COURSE_FIELDS,
+        lambda columns: _course_joins(select(*columns).select_from(Course)).where(Course.deleted_at.is_(None)),
+    ),
+    "enrollments": (
+        STUDENT_FIELDS + COURSE_FIELDS + ENROLLMENT_FIELDS,
+        lambda columns: _course_joins(
+            select(*columns)
+            .select_from(Enrollment)
+            .join(Student, Enrollment.student_id == Student.student_id)
+            .join(Course, Enrollment.course_id == Course.course_id)
+        ).where(Student.deleted_at.is_(None), Course.deleted_at.is_(None)),
+    ),
+}
+
+COMPARISONS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+}
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class ColumnData:
+    def __init__(self, kind: str, values: list):
+        self.kind = kind
+        self.categories = None
+        self.lookup = None
+        if kind == "str":
+            # Dictionary-encode strings: filters and group-bys work on int codes.
+            lookup: dict = {}
+            self.values = np.fromiter(
+                (lookup.setdefault(v, len(lookup)) for v in values),
+                dtype=np.int32,
+                count=len(values),
+            )
+            self.lookup = lookup
+            self.categories = np.array(list(lookup), dtype=object)
+        elif kind == "int":
+            self.values = np.asarray(values, dtype=np.int64)
+        elif kind == "bool":
+            self.values = np.asarray(values, dtype=np.bool_)
+        else:
+            self.values = np.asarray(values, dtype=np.float64)
+
+    def decode(self, values: np.ndarray) -> list:
+        if self.kind == "str":
+            return self.categories[values].tolist()
+        return [None if isinstance(v, float) and math.isnan(v) else v for v in values.tolist()]
+
+
+class ColumnarTable:
+    def __init__(self, columns: dict[str, ColumnData], num_rows: int):
+        self.columns = columns
+        self.num_rows = num_rows
+
+    def column(self, name: str) -> ColumnData:
+        if name not in self.columns:
+            raise _bad_request(f"Unknown field '{name}'")
+        return self.columns[name]
+
+
+def build_table(db, dataset: str, batch_size: int = 10000) -> ColumnarTable:
+    fields, build = DATASETS[dataset]
+    stmt = build([expr.label(name) for name, expr, _ in fields])
+    raw: list[list] = [[] for _ in fields]
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        for i, values in enumerate(zip(*partition)):
+            raw[i].extend(values)
+    columns = {
+        name: ColumnData(kind, raw[i]) for i, (name, _, kind) in enumerate(fields)
+    }
+    return ColumnarTable(columns, len(raw[0]))
+
+
+def _filter_mask(table: ColumnarTable, f) -> np.ndarray:
+    column = table.column(f.field)
+    many = f.op in ("in", "not_in")
+    if many and not isinstance(f.value, list):
+        raise _bad_request(f"Filter '{f.op}' on '{f.field}' needs a list value")
+
+    if column.kind == "str":
+        if f.op not in ("eq", "ne", "in", "not_in"):
+            raise _bad_request(f"Operator '{f.op}' is not supported on text field '{f.field}'")
+        wanted = f.value if many else [f.value]
+        codes = [column.lookup[v] for v in wanted if v in column.lookup]
+        hit = np.isin(column.values, codes)
+        return ~hit if f.op in ("ne", "not_in") else hit
+
+    try:
+        if many:
+            hit = np.isin(column.values, np.asarray(f.value, dtype=column.values.dtype))
+            return ~hit if f.op == "not_in" else hit
+        return COMPARISONS[f.op](column.values, column.values.dtype.type(f.value))
+    except (TypeError, ValueError):
+        raise _bad_request(f"Invalid value for field '{f.field}'")
+
+
+def _group(table: ColumnarTable, group_by: list[str], rows: np.ndarray):
+    if not group_by:
+        return np.zeros(len(rows), dtype=np.intp), 1, []
+
+    uniques, inverses = [], []
+    for name in group_by:
+        u, inv = np.unique(table.column(name).values[rows], return_inverse=True)
+        uniques.append(u)
+        inverses.append(inv.ravel())
+    dims = tuple(max(len(u), 1) for u in uniques)
+    combined = np.ravel_multi_index(tuple(inverses), dims) if rows.size else np.zeros(0, dtype=np.intp)
+    groups, inverse = np.unique(combined, return_inverse=True)
+    key_positions = np.unravel_index(groups, dims)
+    keys = [
+        table.column(name).decode(uniques[i][key_positions[i]])
+        for i, name in enumerate(group_by)
+    ]
+    return inverse.ravel(), len(groups), keys
+
+
+def _aggregate(table: ColumnarTable, agg, rows: np.ndarray, inverse: np.ndarray, n: int) -> list:
+    if agg.fn == "count" and agg.field is None:
+        return np.bincount(inverse, minlength=n).tolist()
+    if agg.field is None:
+        raise _bad_request(f"Aggregate '{agg.fn}' needs a field")
+
+    column = table.column(agg.field)
+    values = column.values[rows]
+    if column.kind == "str" and agg.fn not in ("count", "count_distinct"):
+        raise _bad_request(f"Aggregate '{agg.fn}' is not supported on text field '{agg.field}'")
+
+    if column.kind == "float":
+        valid = ~np.isnan(values)
+        values, groups = values[valid], inverse[valid]
+    else:
+        groups = inverse
+
+    if agg.fn == "count":
+        return np.bincount(groups, minlength=n).tolist()
+    if agg.fn == "count_distinct":
+        pairs = np.unique(np.column_stack((groups, values.astype(np.float64))), axis=0)
+        return np.bincount(pairs[:, 0].astype(np.intp), minlength=n).tolist()
+
+    numeric = values.astype(np.float64)
+    counts = np.bincount(groups, minlength=n)
+    if agg.fn in ("sum", "avg"):
+        sums = np.bincount(groups, weights=numeric, minlength=n)
+        if agg.fn == "sum":
+            return [int(s) if column.kind in ("int", "bool") else float(s) for s in sums]
+        return [float(s / c) if c else None for s, c in zip(sums, counts)]
+
+    fill, ufunc = (np.inf, np.minimum) if agg.fn == "min" else (-np.inf, np.maximum)
+    out = np.full(n, fill)
+    ufunc.at(out, groups, numeric)
+    cast = int if column.kind == "int" else float
+    return [cast(v) if c else None for v, c in zip(out, counts)]
+
+
+def _sort_key(value, desc: bool):
+    # None always sorts last regardless of direction.
+    return (value is None) != desc, value if value is not None else 0
+
+
+def execute_query(table: ColumnarTable, spec: AnalyticsQuery) -> dict:
+    mask = np.ones(table.num_rows, dtype=np.bool_)
+    for f in spec.filters:
+        mask &= _filter_mask(table, f)
+    rows = np.flatnonzero(mask)
+
+    inverse, n_groups, keys = _group(table, spec.group_by, rows)
+
+    aggregates = spec.aggregates or []
+    names = [
+        a.alias or (a.fn if a.field is None else f"{a.fn}_{a.field}")
+        for a in aggregates
+    ]
+    results = [_aggregate(table, a, rows, inverse, n_groups) for a in aggregates]
+
+    output = []
+    for g in range(n_groups):
+        row = {name: keys[i][g] for i, name in enumerate(spec.group_by)}
+        for name, values in zip(names, results):
+            row[name] = values[g]
+        output.append(row)
+
+    columns = list(spec.group_by) + names
+    for order in reversed(spec.order_by):
+        if order.field not in columns:
+            raise _bad_request(f"Cannot order by '{order.field}', it is not in the output")
+        output.sort(key=lambda r: _sort_key(r[order.field], order.desc), reverse=order.desc)
+    if spec.limit is not None:
+        output = output[: spec.limit]
+
+    return {
+        "dataset": spec.dataset,
+        "columns": columns,
+        "scanned_rows": table.num_rows,
+        "matched_rows": int(rows.size),
+        "rows": output,
+    }
+
+
+class AnalyticsSnapshot:
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._state: Optional[tuple[dict, datetime, float]] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def refresh(self) -> datetime:
+        db = open_read_session()
+        try:
+            tables = {name: build_table(db, name) for name in DATASETS}
+        finally:
+            close_read_session(db)
+        refreshed_at = datetime.now(timezone.utc)
+        # One assignment, so readers always see a consistent set of tables.
+        self._state = (tables, refreshed_at, time.monotonic())
+        return refreshed_at
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def get(self) -> tuple[dict, datetime]:
+        state = self._state
+        if state is None:
+            with self._lock:
+                if self._state is None:
+                    self.refresh()
+            state = self._state
+        elif time.monotonic() - state[2] > self.ttl_seconds and not self._refreshing:
+            # Serve the current snapshot while a fresh one is built.
+            with self._lock:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        return state[0], state[1]
+
+    @property
+    def refreshed_at(self) -> Optional[datetime]:
+        return self._state[1] if self._state else None
+
+
+snapshot = AnalyticsSnapshot(settings.ANALYTICS_SNAPSHOT_TTL_SECONDS)
+
+
+def run_query(spec: AnalyticsQuery) -> dict:
+    tables, refreshed_at = snapshot.get()
+    result = execute_query(tables[spec.dataset], spec)
+    result["snapshot_refreshed_at"] = refreshed_at
+    return result
+
+
+def refresh_snapshot() -> dict:
+    return {"snapshot_refreshed_at": snapshot.refresh()}
+
+
+def get_query_fields() -> dict:
+    return {
+        name: [{"field": field, "type": kind} for field, _, kind in fields]
+        for name, (fields, _) in DATASETS.items()
+    }
+
+
+trace_module(__name__)
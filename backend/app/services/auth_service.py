@@ -1,10 +1,24 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import Row, delete, exists, or_, select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.models.student import Student
 from app.models.instructor import Instructor
+from app.models.course import Course
+from app.models.waitlist import WaitlistEntry
 from app.schemas.user import StudentSignup, AdminCreateInstructor
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.config import settings
+from app.core.security import (
+    hash_password,
+    verify_password,
+    needs_rehash,
+    dummy_verify,
+)
+from app.services.lookups import instructor_by_user_id, student_by_user_id
+from app.services.session_service import issue_session, revoke_user_sessions, token_response
+from app.core.tracing import trace_module
 
 
 def register_student(db: Session, data: StudentSignup) -> dict:
@@ -31,51 +45,55 @@ def register_student(db: Session, data: StudentSignup) -> dict:
         country=data.country,
     )
     db.add(new_student)
-    db.commit()
-    db.refresh(new_user)
-    db.refresh(new_student)
+    db.flush()
 
-    access_token = create_access_token(
-        data={"sub": new_user.email_id, "role": new_user.role, "user_id": new_user.user_id}
-    )
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "role": new_user.role,
-        "user_id": new_user.user_id,
-    }
+    refresh_token = issue_session(db, new_user.user_id)
+    return token_response(new_user.user_id, new_user.email_id, new_user.role, refresh_token)
 
 
 def login_user(db: Session, email_id: str, password: str, expected_role: str) -> dict:
-    user = db.query(User).filter(User.email_id == email_id).first()
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid email or password",
+    )
+    wrong_portal = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=f"This account is not registered as {expected_role}",
+    )
+
+    # A removed student or instructor keeps the user row until the purge.
+    removed = or_(
+        exists().where(Student.user_id == User.user_id, Student.deleted_at.is_not(None)),
+        exists().where(Instructor.user_id == User.user_id, Instructor.deleted_at.is_not(None)),
+    )
+    user = (
+        db.query(User.user_id, User.password, User.role)
+        .filter(User.email_id == email_id, ~removed)
+        .first()
+    )
 
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password",
-        )
+        dummy_verify(password)
+        raise invalid
+
+    # Rejecting before the hash check is cheaper but tells the caller that the
+    # email exists under another role, so it is opt-in.
+    if user.role != expected_role and settings.LOGIN_REJECT_ROLE_MISMATCH_EARLY:
+        raise wrong_portal
 
     if not verify_password(password, user.password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password",
-        )
+        raise invalid
 
     if user.role != expected_role:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"This account is not registered as {expected_role}",
+        raise wrong_portal
+
+    if needs_rehash(user.password):
+        db.query(User).filter(User.user_id == user.user_id).update(
+            {User.password: hash_password(password)}, synchronize_session=False
         )
 
-    access_token = create_access_token(
-        data={"sub": user.email_id, "role": user.role, "user_id": user.user_id}
-    )
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "role": user.role,
-        "user_id": user.user_id,
-    }
+    refresh_token = issue_session(db, user.user_id)
+    return token_response(user.user_id, email_id, user.role, refresh_token)
 
 
 def create_instructor(db: Session, data: AdminCreateInstructor) -> Instructor:
@@ -100,13 +118,12 @@ def create_instructor(db: Session, data: AdminCreateInstructor) -> Instructor:
         expertise=data.expertise,
     )
     db.add(new_instructor)
-    db.commit()
-    db.refresh(new_instructor)
+    db.flush()
     return new_instructor
 
 
 def get_student_profile(db: Session, user_id: int) -> dict:
-    student = db.query(Student).filter(Student.user_id == user_id).first()
+    student = student_by_user_id(db, user_id)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -124,7 +141,7 @@ def get_student_profile(db: Session, user_id: int) -> dict:
 
 
 def get_instructor_profile(db: Session, user_id: int) -> dict:
-    instructor = db.query(Instructor).filter(Instructor.user_id == user_id).first()
+    instructor = instructor_by_user_id(db, user_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -139,38 +156,40 @@ def get_instructor_profile(db: Session, user_id: int) -> dict:
     }
 
 
-def get_all_students(db: Session) -> list[dict]:
-    students = db.query(Student).all()
-    return [
-        {
-            "student_id": s.student_id,
-            "user_id": s.user_id,
-            "email_id": s.user.email_id,
-            "age": s.age,
-            "skill_level": s.skill_level,
-            "category": s.category,
-            "country": s.country,
-        }
-        for s in students
-    ]
-
-
-def get_all_instructors(db: Session) -> list[dict]:
-    instructors = db.query(Instructor).all()
-    return [
-        {
-            "instructor_id": i.instructor_id,
-            "user_id": i.user_id,
-            "email_id": i.user.email_id,
-            "name": i.name,
-            "expertise": i.expertise,
-        }
-        for i in instructors
-    ]
+def get_all_students(db: Session) -> list[Row]:
+    # Plain rows, validated straight into StudentProfile by the route; no
+    # ORM instances or per-student lazy load of the user.
+    return db.execute(
+        select(
+            Student.student_id,
+            Student.user_id,
+            User.email_id,
+            Student.age,
+            Student.skill_level,
+            Student.category,
+            Student.country,
+        )
+        .join(User, Student.user_id == User.user_id)
+        .where(Student.deleted_at.is_(None))
+    ).all()
+
+
+def get_all_instructors(db: Session) -> list[Row]:
+    return db.execute(
+        select(
+            Instructor.instructor_id,
+            Instructor.user_id,
+            User.email_id,
+            Instructor.name,
+            Instructor.expertise,
+        )
+        .join(User, Instructor.user_id == User.user_id)
+        .where(Instructor.deleted_at.is_(None))
+    ).all()
 
 
 def get_student_by_id(db: Session, student_id: int) -> dict:
-    student = db.query(Student).filter(Student.student_id == student_id).first()
+    student = db.query(Student).filter(Student.student_id == student_id, Student.deleted_at.is_(None)).first()
     if not student:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
     from app.models.enrollment import Enrollment
@@ -195,11 +214,14 @@ def get_student_by_id(db: Session, student_id: int) -> dict:
 
 
 def get_instructor_by_id(db: Session, instructor_id: int) -> dict:
-    instructor = db.query(Instructor).filter(Instructor.instructor_id == instructor_id).first()
+    instructor = (
+        db.query(Instructor)
+        .filter(Instructor.instructor_id == instructor_id, Instructor.deleted_at.is_(None))
+        .first()
+    )
     if not instructor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instructor not found")
-    from app.models.course import Course
-    courses = db.query(Course).filter(Course.instructor_id == instructor_id).all()
+    courses = db.query(Course).filter(Course.instructor_id == instructor_id, Course.deleted_at.is_(None)).all()
     return {
         "instructor_id": instructor.instructor_id,
         "user_id": instructor.user_id,
@@ -218,34 +240,48 @@ def get_instructor_by_id(db: Session, instructor_id: int) -> dict:
     }
 
 
+def _soft_delete_profile(db: Session, model, id_column, profile_id: int) -> Optional[int]:
+    # Marks the profile and signs the user out everywhere. The user row, and
+    # through its cascade the profile, enrollments and the rest, is removed
+    # later by purge_service in bounded batches.
+    removed = db.execute(
+        update(model)
+        .where(id_column == profile_id, model.deleted_at.is_(None))
+        .values(deleted_at=datetime.now(timezone.utc))
+        .returning(model.user_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if removed:
+        revoke_user_sessions(db, removed.user_id)
+        return removed.user_id
+    return None
+
+
 def remove_student(db: Session, student_id: int) -> None:
-    student = db.query(Student).filter(Student.student_id == student_id).first()
-    if not student:
+    if not _soft_delete_profile(db, Student, Student.student_id, student_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found",
         )
-    user = db.query(User).filter(User.user_id == student.user_id).first()
-
-    from app.models.enrollment import Enrollment
-    db.query(Enrollment).filter(Enrollment.student_id == student_id).delete()
-
-    db.delete(student)
-    if user:
-        db.delete(user)
-    db.commit()
+    # Off the waitlists right away so nobody promotes a removed student.
+    db.execute(
+        delete(WaitlistEntry)
+        .where(WaitlistEntry.student_id == student_id)
+        .execution_options(synchronize_session=False)
+    )
 
 
 def remove_instructor(db: Session, instructor_id: int) -> None:
-    instructor = db.query(Instructor).filter(Instructor.instructor_id == instructor_id).first()
-    if not instructor:
+    if not _soft_delete_profile(db, Instructor, Instructor.instructor_id, instructor_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instructor not found")
-    user = db.query(User).filter(User.user_id == instructor.user_id).first()
+    # An instructor has a handful of courses; unassign them now rather than
+    # showing a removed instructor until the purge.
+    db.execute(
+        update(Course)
+        .where(Course.instructor_id == instructor_id)
+        .values(instructor_id=None, version=Course.version + 1)
+        .execution_options(synchronize_session=False)
+    )
 
-    from app.models.course import Course
-    db.query(Course).filter(Course.instructor_id == instructor_id).update({Course.instructor_id: None})
 
-    db.delete(instructor)
-    if user:
-        db.delete(user)
-    db.commit()
+trace_module(__name__)
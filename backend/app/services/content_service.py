@@ -0,0 +1,186 @@
+import hashlib
+import hmac
+import mimetypes
+import os
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+from fastapi import HTTPException, Request, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.pubsub import queue_event
+from app.database import after_commit, after_rollback
+from app.models.content import Content
+from app.core.tracing import trace_module
+
+CONTENT_COLUMNS = (
+    Content.content_id,
+    Content.course_id,
+    Content.type,
+    Content.content_url,
+    Content.file_path,
+    Content.file_name,
+    Content.file_size,
+    Content.media_type,
+    Content.link_status,
+    Content.link_checked_at,
+)
+
+
+def storage_root() -> Path:
+    return Path(settings.CONTENT_STORAGE_DIR).resolve()
+
+
+def _signature(content_id: int, expires: int) -> str:
+    message = f"content:{content_id}:{expires}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_content_url(request: Request, content_id: int, ttl: Optional[int] = None) -> str:
+    ttl = ttl or settings.CONTENT_URL_TTL_SECONDS
+    # Expiry is rounded up to a quarter of the TTL, so listings within that
+    # window hand out the same URL and the browser cache keeps working.
+    step = max(ttl // 4, 1)
+    expires = (int(time.time()) + ttl) // step * step + step
+    url = request.url_for("download_content_file", content_id=content_id)
+    return f"{url}?expires={expires}&signature={_signature(content_id, expires)}"
+
+
+def verify_signature(content_id: int, expires: int, signature: str) -> bool:
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(_signature(content_id, expires), signature)
+
+
+def list_course_content(db: Session, request: Request, course_id: int) -> list[dict]:
+    rows = db.execute(select(*CONTENT_COLUMNS).where(Content.course_id == course_id)).all()
+    items = []
+    for row in rows:
+        item = row._asdict()
+        if item.pop("file_path"):
+            item["content_url"] = sign_content_url(request, row.content_id)
+        items.append(item)
+    return items
+
+
+def _store(source, destination: Path, limit: int) -> tuple[int, str]:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    partial = destination.with_name(destination.name + ".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(partial, "wb") as out:
+            while chunk := source.read(1024 * 1024):
+                size += len(chunk)
+                if size > limit:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File is larger than {limit} bytes",
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+        os.replace(partial, destination)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return size, digest.hexdigest()
+
+
+async def store_upload(db: Session, course_id: int, content_type: str, upload: UploadFile) -> Content:
+    name = os.path.basename(upload.filename or "") or "upload"
+    relative = f"{course_id}/{uuid.uuid4().hex}{Path(name).suffix.lower()}"
+    destination = storage_root() / relative
+    size, checksum = await run_in_threadpool(
+        _store, upload.file, destination, settings.CONTENT_MAX_UPLOAD_BYTES
+    )
+    after_rollback(db, lambda: destination.unlink(missing_ok=True))
+
+    content = Content(
+        course_id=course_id,
+        type=content_type,
+        content_url="",
+        file_path=relative,
+        file_name=name,
+        file_size=size,
+        media_type=upload.content_type or mimetypes.guess_type(name)[0] or "application/octet-stream",
+        checksum=checksum,
+    )
+    db.add(content)
+    db.flush()
+    content.content_url = f"/api/content/files/{content.content_id}"
+    db.flush()
+    queue_event(
+        db, "content.added",
+        course_id=course_id,
+        content_id=content.content_id,
+        content_type=content.type,
+        content_url=content.content_url,
+    )
+    return content
+
+
+def delete_stored_file(db: Session, content: Content) -> None:
+    if content.file_path:
+        path = storage_root() / content.file_path
+        after_commit(db, lambda: path.unlink(missing_ok=True))
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: the compression middleware hands out W/ tags.
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return if_none_match.strip() == "*" or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def serve_content_file(db: Session, request: Request, content_id: int, expires: int, signature: str) -> Response:
+    if not verify_signature(content_id, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired link")
+    row = db.execute(
+        select(Content.file_path, Content.file_name, Content.media_type, Content.checksum)
+        .where(Content.content_id == content_id)
+    ).first()
+    if not row or not row.file_path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    path = storage_root() / row.file_path
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+
+    etag = f'"{row.checksum}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        # The URL itself stops working at `expires`, so never cache past it.
+        "Cache-Control": f"private, max-age={max(expires - int(time.time()), 0)}",
+    }
+    if _not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if settings.CONTENT_ACCEL_REDIRECT_PREFIX:
+        # nginx serves the bytes (sendfile, ranges) from an internal location.
+        headers["X-Accel-Redirect"] = settings.CONTENT_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + row.file_path
+        return Response(media_type=row.media_type, headers=headers)
+    return FileResponse(
+        path,
+        media_type=row.media_type,
+        headers=headers,
+        filename=row.file_name,
+        stat_result=stat_result,
+        content_disposition_type="inline",
+    )
+
+
+trace_module(__name__)
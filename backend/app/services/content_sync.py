@@ -0,0 +1,126 @@
+import json
+from pathlib import Path
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from app.core.pubsub import queue_event
+from app.models.content import Content
+from app.models.course import Course
+from app.schemas.course import ContentManifest
+from app.core.tracing import trace_module
+
+BATCH_SIZE = 1000
+
+
+def load_manifest(path: str) -> ContentManifest:
+    text = Path(path).read_text(encoding="utf-8")
+    if path.endswith((".yaml", ".yml")):
+        import yaml  # optional: pip install pyyaml (ships with uvicorn[standard])
+
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    return ContentManifest.model_validate(data)
+
+
+def _resolve_courses(db: Session, manifest: ContentManifest) -> list[int]:
+    names = {c.course_name for c in manifest.courses if c.course_id is None and c.course_name}
+    by_name = dict(
+        db.execute(select(Course.course_name, Course.course_id).where(
+            Course.course_name.in_(names), Course.deleted_at.is_(None)
+        )).all()
+    ) if names else {}
+    ids = [c.course_id if c.course_id is not None else by_name.get(c.course_name) for c in manifest.courses]
+
+    known = set(db.scalars(select(Course.course_id).where(
+        Course.course_id.in_([i for i in ids if i is not None]), Course.deleted_at.is_(None)
+    )))
+    unknown = [
+        c.course_id if c.course_id is not None else c.course_name
+        for c, course_id in zip(manifest.courses, ids)
+        if course_id not in known
+    ]
+    if unknown:
+        raise ValueError(f"Unknown course(s) in manifest: {', '.join(map(str, unknown))}")
+    if len(set(ids)) != len(ids):
+        raise ValueError("A course is listed more than once in the manifest")
+    return ids
+
+
+def plan_content_sync(db: Session, manifest: ContentManifest, prune: bool = False) -> dict:
+    # Keyed by (course_id, url). Only link rows are managed here; uploaded
+    # files are left alone. With prune, link rows of courses missing from
+    # the manifest are deleted too, like the old delete-everything script.
+    course_ids = _resolve_courses(db, manifest)
+    desired: dict[tuple[int, str], str] = {}
+    for course_id, course in zip(course_ids, manifest.courses):
+        for item in course.content:
+            key = (course_id, item.url)
+            if key in desired:
+                raise ValueError(f"Duplicate url for course {course_id}: {item.url}")
+            desired[key] = item.type
+
+    stmt = select(Content.content_id, Content.course_id, Content.content_url, Content.type).where(
+        Content.file_path.is_(None)
+    )
+    if not prune:
+        stmt = stmt.where(Content.course_id.in_(course_ids))
+
+    plan = {"insert": [], "update": [], "delete": [], "unchanged": 0}
+    seen = set()
+    for row in db.execute(stmt.order_by(Content.content_id)):
+        key = (row.course_id, row.content_url)
+        if key not in desired or key in seen:
+            plan["delete"].append({"content_id": row.content_id, "course_id": row.course_id})
+        elif desired[key] != row.type:
+            plan["update"].append({"content_id": row.content_id, "course_id": row.course_id, "type": desired[key]})
+        else:
+            plan["unchanged"] += 1
+        seen.add(key)
+    plan["insert"] = [
+        {"course_id": course_id, "content_url": url, "type": content_type}
+        for (course_id, url), content_type in desired.items()
+        if (course_id, url) not in seen
+    ]
+    return plan
+
+
+def _batches(rows: list, size: int = BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def apply_content_sync(db: Session, plan: dict) -> None:
+    for batch in _batches(plan["delete"]):
+        db.execute(delete(Content).where(Content.content_id.in_([r["content_id"] for r in batch])))
+        for row in batch:
+            queue_event(db, "content.deleted", course_id=row["course_id"], content_id=row["content_id"])
+    for batch in _batches(plan["update"]):
+        db.execute(update(Content), [{"content_id": r["content_id"], "type": r["type"]} for r in batch])
+    for batch in _batches(plan["insert"]):
+        added = db.execute(
+            insert(Content).returning(Content.content_id, Content.course_id, Content.type, Content.content_url),
+            batch,
+        )
+        for row in added:
+            queue_event(
+                db, "content.added",
+                course_id=row.course_id,
+                content_id=row.content_id,
+                content_type=row.type,
+                content_url=row.content_url,
+            )
+
+
+def sync_content(db: Session, manifest: ContentManifest, prune: bool = False, dry_run: bool = False) -> dict:
+    plan = plan_content_sync(db, manifest, prune=prune)
+    if not dry_run:
+        apply_content_sync(db, plan)
+    return {
+        "inserted": len(plan["insert"]),
+        "updated": len(plan["update"]),
+        "deleted": len(plan["delete"]),
+        "unchanged": plan["unchanged"],
+    }
+
+
+trace_module(__name__)
@@ -1,15 +1,18 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import Row, func, select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.core.preconditions import conflict
 from app.models.course import Course
-from app.models.instructor import Instructor
 from app.models.university import University
 from app.schemas.course import CourseCreate
+from app.services.lookups import course_by_id, instructor_by_id
+from app.core.tracing import trace_module
 
 
 def create_course(db: Session, course_data: CourseCreate) -> Course:
-    instructor = db.query(Instructor).filter(
-        Instructor.instructor_id == course_data.instructor_id
-    ).first()
+    instructor = instructor_by_id(db, course_data.instructor_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -31,19 +34,34 @@ def create_course(db: Session, course_data: CourseCreate) -> Course:
         program_type=course_data.program_type,
         instructor_id=course_data.instructor_id,
         university_id=course_data.university_id,
+        capacity=course_data.capacity,
     )
     db.add(new_course)
-    db.commit()
-    db.refresh(new_course)
+    db.flush()
     return new_course
 
 
-def get_all_courses(db: Session) -> list[Course]:
-    return db.query(Course).all()
+COURSE_COLUMNS = (
+    Course.course_id,
+    Course.course_name,
+    Course.duration,
+    Course.program_type,
+    Course.instructor_id,
+    Course.university_id,
+    Course.capacity,
+    Course.seats_taken,
+    Course.version,
+)
+
+
+def get_all_courses(db: Session) -> list[Row]:
+    return db.execute(
+        select(*COURSE_COLUMNS).where(Course.deleted_at.is_(None)).order_by(Course.course_id)
+    ).all()
 
 
 def get_course_by_id(db: Session, course_id: int) -> Course:
-    course = db.query(Course).filter(Course.course_id == course_id).first()
+    course = course_by_id(db, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -52,64 +70,81 @@ def get_course_by_id(db: Session, course_id: int) -> Course:
     return course
 
 
-def get_courses_by_instructor(db: Session, instructor_id: int) -> list[Course]:
-    return db.query(Course).filter(Course.instructor_id == instructor_id).all()
+def get_courses_by_instructor(db: Session, instructor_id: int) -> list[Row]:
+    return db.execute(
+        select(*COURSE_COLUMNS)
+        .where(Course.instructor_id == instructor_id, Course.deleted_at.is_(None))
+        .order_by(Course.course_id)
+    ).all()
 
 
 def delete_course(db: Session, course_id: int) -> None:
-    course = db.query(Course).filter(Course.course_id == course_id).first()
-    if not course:
+    # Only marks the row. Enrollments, content and the rest are removed by
+    # purge_service in small batches, so this never waits on the cascade.
+    deleted = db.execute(
+        update(Course)
+        .where(Course.course_id == course_id, Course.deleted_at.is_(None))
+        .values(deleted_at=datetime.now(timezone.utc), version=Course.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if not deleted.rowcount:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found",
         )
 
-    from app.models.enrollment import Enrollment
-    from app.models.content import Content
-    from app.models.course_topic import CourseTopic
-    from app.models.textbook_used import TextbookUsed
-
-    db.query(Enrollment).filter(Enrollment.course_id == course_id).delete()
-    db.query(Content).filter(Content.course_id == course_id).delete()
-    db.query(CourseTopic).filter(CourseTopic.course_id == course_id).delete()
-    db.query(TextbookUsed).filter(TextbookUsed.course_id == course_id).delete()
-
-    db.delete(course)
-    db.commit()
 
-
-def assign_instructor(db: Session, course_id: int, instructor_id: int) -> Course:
-    course = db.query(Course).filter(Course.course_id == course_id).first()
-    if not course:
+def update_course(db: Session, course_id: int, expected_version: Optional[int] = None, **values) -> Row:
+    # With If-Match the UPDATE only matches the version the client saw;
+    # either way the version moves on so older ETags stop matching.
+    conditions = [Course.course_id == course_id, Course.deleted_at.is_(None)]
+    if expected_version is not None:
+        conditions.append(Course.version == expected_version)
+    updated = db.execute(
+        update(Course)
+        .where(*conditions)
+        .values(**values, version=Course.version + 1)
+        .returning(*COURSE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if updated:
+        return updated
+    current = db.scalar(
+        select(Course.version).where(Course.course_id == course_id, Course.deleted_at.is_(None))
+    )
+    if current is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found",
         )
+    raise conflict("Course", current)
 
-    instructor = db.query(Instructor).filter(
-        Instructor.instructor_id == instructor_id
-    ).first()
+
+def assign_instructor(
+    db: Session, course_id: int, instructor_id: int, expected_version: Optional[int] = None
+) -> Row:
+    instructor = instructor_by_id(db, instructor_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instructor not found",
         )
-
-    course.instructor_id = instructor_id
-    db.commit()
-    db.refresh(course)
-    return course
+    return update_course(db, course_id, expected_version, instructor_id=instructor_id)
 
 
 def get_course_detail(db: Session, course_id: int) -> dict:
-    course = db.query(Course).filter(Course.course_id == course_id).first()
+    course = course_by_id(db, course_id)
     if not course:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
 
     from app.models.enrollment import Enrollment
+    from app.models.waitlist import WaitlistEntry
     enrollments = (
         db.query(Enrollment).filter(Enrollment.course_id == course_id).all()
     )
+    waitlisted = db.scalar(
+        select(func.count()).select_from(WaitlistEntry).where(WaitlistEntry.course_id == course_id)
+    )
 
     return {
         "course_id": course.course_id,
@@ -121,6 +156,10 @@ def get_course_detail(db: Session, course_id: int) -> dict:
         "instructor_email": course.instructor.user.email_id if course.instructor and course.instructor.user else None,
         "university_id": course.university_id,
         "university_name": course.university.name if course.university else "Unknown",
+        "capacity": course.capacity,
+        "seats_taken": course.seats_taken,
+        "version": course.version,
+        "waitlisted": waitlisted,
         "enrolled_students": [
             {
                 "student_id": e.student_id,
@@ -130,3 +169,6 @@ def get_course_detail(db: Session, course_id: int) -> dict:
             for e in enrollments
         ],
     }
+
+
+trace_module(__name__)
@@ -1,121 +1,313 @@
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Optional, Union
+from sqlalchemy import Row, delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
 from fastapi import HTTPException, status
 from app.models.enrollment import Enrollment
 from app.models.student import Student
 from app.models.course import Course
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.core.preconditions import conflict
+from app.core.pubsub import queue_event
 from app.schemas.enrollment import EnrollmentCreate
+from app.services.course_service import update_course
+from app.services.grading_service import passed_expr
+from app.services.lookups import enrollment_preconditions
+from app.services.trend_service import record_drops, record_event, ENROLLED, DROPPED, GRADED
+from app.core.tracing import trace_module
 
 
-def enroll_student(db: Session, enrollment_data: EnrollmentCreate) -> Enrollment:
-    student = db.query(Student).filter(
-        Student.student_id == enrollment_data.student_id
-    ).first()
-    if not student:
+def _claim_seat(db: Session, course_id: int) -> bool:
+    # One conditional UPDATE. Concurrent claims queue on the course row lock
+    # and the WHERE is re-checked against the row they get, so seats_taken
+    # never passes capacity and nobody has to retry.
+    return db.execute(
+        update(Course)
+        .where(
+            Course.course_id == course_id,
+            Course.deleted_at.is_(None),
+            or_(Course.capacity.is_(None), Course.seats_taken < Course.capacity),
+        )
+        .values(seats_taken=Course.seats_taken + 1)
+        .returning(Course.seats_taken)
+        .execution_options(synchronize_session=False)
+    ).first() is not None
+
+
+def _release_seat(db: Session, course_id: int) -> None:
+    db.execute(
+        update(Course)
+        .where(Course.course_id == course_id)
+        .values(seats_taken=Course.seats_taken - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _lock_course(db: Session, course_id: int) -> None:
+    db.execute(select(Course.course_id).where(Course.course_id == course_id).with_for_update())
+
+
+def _add_enrollment(db: Session, student_id: int, course_id: int) -> Enrollment:
+    now = datetime.now(timezone.utc)
+    enrollment = Enrollment(
+        student_id=student_id,
+        course_id=course_id,
+        evaluation_score=0.0,
+        passed=passed_expr(0.0, course_id),
+        enrolled_at=now,
+    )
+    db.add(enrollment)
+    record_event(db, ENROLLED, student_id, course_id, occurred_at=now)
+    db.flush()
+    queue_event(db, "enrollment.created", course_id=course_id, student_id=student_id)
+    return enrollment
+
+
+def _waitlist_position(db: Session, course_id: int, entry_id: int) -> int:
+    return db.scalar(
+        select(func.count())
+        .select_from(WaitlistEntry)
+        .where(WaitlistEntry.course_id == course_id, WaitlistEntry.entry_id <= entry_id)
+    )
+
+
+def _join_waitlist(db: Session, student_id: int, course_id: int) -> dict:
+    entry = WaitlistEntry(student_id=student_id, course_id=course_id)
+    db.add(entry)
+    db.flush()
+    return {
+        "student_id": student_id,
+        "course_id": course_id,
+        "position": _waitlist_position(db, course_id, entry.entry_id),
+        "status": "waitlisted",
+    }
+
+
+def _promote_waitlist(db: Session, course_id: int) -> list[int]:
+    # Callers already hold the course row lock (from the UPDATE that freed
+    # or added seats), so enrollers and other promoters wait behind us.
+    promoted = []
+    while True:
+        head = db.execute(
+            select(WaitlistEntry.entry_id, WaitlistEntry.student_id)
+            .where(WaitlistEntry.course_id == course_id)
+            .order_by(WaitlistEntry.entry_id)
+            .limit(1)
+        ).first()
+        if head is None or not _claim_seat(db, course_id):
+            return promoted
+        db.execute(delete(WaitlistEntry).where(WaitlistEntry.entry_id == head.entry_id))
+        _add_enrollment(db, head.student_id, course_id)
+        promoted.append(head.student_id)
+
+
+def enroll_student(db: Session, enrollment_data: EnrollmentCreate) -> Union[Enrollment, dict]:
+    student_id, course_id = enrollment_data.student_id, enrollment_data.course_id
+    student_exists, course_exists, already_enrolled = enrollment_preconditions(
+        db, student_id, course_id
+    )
+    if not student_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found",
         )
-
-    course = db.query(Course).filter(
-        Course.course_id == enrollment_data.course_id
-    ).first()
-    if not course:
+    if not course_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found",
         )
-
-    existing = (
-        db.query(Enrollment)
-        .filter(
-            Enrollment.student_id == enrollment_data.student_id,
-            Enrollment.course_id == enrollment_data.course_id,
-        )
-        .first()
-    )
-    if existing:
+    if already_enrolled:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Student is already enrolled in this course",
         )
 
-    new_enrollment = Enrollment(
-        student_id=enrollment_data.student_id,
-        course_id=enrollment_data.course_id,
-        evaluation_score=0.0,
-    )
-    db.add(new_enrollment)
-    db.commit()
-    db.refresh(new_enrollment)
-    return new_enrollment
-
-
-def drop_student(db: Session, student_id: int, course_id: int) -> None:
-    enrollment = (
-        db.query(Enrollment)
-        .filter(
-            Enrollment.student_id == student_id,
-            Enrollment.course_id == course_id,
+    try:
+        if not _claim_seat(db, course_id):
+            # Full. Lock the course before queueing so a concurrent drop
+            # either commits first (and the second claim gets its seat) or
+            # sees this entry when it promotes from the waitlist.
+            _lock_course(db, course_id)
+            if not _claim_seat(db, course_id):
+                return _join_waitlist(db, student_id, course_id)
+        return _add_enrollment(db, student_id, course_id)
+    except IntegrityError:
+        # A concurrent request for the same student won; get_db's rollback
+        # also gives back the seat claimed above.
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Student is already enrolled in or waitlisted for this course",
         )
-        .first()
-    )
-    if not enrollment:
+
+
+def drop_student(db: Session, student_id: int, course_id: int) -> list[int]:
+    dropped = db.execute(
+        delete(Enrollment)
+        .where(Enrollment.student_id == student_id, Enrollment.course_id == course_id)
+        .returning(Enrollment.evaluation_score)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if not dropped:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Enrollment not found",
         )
-    db.delete(enrollment)
-    db.commit()
+    # Seat first, rollups after: the same lock order as enroll_student.
+    _release_seat(db, course_id)
+    record_event(
+        db, DROPPED, student_id, course_id, previous_score=dropped.evaluation_score
+    )
+    queue_event(db, "enrollment.dropped", course_id=course_id, student_id=student_id)
+    return _promote_waitlist(db, course_id)
+
+
+def purge_student_enrollments(db: Session, student_id: int, limit: int) -> int:
+    # For a removed student, one batch at a time: each enrollment goes with
+    # its seat, like a drop. Course id order keeps the lock order stable.
+    course_ids = db.scalars(
+        select(Enrollment.course_id)
+        .where(Enrollment.student_id == student_id)
+        .order_by(Enrollment.course_id)
+        .limit(limit)
+    ).all()
+    dropped = []
+    for course_id in course_ids:
+        removed = db.execute(
+            delete(Enrollment)
+            .where(Enrollment.student_id == student_id, Enrollment.course_id == course_id)
+            .returning(Enrollment.evaluation_score)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if removed is None:
+            continue  # dropped, or purged by someone else, since the SELECT
+        _release_seat(db, course_id)
+        _promote_waitlist(db, course_id)
+        dropped.append((student_id, course_id, removed.evaluation_score))
+    record_drops(db, dropped)
+    return len(course_ids)
 
 
-def get_enrollments_by_student(db: Session, student_id: int) -> list[dict]:
-    enrollments = (
-        db.query(Enrollment)
-        .filter(Enrollment.student_id == student_id)
-        .all()
+def set_capacity(
+    db: Session, course_id: int, capacity: Optional[int], expected_version: Optional[int] = None
+) -> dict:
+    course = update_course(db, course_id, expected_version, capacity=capacity)
+    # Lowering capacity never removes anyone; new enrollments wait until
+    # drops bring seats_taken back under it.
+    promoted = _promote_waitlist(db, course_id)
+    return {
+        **course._mapping,
+        "seats_taken": course.seats_taken + len(promoted),
+        "promoted": promoted,
+    }
+
+
+def get_waitlist_by_student(db: Session, student_id: int) -> list[Row]:
+    ahead = aliased(WaitlistEntry)
+    position = (
+        select(func.count())
+        .select_from(ahead)
+        .where(ahead.course_id == WaitlistEntry.course_id, ahead.entry_id <= WaitlistEntry.entry_id)
+        .scalar_subquery()
     )
-    return [
-        {
-            "student_id": e.student_id,
-            "course_id": e.course_id,
-            "course_name": e.course.course_name,
-            "evaluation_score": e.evaluation_score,
-        }
-        for e in enrollments
-    ]
-
-
-def get_enrollments_by_course(db: Session, course_id: int) -> list[dict]:
-    enrollments = (
-        db.query(Enrollment)
-        .filter(Enrollment.course_id == course_id)
-        .all()
+    return db.execute(
+        select(
+            WaitlistEntry.course_id,
+            Course.course_name,
+            position.label("position"),
+            WaitlistEntry.joined_at,
+        )
+        .join(Course, WaitlistEntry.course_id == Course.course_id)
+        .where(WaitlistEntry.student_id == student_id, Course.deleted_at.is_(None))
+        .order_by(WaitlistEntry.entry_id)
+    ).all()
+
+
+def leave_waitlist(db: Session, student_id: int, course_id: int) -> None:
+    left = db.execute(
+        delete(WaitlistEntry)
+        .where(WaitlistEntry.student_id == student_id, WaitlistEntry.course_id == course_id)
+        .execution_options(synchronize_session=False)
     )
-    return [
-        {
-            "student_id": e.student_id,
-            "course_id": e.course_id,
-            "evaluation_score": e.evaluation_score,
-            "student_name": e.student.user.email_id if e.student and e.student.user else None,
-            "student_email": e.student.user.email_id if e.student and e.student.user else None,
-        }
-        for e in enrollments
-    ]
-
-
-def grade_student(db: Session, course_id: int, student_id: int, score: float) -> dict:
-    enrollment = (
-        db.query(Enrollment)
-        .filter(Enrollment.course_id == course_id, Enrollment.student_id == student_id)
-        .first()
+    if not left.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not on the waitlist for this course",
+        )
+
+
+def get_enrollments_by_student(db: Session, student_id: int) -> list[Row]:
+    return db.execute(
+        select(
+            Enrollment.student_id,
+            Enrollment.course_id,
+            Course.course_name,
+            Enrollment.evaluation_score,
+        )
+        .join(Course, Enrollment.course_id == Course.course_id)
+        .where(Enrollment.student_id == student_id, Course.deleted_at.is_(None))
+    ).all()
+
+
+def get_enrollments_by_course(db: Session, course_id: int) -> list[Row]:
+    return db.execute(
+        select(
+            Enrollment.student_id,
+            Enrollment.course_id,
+            Enrollment.evaluation_score,
+            User.email_id.label("student_name"),
+            User.email_id.label("student_email"),
+            Enrollment.version,
+        )
+        .outerjoin(Student, Enrollment.student_id == Student.student_id)
+        .outerjoin(User, Student.user_id == User.user_id)
+        .where(Enrollment.course_id == course_id, Student.deleted_at.is_(None))
+    ).all()
+
+
+def grade_student(
+    db: Session, course_id: int, student_id: int, score: float, expected_version: Optional[int] = None
+) -> dict:
+    match = (Enrollment.course_id == course_id, Enrollment.student_id == student_id)
+    while True:
+        current = db.execute(
+            select(Enrollment.evaluation_score, Enrollment.version).where(*match)
+        ).first()
+        if not current:
+            raise HTTPException(status_code=404, detail="Enrollment not found")
+        if expected_version is not None and current.version != expected_version:
+            raise conflict("Enrollment", current.version)
+        # Compare-and-set on the version just read: no lock is held between
+        # the read and the write, and a concurrent grade makes this match
+        # nothing instead of being overwritten.
+        graded = db.execute(
+            update(Enrollment)
+            .where(*match, Enrollment.version == current.version)
+            .values(
+                evaluation_score=score,
+                passed=passed_expr(score, course_id),
+                version=Enrollment.version + 1,
+            )
+            .returning(
+                Enrollment.student_id,
+                Enrollment.course_id,
+                Enrollment.evaluation_score,
+                Enrollment.passed,
+                Enrollment.version,
+            )
+            .execution_options(synchronize_session=False)
+        ).first()
+        if graded:
+            break
+        # Lost the race. Re-read: with If-Match that ends in a 409 above,
+        # without it the retry records the score it actually replaced.
+    record_event(
+        db, GRADED, student_id, course_id,
+        score=score, previous_score=current.evaluation_score,
     )
-    if not enrollment:
-        raise HTTPException(status_code=404, detail="Enrollment not found")
-    enrollment.evaluation_score = score
-    db.commit()
-    db.refresh(enrollment)
-    return {
-        "student_id": enrollment.student_id,
-        "course_id": enrollment.course_id,
-        "evaluation_score": enrollment.evaluation_score,
-    }
+    queue_event(db, "enrollment.graded", **graded._mapping)
+    return dict(graded._mapping)
+
+
+trace_module(__name__)
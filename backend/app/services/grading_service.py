@@ -0,0 +1,178 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func, case
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.grading_policy import GradingPolicy, GradeBand
+from app.schemas.grading import GradingPolicyCreate
+from app.services.lookups import course_by_id
+from app.core.tracing import trace_module
+
+DEFAULT_BANDS = [("A", 85.0), ("B", 70.0), ("C", 55.0), ("D", 40.0), ("F", 0.0)]
+
+
+def pass_threshold_expr(course_id):
+    # Most specific policy wins: course, then program type, then the default.
+    # `course_id` may be a literal or a column, so this also works correlated
+    # inside an UPDATE over enrollments.
+    course_policy = (
+        select(GradingPolicy.pass_threshold)
+        .where(GradingPolicy.course_id == course_id)
+        .scalar_subquery()
+    )
+    program_policy = (
+        select(GradingPolicy.pass_threshold)
+        .join(Course, Course.program_type == GradingPolicy.program_type)
+        .where(Course.course_id == course_id, GradingPolicy.course_id.is_(None))
+        .scalar_subquery()
+    )
+    default_policy = (
+        select(GradingPolicy.pass_threshold)
+        .where(GradingPolicy.course_id.is_(None), GradingPolicy.program_type.is_(None))
+        .order_by(GradingPolicy.policy_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return func.coalesce(
+        course_policy, program_policy, default_policy, settings.DEFAULT_PASS_THRESHOLD
+    )
+
+
+def passed_expr(score, course_id):
+    return pass_threshold_expr(course_id) <= score
+
+
+def letter_grade_expr(policy: Optional[GradingPolicy], score_col=Enrollment.evaluation_score):
+    bands = (
+        [(b.letter, b.min_score) for b in policy.bands]
+        if policy is not None and policy.bands
+        else DEFAULT_BANDS
+    )
+    bands = sorted(bands, key=lambda b: b[1], reverse=True)
+    # A score below the lowest band gets no letter rather than that band's:
+    # a policy whose bands stop at 40 has not graded a 25 as a D.
+    return case(
+        *[(score_col >= min_score, letter) for letter, min_score in bands],
+        else_=None,
+    )
+
+
+def resolve_policy(db: Session, course_id: int) -> Optional[GradingPolicy]:
+    course = course_by_id(db, course_id)
+    if not course:
+        return None
+    policy = db.query(GradingPolicy).filter(GradingPolicy.course_id == course_id).first()
+    if policy:
+        return policy
+    policy = db.query(GradingPolicy).filter(
+        GradingPolicy.course_id.is_(None),
+        GradingPolicy.program_type == course.program_type,
+    ).first()
+    if policy:
+        return policy
+    return (
+        db.query(GradingPolicy)
+        .filter(GradingPolicy.course_id.is_(None), GradingPolicy.program_type.is_(None))
+        .order_by(GradingPolicy.policy_id)
+        .first()
+    )
+
+
+def refresh_passed_flags(
+    db: Session, course_id: Optional[int] = None, program_type: Optional[str] = None
+) -> int:
+    stmt = update(Enrollment).values(
+        passed=passed_expr(Enrollment.evaluation_score, Enrollment.course_id)
+    )
+    if course_id is not None:
+        stmt = stmt.where(Enrollment.course_id == course_id)
+    elif program_type is not None:
+        stmt = stmt.where(
+            Enrollment.course_id.in_(
+                select(Course.course_id).where(Course.program_type == program_type)
+            )
+        )
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    return result.rowcount
+
+
+def _policy_to_dict(policy: GradingPolicy) -> dict:
+    return {
+        "policy_id": policy.policy_id,
+        "name": policy.name,
+        "course_id": policy.course_id,
+        "program_type": policy.program_type,
+        "pass_threshold": policy.pass_threshold,
+        "bands": [{"letter": b.letter, "min_score": b.min_score} for b in policy.bands],
+    }
+
+
+def _find_same_scope(db: Session, data: GradingPolicyCreate) -> Optional[GradingPolicy]:
+    query = db.query(GradingPolicy)
+    if data.course_id is not None:
+        return query.filter(GradingPolicy.course_id == data.course_id).first()
+    if data.program_type is not None:
+        return query.filter(
+            GradingPolicy.course_id.is_(None),
+            GradingPolicy.program_type == data.program_type,
+        ).first()
+    return query.filter(
+        GradingPolicy.course_id.is_(None), GradingPolicy.program_type.is_(None)
+    ).first()
+
+
+def get_all_policies(db: Session) -> list[dict]:
+    return [_policy_to_dict(p) for p in db.query(GradingPolicy).order_by(GradingPolicy.policy_id).all()]
+
+
+def save_policy(db: Session, data: GradingPolicyCreate) -> dict:
+    if data.course_id is not None and data.program_type is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A policy applies to either a course or a program type, not both",
+        )
+    if data.course_id is not None:
+        course = course_by_id(db, data.course_id)
+        if not course:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+    policy = _find_same_scope(db, data)
+    if policy is None:
+        policy = GradingPolicy(course_id=data.course_id, program_type=data.program_type)
+        db.add(policy)
+    policy.name = data.name
+    policy.pass_threshold = data.pass_threshold
+    policy.bands = [GradeBand(letter=b.letter, min_score=b.min_score) for b in data.bands]
+    db.flush()
+
+    refresh_passed_flags(db, policy.course_id, policy.program_type)
+    return _policy_to_dict(policy)
+
+
+def delete_policy(db: Session, policy_id: int) -> None:
+    policy = db.query(GradingPolicy).filter(GradingPolicy.policy_id == policy_id).first()
+    if not policy:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Grading policy not found")
+    course_id, program_type = policy.course_id, policy.program_type
+    db.delete(policy)
+    db.flush()
+    refresh_passed_flags(db, course_id, program_type)
+
+
+def ensure_default_policy(db: Session) -> None:
+    exists = db.query(GradingPolicy.policy_id).filter(
+        GradingPolicy.course_id.is_(None), GradingPolicy.program_type.is_(None)
+    ).first()
+    if exists:
+        return
+    db.add(GradingPolicy(
+        name="Default",
+        pass_threshold=settings.DEFAULT_PASS_THRESHOLD,
+        bands=[GradeBand(letter=letter, min_score=score) for letter, score in DEFAULT_BANDS],
+    ))
+    db.flush()
+
+
+trace_module(__name__)
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from app.core.config import settings
+from app.database import engine, replicas
+from app.migrations import MIGRATIONS, current_version
+from app.core.tracing import trace_module
+
+STARTED = time.monotonic()
+
+
+def pool_status(eng: Engine) -> dict:
+    pool = eng.pool
+    if not isinstance(pool, QueuePool):
+        # SQLite's singleton and static pools never make a request wait.
+        return {"size": None, "checked_out": None, "capacity": None, "saturation": 0.0}
+    checked_out = pool.checkedout()
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if pool._max_overflow >= 0 else 0.0,
+    }
+
+
+def ping(eng: Engine, timeout: float) -> dict:
+    started = time.perf_counter()
+    with eng.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f"SET LOCAL statement_timeout = {int(timeout * 1000)}"))
+        version = current_version(conn)
+        conn.rollback()
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2), "version": version}
+
+
+async def check_database(eng: Engine, timeout: float) -> dict:
+    # The pool's own checkout timeout is far longer than a probe should wait,
+    # so an exhausted pool is reported instead of queued on.
+    pool = pool_status(eng)
+    if pool["saturation"] >= 1:
+        return {"ok": False, "latency_ms": None, "version": None, "error": "connection pool exhausted"}
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(ping, eng, timeout), timeout)
+    except asyncio.TimeoutError:
+        return {"ok": False, "latency_ms": None, "version": None, "error": f"no answer within {timeout}s"}
+    except Exception as exc:
+        return {"ok": False, "latency_ms": None, "version": None, "error": type(exc).__name__}
+
+
+def cache_status(refreshed_at: Optional[datetime], ttl_seconds: int) -> dict:
+    if refreshed_at is None:
+        return {"warm": False, "age_seconds": None}
+    age = (datetime.now(timezone.utc) - refreshed_at).total_seconds()
+    return {"warm": age <= ttl_seconds, "age_seconds": round(age, 1)}
+
+
+def caches() -> dict:
+    from app.services.analytics_engine import snapshot
+    from app.services.recommendation_service import recommender
+
+    compiled = engine._compiled_cache
+    return {
+        "analytics_snapshot": cache_status(snapshot.refreshed_at, settings.ANALYTICS_SNAPSHOT_TTL_SECONDS),
+        "recommendations": cache_status(recommender.refreshed_at, settings.RECOMMENDATION_REFRESH_SECONDS),
+        "statements": {
+            "entries": len(compiled) if compiled is not None else 0,
+            "capacity": settings.DB_QUERY_CACHE_SIZE,
+        },
+    }
+
+
+async def readiness() -> dict:
+    timeout = settings.HEALTH_DB_TIMEOUT_SECONDS
+    database, *replica_checks = await asyncio.gather(
+        check_database(engine, timeout),
+        *(check_database(replica, timeout) for replica in replicas.replicas),
+    )
+    pool = pool_status(engine)
+    expected = MIGRATIONS[-1][0]
+    problems = []
+    if not database["ok"]:
+        problems.append(f"database: {database['error']}")
+    elif database["version"] < expected:
+        problems.append(f"schema at migration {database['version']}, code expects {expected}")
+    if pool["saturation"] >= settings.HEALTH_POOL_SATURATION_LIMIT:
+        problems.append(f"connection pool {pool['saturation']:.0%} in use")
+    # Replicas and caches are reported but never fail the probe: reads fall
+    # back to the primary and caches fill on first use.
+    return {
+        "status": "unavailable" if problems else "ready",
+        "problems": problems,
+        "checked_at": datetime.now(timezone.utc),
+        "database": {k: v for k, v in database.items() if k != "version"},
+        "pool": pool,
+        "migrations": {"current": database["version"], "expected": expected},
+        "replicas": [{k: v for k, v in r.items() if k != "version"} for r in replica_checks],
+        "caches": caches(),
+    }
+
+
+class CachedProbe:
+    # Probes from every load balancer and orchestrator share one check per
+    # max_age, so probe traffic cannot add load on the database.
+    def __init__(self, check, max_age: float):
+        self.check = check
+        self.max_age = max_age
+        self._result: Optional[tuple[dict, float]] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> dict:
+        result = self._result
+        if result is None or time.monotonic() - result[1] > self.max_age:
+            async with self._lock:
+                result = self._result
+                if result is None or time.monotonic() - result[1] > self.max_age:
+                    result = (await self.check(), time.monotonic())
+                    self._result = result
+        return result[0]
+
+
+ready_probe = CachedProbe(readiness, settings.HEALTH_CACHE_SECONDS)
+
+
+def liveness() -> dict:
+    return {
+        "status": "alive",
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.monotonic() - STARTED, 1),
+    }
+
+
+trace_module(__name__)
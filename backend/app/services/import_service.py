@@ -0,0 +1,250 @@
+import asyncio
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Optional
+import bcrypt
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.models.user import User
+from app.models.student import Student
+from app.models.instructor import Instructor
+from app.schemas.user import ImportInstructorRow, ImportStudentRow
+from app.core.tracing import trace_module
+
+KINDS = {
+    "instructors": ("instructor", ImportInstructorRow, Instructor, ["name", "expertise"]),
+    "students": ("student", ImportStudentRow, Student, ["age", "skill_level", "category", "country"]),
+}
+
+
+def _hash(password: str, rounds: int) -> str:
+    # Runs in a worker process; kept top-level so it can be pickled.
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        for line in complete:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def _records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple[int, object]]:
+    # Yields (line number, dict) or (line number, error message). CSV needs a
+    # header row; quoted fields may not span lines.
+    header = None
+    line_no = 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            if fmt == "ndjson":
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+            else:
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [h.strip() for h in values]
+                    continue
+                record = {k: v for k, v in zip(header, values) if v != ""}
+        except (ValueError, csv.Error) as exc:
+            yield line_no, f"Could not parse line: {exc}"
+            continue
+        yield line_no, record
+
+
+def _existing_emails(conn: Connection, emails: list[str]) -> set[str]:
+    return set(conn.execute(select(User.email_id).where(User.email_id.in_(emails))).scalars())
+
+
+def _copy_batch(conn: Connection, role: str, profile, fields: list[str], rows: list[dict]) -> set[str]:
+    # COPY into a temp table, then one statement creates users and profiles.
+    # ON CONFLICT covers emails registered since the duplicate check.
+    columns = ["email_id", "password"] + fields
+    types = {c.name: c.type.compile(conn.dialect) for c in profile.__table__.columns}
+    conn.execute(text(
+        "CREATE TEMP TABLE import_staging (email_id TEXT, password TEXT, "
+        + ", ".join(f"{f} {types[f]}" for f in fields)
+        + ") ON COMMIT DROP"
+    ))
+    data = io.StringIO()
+    writer = csv.writer(data)
+    for row in rows:
+        writer.writerow([row[c] for c in columns])
+    data.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY import_staging ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", data)
+    finally:
+        cursor.close()
+
+    profile_columns = ", ".join(fields)
+    staged_columns = ", ".join(f"s.{f}" for f in fields)
+    inserted = conn.execute(text(
+        "WITH new_users AS ("
+        "  INSERT INTO users (email_id, password, role)"
+        "  SELECT email_id, password, :role FROM import_staging"
+        "  ON CONFLICT (email_id) DO NOTHING"
+        "  RETURNING user_id, email_id"
+        "), profiles AS ("
+        f"  INSERT INTO {profile.__tablename__} (user_id, {profile_columns})"
+        f"  SELECT n.user_id, {staged_columns} FROM new_users n JOIN import_staging s USING (email_id)"
+        ")"
+        " SELECT email_id FROM new_users"
+    ), {"role": role}).scalars()
+    return set(inserted)
+
+
+def _insert_users(conn: Connection, role: str, rows: list[dict]) -> list[tuple[int, str]]:
+    # Emails registered since the duplicate check are skipped, not an error
+    # that would abort the batch and the response streaming it.
+    values = [{"email_id": r["email_id"], "password": r["password"], "role": role} for r in rows]
+    dialect = conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(User)
+        stmt = stmt.on_conflict_do_nothing(index_elements=["email_id"]).returning(User.user_id, User.email_id)
+        return [tuple(r) for r in conn.execute(stmt, values).all()]
+    try:
+        with conn.begin_nested():
+            return [tuple(r) for r in conn.execute(insert(User).returning(User.user_id, User.email_id), values).all()]
+    except IntegrityError:
+        pass
+    users = []
+    for value in values:
+        try:
+            with conn.begin_nested():
+                users.append(tuple(conn.execute(insert(User).returning(User.user_id, User.email_id), value).one()))
+        except IntegrityError:
+            continue
+    return users
+
+
+def _insert_batch(conn: Connection, role: str, profile, fields: list[str], rows: list[dict]) -> set[str]:
+    users = _insert_users(conn, role, rows)
+    if not users:
+        return set()
+    by_email = {r["email_id"]: r for r in rows}
+    conn.execute(
+        insert(profile),
+        [{"user_id": user_id, **{f: by_email[email][f] for f in fields}} for user_id, email in users],
+    )
+    return {email for _, email in users}
+
+
+def _write_batch(engine: Engine, role: str, profile, fields: list[str], rows: list[dict]) -> tuple[set[str], set[str]]:
+    with engine.begin() as conn:
+        existing = _existing_emails(conn, [r["email_id"] for r in rows])
+        fresh = [r for r in rows if r["email_id"] not in existing]
+        if not fresh:
+            return set(), existing
+        if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+            return _copy_batch(conn, role, profile, fields, fresh), existing
+        return _insert_batch(conn, role, profile, fields, fresh), existing
+
+
+def _event(kind: str, **fields) -> str:
+    return json.dumps({"type": kind, **fields}) + "\n"
+
+
+async def import_users(
+    engine: Engine,
+    kind: str,
+    chunks: AsyncIterator[bytes],
+    fmt: str = "csv",
+    batch_size: Optional[int] = None,
+    hash_workers: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """Stream NDJSON progress, per-row errors and a final summary."""
+    role, schema, profile, fields = KINDS[kind]
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    rounds = settings.IMPORT_BCRYPT_ROUNDS or settings.BCRYPT_ROUNDS
+    workers = hash_workers or settings.IMPORT_HASH_WORKERS or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    seen: set[str] = set()
+    totals = {"processed": 0, "imported": 0, "failed": 0}
+
+    async def flush(batch: list[tuple[int, dict]]):
+        to_hash = [(i, row) for i, (_, row) in enumerate(batch) if row["password"] is None]
+        hashes = await asyncio.gather(*(
+            loop.run_in_executor(pool, _hash, row.pop("plain"), rounds) for _, row in to_hash
+        ))
+        for (_, row), hashed in zip(to_hash, hashes):
+            row["password"] = hashed
+
+        rows = [row for _, row in batch]
+        inserted, existing = await run_in_threadpool(_write_batch, engine, role, profile, fields, rows)
+        for line_no, row in batch:
+            if row["email_id"] in inserted:
+                totals["imported"] += 1
+                continue
+            totals["failed"] += 1
+            detail = "Email already registered" if row["email_id"] in existing else "Email was registered during the import"
+            yield _event("error", line=line_no, email_id=row["email_id"], detail=detail)
+        yield _event("progress", **totals)
+
+    # Not fork: this process runs threads (span exporter, event listener,
+    # threadpool), and a forked child can inherit a lock one of them held.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+    try:
+        batch: list[tuple[int, dict]] = []
+        async for line_no, record in _records(chunks, fmt):
+            totals["processed"] += 1
+            error = record if isinstance(record, str) else None
+            if error is None:
+                try:
+                    row = schema(**record)
+                except ValidationError as exc:
+                    error = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+                else:
+                    email = row.email_id
+                    if email in seen:
+                        error = "Duplicate email in this file"
+                    elif not row.password and not row.password_hash:
+                        error = "password or password_hash is required"
+                    elif row.password_hash and not row.password_hash.startswith("$2"):
+                        error = "password_hash must be a bcrypt hash"
+            if error:
+                totals["failed"] += 1
+                yield _event("error", line=line_no, detail=error)
+                continue
+
+            seen.add(email)
+            batch.append((line_no, {
+                "email_id": row.email_id,
+                "password": row.password_hash,
+                "plain": row.password,
+                **{f: getattr(row, f) for f in fields},
+            }))
+            if len(batch) >= batch_size:
+                async for event in flush(batch):
+                    yield event
+                batch = []
+
+        if batch:
+            async for event in flush(batch):
+                yield event
+    finally:
+        # Not `with`: its shutdown waits for the workers, which would block the
+        # event loop when a client disconnects mid-import.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    yield _event("summary", **totals)
+
+
+trace_module(__name__)
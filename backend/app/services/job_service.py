@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.database import SessionLocal, open_read_session, close_read_session
+from app.models.report_job import ReportJob
+from app.schemas.jobs import ReportJobCreate
+from app.services.analyst_service import (
+    get_general_statistics,
+    get_courses_summary,
+    get_enrollments_summary,
+    get_course_detail_for_analyst,
+    get_student_detail_for_analyst,
+)
+from app.core.tracing import trace_module
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# report name -> (function, parameters it takes)
+REPORTS = {
+    "statistics": (get_general_statistics, ()),
+    "courses_summary": (get_courses_summary, ()),
+    "enrollments_summary": (get_enrollments_summary, ()),
+    "course_detail": (get_course_detail_for_analyst, ("course_id",)),
+    "student_detail": (get_student_detail_for_analyst, ("student_id",)),
+}
+
+
+def _job_to_dict(job: ReportJob) -> dict:
+    return {
+        "job_id": job.job_id,
+        "report": job.report,
+        "params": job.params,
+        "status": job.status,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "expires_at": job.expires_at,
+        "error": job.error,
+    }
+
+
+def submit_job(db: Session, user_id: int, data: ReportJobCreate) -> dict:
+    _, wanted = REPORTS[data.report]
+    params = {}
+    for name in wanted:
+        value = getattr(data, name)
+        if value is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Report '{data.report}' needs {name}",
+            )
+        params[name] = value
+
+    job = ReportJob(
+        job_id=uuid.uuid4().hex,
+        report=data.report,
+        params=params,
+        status=QUEUED,
+        requested_by=user_id,
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(job)
+    db.flush()
+    return _job_to_dict(job)
+
+
+def _aware(moment: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they were stored as UTC.
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _get_own_job(db: Session, job_id: str, user_id: int) -> ReportJob:
+    job = db.query(ReportJob).filter(
+        ReportJob.job_id == job_id, ReportJob.requested_by == user_id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+def get_job(db: Session, job_id: str, user_id: int) -> dict:
+    return _job_to_dict(_get_own_job(db, job_id, user_id))
+
+
+def get_job_result(db: Session, job_id: str, user_id: int):
+    job = _get_own_job(db, job_id, user_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job failed: {job.error}")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is {job.status}")
+    if job.expires_at and _aware(job.expires_at) <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Job result has expired")
+    return job.result
+
+
+def list_jobs(db: Session, user_id: int, limit: int = 50) -> list[dict]:
+    jobs = (
+        db.query(ReportJob)
+        .filter(ReportJob.requested_by == user_id)
+        .order_by(ReportJob.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return [_job_to_dict(j) for j in jobs]
+
+
+def claim_next_job(db: Session) -> Optional[tuple[str, str, dict]]:
+    # SKIP LOCKED lets every worker in every process poll the same table
+    # without two of them taking the same job. A running job whose lease ran
+    # out belongs to a worker that crashed or was recycled; reports only
+    # read, so running it again is harmless.
+    now = datetime.now(timezone.utc)
+    claimable = or_(
+        ReportJob.status == QUEUED,
+        and_(
+            ReportJob.status == RUNNING,
+            or_(
+                ReportJob.heartbeat_at < now - timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                ReportJob.heartbeat_at.is_(None),
+            ),
+        ),
+    )
+    next_job = (
+        select(ReportJob.job_id)
+        .where(claimable)
+        .order_by(ReportJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    row = db.execute(
+        update(ReportJob)
+        .where(ReportJob.job_id == next_job, claimable)
+        .values(status=RUNNING, started_at=now, heartbeat_at=now)
+        .returning(ReportJob.job_id, ReportJob.report, ReportJob.params)
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+    return tuple(row) if row else None
+
+
+def _finish(job_id: str, **values) -> None:
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(ReportJob)
+            .where(ReportJob.job_id == job_id)
+            .values(finished_at=now, expires_at=now + timedelta(seconds=settings.JOB_RESULT_TTL_SECONDS), **values)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def heartbeat(job_id: str) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(ReportJob)
+            .where(ReportJob.job_id == job_id, ReportJob.status == RUNNING)
+            .values(heartbeat_at=datetime.now(timezone.utc))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _keep_alive(job_id: str, done: threading.Event) -> None:
+    while not done.wait(settings.JOB_LEASE_SECONDS / 3):
+        try:
+            heartbeat(job_id)
+        except Exception:
+            logger.exception("Could not renew the lease on report job %s", job_id)
+
+
+def run_next_job() -> bool:
+    db = SessionLocal()
+    try:
+        claimed = claim_next_job(db)
+    finally:
+        db.close()
+    if claimed is None:
+        return False
+
+    job_id, report, params = claimed
+    func, _ = REPORTS[report]
+    done = threading.Event()
+    threading.Thread(target=_keep_alive, args=(job_id, done), name=f"lease-{job_id}", daemon=True).start()
+    reader = open_read_session()
+    try:
+        result = jsonable_encoder(func(reader, **params))
+    except HTTPException as exc:
+        _finish(job_id, status=FAILED, error=str(exc.detail))
+    except Exception as exc:
+        logger.exception("Report job %s failed", job_id)
+        _finish(job_id, status=FAILED, error=type(exc).__name__)
+    else:
+        _finish(job_id, status=SUCCEEDED, result=result)
+    finally:
+        done.set()
+        close_read_session(reader)
+    return True
+
+
+def purge_expired_jobs(db: Session) -> int:
+    return db.query(ReportJob).filter(
+        ReportJob.expires_at <= datetime.now(timezone.utc)
+    ).delete(synchronize_session=False)
+
+
+def _purge() -> None:
+    db = SessionLocal()
+    try:
+        purge_expired_jobs(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+class JobRunner:
+    def __init__(self, workers: int, poll_seconds: float):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: list[asyncio.Task] = []
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                ran = await asyncio.to_thread(run_next_job)
+            except Exception:
+                logger.exception("Job worker could not claim a job")
+                ran = False
+            if ran:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _janitor(self) -> None:
+        while True:
+            await asyncio.sleep(max(60, settings.JOB_RESULT_TTL_SECONDS / 10))
+            try:
+                await asyncio.to_thread(_purge)
+            except Exception:
+                logger.exception("Could not purge expired report jobs")
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._janitor()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+runner = JobRunner(settings.JOB_WORKERS, settings.JOB_POLL_SECONDS)
+
+
+trace_module(__name__)
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import urlsplit
+import httpx
+from sqlalchemy import and_, bindparam, or_, select, update
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.content import Content
+from app.core.tracing import trace_module
+
+logger = logging.getLogger(__name__)
+
+UNREACHABLE = 0
+USER_AGENT = "QuintetLinkChecker/1.0"
+
+
+def claim_stale_urls(limit: int) -> list[str]:
+    # Every worker runs a checker. The batch is stamped checked as it is
+    # taken, in one UPDATE, so the others see it as fresh and take different
+    # URLs; save_results stamps it again with the outcome. A batch lost to a
+    # crash is picked up one interval later.
+    now = datetime.now(timezone.utc)
+    stale = and_(
+        Content.file_path.is_(None),
+        or_(
+            Content.link_checked_at.is_(None),
+            Content.link_checked_at < now - timedelta(seconds=settings.LINK_CHECK_INTERVAL_SECONDS),
+        ),
+    )
+    batch = select(Content.content_url).where(stale).group_by(Content.content_url).limit(limit)
+    with SessionLocal() as db:
+        urls = db.scalars(
+            update(Content)
+            .where(stale, Content.content_url.in_(batch))
+            .values(link_checked_at=now)
+            .returning(Content.content_url)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+    return list(dict.fromkeys(urls))
+
+
+def save_results(results: dict[str, int]) -> None:
+    # Every row sharing a URL gets the same result; one executemany.
+    checked_at = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.connection().execute(
+            update(Content.__table__)
+            .where(Content.__table__.c.content_url == bindparam("url"), Content.__table__.c.file_path.is_(None))
+            .values(link_status=bindparam("status"), link_checked_at=checked_at),
+            [{"url": url, "status": code} for url, code in results.items()],
+        )
+        db.commit()
+
+
+class LinkChecker:
+    def __init__(self, concurrency: int, per_host: int, timeout: float, batch_size: int = 500):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe(self, client: httpx.AsyncClient, url: str) -> int:
+        try:
+            response = await client.head(url)
+            if response.status_code in (403, 405, 501):
+                # Plenty of servers refuse HEAD but serve GET; ask for one byte.
+                response = await client.get(url, headers={"Range": "bytes=0-0"})
+            return response.status_code
+        except Exception:
+            # Whatever one URL raises (httpx.InvalidURL is not an HTTPError)
+            # marks that link, not the whole batch.
+            return UNREACHABLE
+
+    async def check(self, urls: list[str], transport: Optional[httpx.AsyncBaseTransport] = None) -> dict[str, int]:
+        overall = asyncio.Semaphore(self.concurrency)
+        hosts: dict[str, asyncio.Semaphore] = {}
+
+        async def one(client: httpx.AsyncClient, url: str) -> tuple[str, int]:
+            try:
+                netloc = urlsplit(url).netloc
+            except ValueError:
+                return url, UNREACHABLE
+            host = hosts.setdefault(netloc, asyncio.Semaphore(self.per_host))
+            async with overall, host:
+                return url, await self.probe(client, url)
+
+        async with httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            transport=transport,
+        ) as client:
+            return dict(await asyncio.gather(*(one(client, url) for url in urls)))
+
+    async def sweep(self) -> int:
+        urls = await asyncio.to_thread(claim_stale_urls, self.batch_size)
+        if urls:
+            results = await self.check(urls)
+            await asyncio.to_thread(save_results, results)
+        return len(urls)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                checked = await self.sweep()
+            except Exception:
+                logger.exception("Link check sweep failed")
+                checked = 0
+            if checked < self.batch_size:
+                await asyncio.sleep(settings.LINK_CHECK_POLL_SECONDS)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+link_checker = LinkChecker(
+    settings.LINK_CHECK_CONCURRENCY,
+    settings.LINK_CHECK_PER_HOST,
+    settings.LINK_CHECK_TIMEOUT_SECONDS,
+)
+
+
+trace_module(__name__)
@@ -0,0 +1,55 @@
+from typing import Optional
+from sqlalchemy import exists, lambda_stmt, select
+from sqlalchemy.orm import Session
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.instructor import Instructor
+from app.models.student import Student
+from app.core.tracing import trace_module
+
+# Hot single-row lookups as lambda statements. SQLAlchemy caches the
+# statement by the lambda's code location and only re-extracts the bound
+# values, so repeat calls skip building and hashing a new Query. Soft
+# deleted rows are treated as gone.
+
+
+def student_by_user_id(db: Session, user_id: int) -> Optional[Student]:
+    return db.scalars(
+        lambda_stmt(lambda: select(Student).where(Student.user_id == user_id, Student.deleted_at.is_(None)))
+    ).first()
+
+
+def instructor_by_user_id(db: Session, user_id: int) -> Optional[Instructor]:
+    return db.scalars(
+        lambda_stmt(lambda: select(Instructor).where(
+            Instructor.user_id == user_id, Instructor.deleted_at.is_(None)
+        ))
+    ).first()
+
+
+def instructor_by_id(db: Session, instructor_id: int) -> Optional[Instructor]:
+    return db.scalars(
+        lambda_stmt(lambda: select(Instructor).where(
+            Instructor.instructor_id == instructor_id, Instructor.deleted_at.is_(None)
+        ))
+    ).first()
+
+
+def course_by_id(db: Session, course_id: int) -> Optional[Course]:
+    return db.scalars(
+        lambda_stmt(lambda: select(Course).where(Course.course_id == course_id, Course.deleted_at.is_(None)))
+    ).first()
+
+
+def enrollment_preconditions(db: Session, student_id: int, course_id: int) -> tuple[bool, bool, bool]:
+    # (student exists, course exists, already enrolled) in one round trip.
+    return tuple(db.execute(
+        lambda_stmt(lambda: select(
+            exists().where(Student.student_id == student_id, Student.deleted_at.is_(None)),
+            exists().where(Course.course_id == course_id, Course.deleted_at.is_(None)),
+            exists().where(Enrollment.student_id == student_id, Enrollment.course_id == course_id),
+        ))
+    ).one())
+
+
+trace_module(__name__)
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import SessionLocal, after_commit, try_transaction_lock
+from app.models.content import Content
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.instructor import Instructor
+from app.models.student import Student
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.services.content_service import storage_root
+from app.services.enroll_service import purge_student_enrollments
+from app.services.trend_service import record_drops
+from app.core.tracing import trace_module
+
+logger = logging.getLogger(__name__)
+
+# Removed courses, students and instructors are only marked deleted_at in the
+# request. Their dependents are deleted here, at most `limit` rows per
+# transaction, so no statement holds locks on thousands of rows at once.
+
+
+def _delete_batch(db: Session, model, key, condition, limit: int) -> int:
+    keys = db.scalars(select(key).where(condition).limit(limit)).all()
+    if keys:
+        db.execute(
+            delete(model).where(condition, key.in_(keys)).execution_options(synchronize_session=False)
+        )
+    return len(keys)
+
+
+def _delete_content_batch(db: Session, course_id: int, limit: int) -> int:
+    rows = db.execute(
+        select(Content.content_id, Content.file_path).where(Content.course_id == course_id).limit(limit)
+    ).all()
+    if rows:
+        db.execute(
+            delete(Content)
+            .where(Content.content_id.in_([r.content_id for r in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        paths = [storage_root() / r.file_path for r in rows if r.file_path]
+
+        def unlink_files():
+            for path in paths:
+                path.unlink(missing_ok=True)
+
+        after_commit(db, unlink_files)
+    return len(rows)
+
+
+def _delete_enrollment_batch(db: Session, course_id: int, limit: int) -> int:
+    # Recorded as drops, so the enrollment trend comes back down.
+    rows = db.execute(
+        select(Enrollment.student_id, Enrollment.evaluation_score)
+        .where(Enrollment.course_id == course_id)
+        .limit(limit)
+    ).all()
+    if rows:
+        # Only what this DELETE removed counts as dropped; a row another
+        # purge got to first is not recorded twice.
+        removed = db.execute(
+            delete(Enrollment)
+            .where(Enrollment.course_id == course_id, Enrollment.student_id.in_([r.student_id for r in rows]))
+            .returning(Enrollment.student_id, Enrollment.evaluation_score)
+            .execution_options(synchronize_session=False)
+        ).all()
+        record_drops(db, [(r.student_id, course_id, r.evaluation_score) for r in removed])
+    return len(rows)
+
+
+def _purge_course(db: Session, course_id: int, limit: int) -> int:
+    deleted = (
+        _delete_enrollment_batch(db, course_id, limit)
+        or _delete_batch(db, WaitlistEntry, WaitlistEntry.entry_id, WaitlistEntry.course_id == course_id, limit)
+        or _delete_content_batch(db, course_id, limit)
+    )
+    if deleted:
+        return deleted
+    # Topics, textbooks and a course-level grading policy are a few rows
+    # each; ON DELETE CASCADE takes them with the course.
+    db.execute(delete(Course).where(Course.course_id == course_id))
+    return 1
+
+
+def _purge_user(db: Session, user_id: int) -> int:
+    # Sessions, waitlist entries and the profile go by cascade; anything
+    # large was emptied in earlier batches.
+    db.execute(delete(User).where(User.user_id == user_id))
+    return 1
+
+
+def _next_removed(db: Session, model, *columns) -> Optional[tuple]:
+    # Claimed for this batch's transaction: a purge running in another worker
+    # skips the row and takes the next one, so no two purge the same thing.
+    return db.execute(
+        select(*columns)
+        .where(model.deleted_at.is_not(None))
+        .order_by(model.deleted_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+
+
+def purge_batch(db: Session, limit: int) -> int:
+    # One bounded step of work; returns the rows it deleted, 0 when done.
+    # Every worker runs a purger, but only one purges at a time; the others
+    # find the lock taken and wait for their next poll.
+    if not try_transaction_lock(db, "purge"):
+        return 0
+    course = _next_removed(db, Course, Course.course_id)
+    if course:
+        return _purge_course(db, course.course_id, limit)
+    student = _next_removed(db, Student, Student.student_id, Student.user_id)
+    if student:
+        return purge_student_enrollments(db, student.student_id, limit) or _purge_user(db, student.user_id)
+    instructor = _next_removed(db, Instructor, Instructor.user_id)
+    if instructor:
+        return _purge_user(db, instructor.user_id)
+    return 0
+
+
+class Purger:
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def sweep(self) -> int:
+        total = 0
+        while True:
+            with SessionLocal() as db:
+                deleted = purge_batch(db, self.batch_size)
+                db.commit()
+            if not deleted:
+                return total
+            total += deleted
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                purged = await asyncio.to_thread(self.sweep)
+                if purged:
+                    logger.info("Purged %d soft-deleted rows", purged)
+            except Exception:
+                logger.exception("Purge sweep failed")
+            await asyncio.sleep(settings.PURGE_POLL_SECONDS)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+purger = Purger(settings.PURGE_BATCH_SIZE)
+
+
+trace_module(__name__)
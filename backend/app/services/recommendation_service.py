@@ -0,0 +1,299 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+import numpy as np
+from scipy import sparse
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.pubsub import broker
+from app.database import open_read_session, close_read_session
+from app.models.course import Course
+from app.models.course_topic import CourseTopic
+from app.models.enrollment import Enrollment
+from app.models.student import Student
+from app.core.tracing import trace_module
+
+WEIGHTS = {
+    "co_enrollment": 0.45,
+    "topics": 0.30,
+    "skill": 0.15,
+    "popularity": 0.10,
+}
+# Pseudo-enrollments drawn from the overall skill mix, so a course with two
+# students does not look 100% "Advanced".
+SKILL_SMOOTHING = 5.0
+# Pending co-enrollment deltas are folded into the CSR matrix past this size.
+FOLD_THRESHOLD = 10_000
+
+
+def _cosine_rows(matrix: sparse.csr_array) -> sparse.csr_array:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return sparse.diags_array(inverse) @ matrix
+
+
+class RecommendationModel:
+    def __init__(self, courses: list, course_topics: list, enrollments: list):
+        self.course_ids = np.array([c[0] for c in courses], dtype=np.int64)
+        self.courses = [
+            {"course_id": c[0], "course_name": c[1], "program_type": c[2], "duration": c[3]}
+            for c in courses
+        ]
+        self.index = {course_id: i for i, course_id in enumerate(self.course_ids.tolist())}
+        n = len(self.courses)
+
+        # Course x topic incidence; row-normalised so X @ X.T is cosine.
+        topic_index: dict = {}
+        rows, cols = [], []
+        for course_id, topic_id in course_topics:
+            if course_id in self.index:
+                rows.append(self.index[course_id])
+                cols.append(topic_index.setdefault(topic_id, len(topic_index)))
+        topics = sparse.csr_array(
+            (np.ones(len(rows)), (rows, cols)), shape=(n, max(len(topic_index), 1))
+        )
+        unit = _cosine_rows(topics)
+        self.topic_similarity = (unit @ unit.T).tocsr()
+        self.topic_similarity.setdiag(0)
+        self.topic_similarity.eliminate_zeros()
+
+        # Student x course incidence -> course x course co-enrollment counts.
+        self.enrolled: dict[int, set[int]] = {}
+        level_index: dict = {}
+        student_rows, course_cols, levels = [], [], []
+        for student_id, course_id, skill_level in enrollments:
+            position = self.index.get(course_id)
+            if position is None:
+                continue
+            self.enrolled.setdefault(student_id, set()).add(position)
+            student_rows.append(student_id)
+            course_cols.append(position)
+            levels.append(level_index.setdefault(skill_level, len(level_index)))
+        students = {s: i for i, s in enumerate(self.enrolled)}
+        incidence = sparse.csr_array(
+            (np.ones(len(student_rows)), ([students[s] for s in student_rows], course_cols)),
+            shape=(len(students), n),
+        )
+        co = (incidence.T @ incidence).tocsr()
+        self.counts = co.diagonal().astype(np.float64)
+        co.setdiag(0)
+        co.eliminate_zeros()
+        self.co_enrollment = co
+        self._pending: dict[int, dict[int, int]] = {}
+        self._pending_size = 0
+
+        # Share of each course's students at each skill level, smoothed
+        # towards the catalog-wide mix. Only rebuilt with the model.
+        self.level_index = level_index
+        by_level = np.zeros((max(len(level_index), 1), n))
+        np.add.at(by_level, (levels, course_cols), 1)
+        prior = by_level.sum(axis=1, keepdims=True) / max(len(levels), 1)
+        self.skill_share = (by_level + SKILL_SMOOTHING * prior) / (
+            by_level.sum(axis=0) + SKILL_SMOOTHING
+        )
+
+        self._lock = threading.Lock()
+
+    def _bump(self, position: int, others: set[int], delta: int) -> None:
+        self.counts[position] += delta
+        for other in others:
+            for row, col in ((position, other), (other, position)):
+                pending = self._pending.setdefault(row, {})
+                pending[col] = pending.get(col, 0) + delta
+                self._pending_size += 1
+        if self._pending_size > FOLD_THRESHOLD:
+            self._fold()
+
+    def _fold(self) -> None:
+        rows, cols, values = [], [], []
+        for row, pending in self._pending.items():
+            for col, delta in pending.items():
+                rows.append(row)
+                cols.append(col)
+                values.append(delta)
+        delta = sparse.csr_array((values, (rows, cols)), shape=self.co_enrollment.shape)
+        self.co_enrollment = (self.co_enrollment + delta).tocsr()
+        self.co_enrollment.eliminate_zeros()
+        self._pending.clear()
+        self._pending_size = 0
+
+    def apply(self, payload: dict) -> None:
+        # Idempotent: replaying an event the model already reflects is a no-op.
+        position = self.index.get(payload.get("course_id"))
+        student_id = payload.get("student_id")
+        if position is None or student_id is None:
+            return
+        with self._lock:
+            courses = self.enrolled.setdefault(student_id, set())
+            if payload["type"] == "enrollment.created" and position not in courses:
+                self._bump(position, courses, 1)
+                courses.add(position)
+            elif payload["type"] == "enrollment.dropped" and position in courses:
+                courses.discard(position)
+                self._bump(position, courses, -1)
+
+    def recommend(self, enrolled: list[int], skill_level: Optional[str], limit: int) -> list[dict]:
+        positions = [self.index[c] for c in enrolled if c in self.index]
+        n = len(self.courses)
+        with self._lock:
+            counts = self.counts.copy()
+            rows = self.co_enrollment[positions] if positions else None
+            pending = [(p, dict(self._pending.get(p, ()))) for p in positions]
+
+        inverse = np.divide(1.0, np.sqrt(counts), out=np.zeros(n), where=counts > 0)
+        co_score = np.zeros(n)
+        topic_score = np.zeros(n)
+        if positions:
+            # Cosine over student sets: co[e, j] / sqrt(|e| * |j|).
+            co_score = (inverse[positions] @ rows) * inverse
+            for position, deltas in pending:
+                for col, delta in deltas.items():
+                    co_score[col] += delta * inverse[position] * inverse[col]
+            co_score /= len(positions)
+            topic_score = np.ones(len(positions)) @ self.topic_similarity[positions] / len(positions)
+
+        level = self.level_index.get(skill_level)
+        skill_score = self.skill_share[level] if level is not None else np.zeros(n)
+        popularity = np.log1p(counts) / max(np.log1p(counts.max(initial=0)), 1.0)
+
+        score = (
+            WEIGHTS["co_enrollment"] * co_score
+            + WEIGHTS["topics"] * topic_score
+            + WEIGHTS["skill"] * skill_score
+            + WEIGHTS["popularity"] * popularity
+        )
+        score[positions] = -np.inf
+        candidates = n - len(set(positions))
+        limit = min(limit, candidates)
+        if limit <= 0:
+            return []
+        top = np.argpartition(-score, limit - 1)[:limit]
+        top = top[np.argsort(-score[top], kind="stable")]
+        return [
+            {
+                **self.courses[i],
+                "score": round(float(score[i]), 4),
+                "signals": {
+                    "co_enrollment": round(float(co_score[i]), 4),
+                    "topics": round(float(topic_score[i]), 4),
+                    "skill": round(float(skill_score[i]), 4),
+                    "popularity": round(float(popularity[i]), 4),
+                },
+            }
+            for i in top.tolist()
+        ]
+
+
+def load_model(db: Session, batch_size: int = 10000) -> RecommendationModel:
+    courses = db.execute(
+        select(Course.course_id, Course.course_name, Course.program_type, Course.duration)
+        .where(Course.deleted_at.is_(None))
+        .order_by(Course.course_id)
+    ).all()
+    course_topics = db.execute(select(CourseTopic.course_id, CourseTopic.topic_id)).all()
+    enrollments = []
+    result = db.execute(
+        select(Enrollment.student_id, Enrollment.course_id, Student.skill_level)
+        .join(Student, Enrollment.student_id == Student.student_id)
+        .where(Student.deleted_at.is_(None))
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in result.partitions():
+        enrollments.extend(partition)
+    return RecommendationModel(courses, course_topics, enrollments)
+
+
+class Recommender:
+    # Rebuilt from the database every ttl_seconds; enrollment events patch
+    # the co-enrollment counts in between.
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._state: Optional[tuple[RecommendationModel, datetime, float]] = None
+        self._buffer: Optional[list[dict]] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+        self._refreshing = False
+
+    def refresh(self) -> datetime:
+        with self._build_lock:
+            with self._lock:
+                self._buffer = []
+            try:
+                db = open_read_session()
+                try:
+                    model = load_model(db)
+                finally:
+                    close_read_session(db)
+            except Exception:
+                with self._lock:
+                    self._buffer = None
+                raise
+            refreshed_at = datetime.now(timezone.utc)
+            with self._lock:
+                # Events that landed while loading may or may not be in the
+                # snapshot; apply() skips the ones that already are.
+                for payload in self._buffer:
+                    model.apply(payload)
+                self._buffer = None
+                self._state = (model, refreshed_at, time.monotonic())
+            return refreshed_at
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def apply_event(self, payload: dict) -> None:
+        if payload.get("type") not in ("enrollment.created", "enrollment.dropped"):
+            return
+        with self._lock:
+            if self._buffer is not None:
+                self._buffer.append(payload)
+            state = self._state
+        if state is not None:
+            state[0].apply(payload)
+
+    def get(self) -> RecommendationModel:
+        state = self._state
+        if state is None:
+            with self._build_lock:
+                if self._state is None:
+                    self.refresh()
+            state = self._state
+        elif time.monotonic() - state[2] > self.ttl_seconds and not self._refreshing:
+            # Serve the current model while a fresh one is built.
+            with self._lock:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        return state[0]
+
+    @property
+    def refreshed_at(self) -> Optional[datetime]:
+        return self._state[1] if self._state else None
+
+
+recommender = Recommender(settings.RECOMMENDATION_REFRESH_SECONDS)
+broker.add_listener(recommender.apply_event)
+
+
+def recommend_courses(db: Session, user_id: int, limit: int = 10) -> list[dict]:
+    student = db.execute(
+        lambda_stmt(lambda: select(Student.student_id, Student.skill_level).where(
+            Student.user_id == user_id, Student.deleted_at.is_(None)
+        ))
+    ).first()
+    if not student:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    student_id = student.student_id
+    enrolled = db.scalars(
+        lambda_stmt(lambda: select(Enrollment.course_id).where(Enrollment.student_id == student_id))
+    ).all()
+    return recommender.get().recommend(enrolled, student.skill_level, limit)
+
+
+trace_module(__name__)
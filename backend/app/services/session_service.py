@@ -0,0 +1,103 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.user import User
+from app.models.user_session import UserSession
+from app.core.tracing import trace_module
+
+
+def _hash_token(token: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), token.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _invalid_refresh() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+    )
+
+
+def token_response(user_id: int, email_id: str, role: str, refresh_token: str) -> dict:
+    access_token = create_access_token(
+        data={"sub": email_id, "role": role, "user_id": user_id}
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "role": role,
+        "user_id": user_id,
+        "refresh_token": refresh_token,
+    }
+
+
+def issue_session(db: Session, user_id: int) -> str:
+    token = secrets.token_urlsafe(32)
+    db.add(UserSession(
+        user_id=user_id,
+        token_hash=_hash_token(token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    db.flush()
+    return token
+
+
+def refresh_session(db: Session, refresh_token: str) -> dict:
+    token_hash = _hash_token(refresh_token)
+    now = datetime.now(timezone.utc)
+    row = (
+        db.query(UserSession.session_id, User.user_id, User.email_id, User.role)
+        .join(User, User.user_id == UserSession.user_id)
+        .filter(UserSession.token_hash == token_hash, UserSession.expires_at > now)
+        .first()
+    )
+
+    if not row:
+        # A token that was already rotated away is being replayed: whoever
+        # holds the current one may be an attacker, so end the session. This
+        # is committed here because the 401 below rolls the request back.
+        db.query(UserSession).filter(
+            UserSession.previous_token_hash == token_hash
+        ).delete(synchronize_session=False)
+        db.commit()
+        raise _invalid_refresh()
+
+    new_token = secrets.token_urlsafe(32)
+    rotated = (
+        db.query(UserSession)
+        .filter(UserSession.session_id == row.session_id, UserSession.token_hash == token_hash)
+        .update(
+            {UserSession.token_hash: _hash_token(new_token), UserSession.previous_token_hash: token_hash},
+            synchronize_session=False,
+        )
+    )
+    if not rotated:
+        # Lost a race with a concurrent refresh of the same token.
+        raise _invalid_refresh()
+
+    return token_response(row.user_id, row.email_id, row.role, new_token)
+
+
+def revoke_session(db: Session, refresh_token: str) -> None:
+    db.query(UserSession).filter(
+        UserSession.token_hash == _hash_token(refresh_token)
+    ).delete(synchronize_session=False)
+
+
+def revoke_user_sessions(db: Session, user_id: int) -> None:
+    db.query(UserSession).filter(UserSession.user_id == user_id).delete(synchronize_session=False)
+
+
+def purge_expired_sessions(db: Session) -> int:
+    return (
+        db.query(UserSession)
+        .filter(UserSession.expires_at <= datetime.now(timezone.utc))
+        .delete(synchronize_session=False)
+    )
+
+
+trace_module(__name__)
@@ -0,0 +1,260 @@
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from fastapi import HTTPException, status
+from app.models.enrollment import Enrollment
+from app.models.enrollment_event import EnrollmentEvent, EnrollmentRollup
+from app.core.tracing import trace_module
+
+GRANULARITIES = ("day", "week")
+MAX_BUCKETS = 1000
+
+ENROLLED = "enrolled"
+DROPPED = "dropped"
+GRADED = "graded"
+
+
+def bucket_start(moment: datetime, granularity: str) -> date:
+    day = moment.date()
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _bump_rollup(db: Session, granularity: str, bucket: date, course_id: int, **deltas) -> None:
+    values = {"enrollments": 0, "drops": 0, "grades": 0, "score_sum": 0.0, **deltas}
+    key = {"granularity": granularity, "bucket_start": bucket, "course_id": course_id}
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(EnrollmentRollup).values(**key, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                name: getattr(EnrollmentRollup, name) + getattr(stmt.excluded, name)
+                for name in values
+            },
+        )
+        db.execute(stmt)
+        return
+
+    result = db.execute(
+        update(EnrollmentRollup)
+        .where(*[getattr(EnrollmentRollup, k) == v for k, v in key.items()])
+        .values({name: getattr(EnrollmentRollup, name) + delta for name, delta in values.items()})
+    )
+    if result.rowcount == 0:
+        db.add(EnrollmentRollup(**key, **values))
+        db.flush()
+
+
+def record_event(
+    db: Session,
+    event_type: str,
+    student_id: int,
+    course_id: int,
+    score: Optional[float] = None,
+    previous_score: Optional[float] = None,
+    occurred_at: Optional[datetime] = None,
+) -> None:
+    # Written in the caller's transaction so the log and rollups commit or
+    # roll back together with the enrollment change itself.
+    occurred_at = occurred_at or datetime.now(timezone.utc)
+    db.add(EnrollmentEvent(
+        student_id=student_id,
+        course_id=course_id,
+        event_type=event_type,
+        score=score,
+        previous_score=previous_score,
+        occurred_at=occurred_at,
+    ))
+
+    if event_type == ENROLLED:
+        deltas = {"enrollments": 1}
+    elif event_type == DROPPED:
+        deltas = {"drops": 1}
+    else:
+        deltas = {"grades": 1, "score_sum": score or 0.0}
+
+    for granularity in GRANULARITIES:
+        _bump_rollup(db, granularity, bucket_start(occurred_at, granularity), course_id, **deltas)
+
+
+def record_drops(db: Session, dropped: list[tuple[int, int, Optional[float]]]) -> None:
+    # Bulk record_event(DROPPED) for the purge, which removes enrollments
+    # hundreds at a time: one insert for the log, one rollup bump per course.
+    if not dropped:
+        return
+    occurred_at = datetime.now(timezone.utc)
+    db.execute(insert(EnrollmentEvent), [
+        {
+            "student_id": student_id,
+            "course_id": course_id,
+            "event_type": DROPPED,
+            "score": None,
+            "previous_score": previous_score,
+            "occurred_at": occurred_at,
+        }
+        for student_id, course_id, previous_score in dropped
+    ])
+    for course_id, drops in sorted(Counter(course_id for _, course_id, _ in dropped).items()):
+        for granularity in GRANULARITIES:
+            _bump_rollup(db, granularity, bucket_start(occurred_at, granularity), course_id, drops=drops)
+
+
+def backfill_enrollment_events(db: Session) -> int:
+    # Enrollments older than the event log get the "enrolled" event they
+    # would have had, at enrolled_at or, where that is unknown, now. Without
+    # it the active-enrollment trend starts from zero on existing databases.
+    # One course at a time keeps each read and insert bounded.
+    now = datetime.now(timezone.utc)
+    missing = select(Enrollment.student_id, Enrollment.enrolled_at).where(
+        ~exists().where(
+            EnrollmentEvent.student_id == Enrollment.student_id,
+            EnrollmentEvent.course_id == Enrollment.course_id,
+            EnrollmentEvent.event_type == ENROLLED,
+        )
+    )
+    total = 0
+    for course_id in db.scalars(select(Enrollment.course_id).distinct().order_by(Enrollment.course_id)).all():
+        rows = db.execute(missing.where(Enrollment.course_id == course_id)).all()
+        if not rows:
+            continue
+        counts = Counter()
+        events = []
+        for student_id, enrolled_at in rows:
+            if enrolled_at is None:
+                occurred_at = now
+            elif enrolled_at.tzinfo is None:
+                occurred_at = enrolled_at.replace(tzinfo=timezone.utc)  # SQLite: stored as UTC
+            else:
+                occurred_at = enrolled_at.astimezone(timezone.utc)
+            events.append({
+                "student_id": student_id,
+                "course_id": course_id,
+                "event_type": ENROLLED,
+                "occurred_at": occurred_at,
+            })
+            for granularity in GRANULARITIES:
+                counts[granularity, bucket_start(occurred_at, granularity)] += 1
+        db.execute(insert(EnrollmentEvent), events)
+        for (granularity, bucket), enrollments in sorted(counts.items()):
+            _bump_rollup(db, granularity, bucket, course_id, enrollments=enrollments)
+        total += len(rows)
+    return total
+
+
+def _validate_range(granularity: str, start: date, end: date) -> list[date]:
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"granularity must be one of: {', '.join(GRANULARITIES)}",
+        )
+    if end < start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end is before start")
+
+    step = timedelta(days=7 if granularity == "week" else 1)
+    first = bucket_start(datetime.combine(start, datetime.min.time()), granularity)
+    if (end - first) / step > MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range spans more than {MAX_BUCKETS} buckets",
+        )
+    buckets = []
+    current = first
+    while current <= end:
+        buckets.append(current)
+        current += step
+    return buckets
+
+
+def _rollup_rows(db: Session, granularity: str, start: date, end: date, course_id: Optional[int]):
+    query = db.query(
+        EnrollmentRollup.bucket_start,
+        func.sum(EnrollmentRollup.enrollments),
+        func.sum(EnrollmentRollup.drops),
+        func.sum(EnrollmentRollup.grades),
+        func.sum(EnrollmentRollup.score_sum),
+    ).filter(
+        EnrollmentRollup.granularity == granularity,
+        EnrollmentRollup.bucket_start >= start,
+        EnrollmentRollup.bucket_start <= end,
+    )
+    if course_id is not None:
+        query = query.filter(EnrollmentRollup.course_id == course_id)
+    return {
+        row[0]: row[1:]
+        for row in query.group_by(EnrollmentRollup.bucket_start).all()
+    }
+
+
+def get_enrollment_trend(
+    db: Session, granularity: str, start: date, end: date, course_id: Optional[int] = None
+) -> dict:
+    buckets = _validate_range(granularity, start, end)
+    rows = _rollup_rows(db, granularity, buckets[0], end, course_id)
+
+    baseline = db.query(
+        func.coalesce(func.sum(EnrollmentRollup.enrollments - EnrollmentRollup.drops), 0)
+    ).filter(
+        EnrollmentRollup.granularity == granularity,
+        EnrollmentRollup.bucket_start < buckets[0],
+    )
+    if course_id is not None:
+        baseline = baseline.filter(EnrollmentRollup.course_id == course_id)
+    active = baseline.scalar() or 0
+
+    series = []
+    for bucket in buckets:
+        enrolled, dropped, _, _ = rows.get(bucket, (0, 0, 0, 0.0))
+        active += (enrolled or 0) - (dropped or 0)
+        series.append({
+            "bucket_start": bucket.isoformat(),
+            "enrolled": enrolled or 0,
+            "dropped": dropped or 0,
+            "net": (enrolled or 0) - (dropped or 0),
+            "active_enrollments": active,
+        })
+
+    return {"granularity": granularity, "course_id": course_id, "series": series}
+
+
+def get_score_trend(
+    db: Session, granularity: str, start: date, end: date, course_id: Optional[int] = None
+) -> dict:
+    buckets = _validate_range(granularity, start, end)
+    rows = _rollup_rows(db, granularity, buckets[0], end, course_id)
+
+    series = []
+    for bucket in buckets:
+        _, _, grades, score_sum = rows.get(bucket, (0, 0, 0, 0.0))
+        series.append({
+            "bucket_start": bucket.isoformat(),
+            "grades_given": grades or 0,
+            "average_score": round(score_sum / grades, 2) if grades else None,
+        })
+
+    return {"granularity": granularity, "course_id": course_id, "series": series}
+
+
+def get_student_score_history(db: Session, student_id: int, course_id: Optional[int] = None) -> list[dict]:
+    query = db.query(EnrollmentEvent).filter(EnrollmentEvent.student_id == student_id)
+    if course_id is not None:
+        query = query.filter(EnrollmentEvent.course_id == course_id)
+    return [
+        {
+            "course_id": e.course_id,
+            "event_type": e.event_type,
+            "score": e.score,
+            "previous_score": e.previous_score,
+            "occurred_at": e.occurred_at,
+        }
+        for e in query.order_by(EnrollmentEvent.occurred_at, EnrollmentEvent.event_id).all()
+    ]
+
+
+trace_module(__name__)
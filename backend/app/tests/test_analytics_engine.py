@@ -0,0 +1,65 @@
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.analytics import AnalyticsQuery
+from app.services.analytics_engine import ColumnData, ColumnarTable, execute_query
+
+table = ColumnarTable(
+    {
+        "student_country": ColumnData("str", ["India", "USA", "India", "UK", "India"]),
+        "course_id": ColumnData("int", [1, 1, 2, 2, 2]),
+        "evaluation_score": ColumnData("float", [80.0, 30.0, 55.0, None, 90.0]),
+        "passed": ColumnData("bool", [True, False, True, False, True]),
+    },
+    5,
+)
+
+
+def query(**spec):
+    return execute_query(table, AnalyticsQuery(**spec))
+
+
+def test_group_by_with_aggregates():
+    result = query(
+        group_by=["course_id"],
+        aggregates=[
+            {"fn": "count"},
+            {"fn": "avg", "field": "evaluation_score", "alias": "avg_score"},
+            {"fn": "sum", "field": "passed", "alias": "passes"},
+            {"fn": "count_distinct", "field": "student_country"},
+        ],
+        order_by=[{"field": "course_id"}],
+    )
+    assert result["rows"] == [
+        {"course_id": 1, "count": 2, "avg_score": 55.0, "passes": 1, "count_distinct_student_country": 2},
+        {"course_id": 2, "count": 3, "avg_score": 72.5, "passes": 2, "count_distinct_student_country": 2},
+    ]
+
+
+def test_filters_and_ordering():
+    result = query(
+        filters=[
+            {"field": "student_country", "op": "in", "value": ["India", "UK"]},
+            {"field": "course_id", "op": "gte", "value": 2},
+        ],
+        group_by=["student_country"],
+        aggregates=[{"fn": "max", "field": "evaluation_score", "alias": "best"}],
+        order_by=[{"field": "best", "desc": True}],
+    )
+    assert result["matched_rows"] == 3
+    assert result["rows"] == [
+        {"student_country": "India", "best": 90.0},
+        {"student_country": "UK", "best": None},
+    ]
+
+
+def test_no_group_by_on_empty_selection():
+    result = query(filters=[{"field": "student_country", "op": "eq", "value": "Peru"}])
+    assert result["rows"] == [{"count": 0}]
+
+
+def test_rejects_unknown_fields_and_text_ranges():
+    with pytest.raises(HTTPException):
+        query(group_by=["nope"])
+    with pytest.raises(HTTPException):
+        query(filters=[{"field": "student_country", "op": "gt", "value": "A"}])
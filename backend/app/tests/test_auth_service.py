@@ -0,0 +1,79 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401 - registers every mapper User relates to
+from app.core import security
+from app.core.config import settings
+from app.core.security import hash_password, hash_rounds
+from app.models.instructor import Instructor
+from app.models.student import Student
+from app.models.user import User
+from app.models.user_session import UserSession
+from app.services.auth_service import login_user
+from app.services.session_service import refresh_session, revoke_session
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    User.__table__.create(engine)
+    UserSession.__table__.create(engine)
+    Student.__table__.create(engine)
+    Instructor.__table__.create(engine)
+    with Session(engine) as session:
+        session.add(User(email_id="s@student.com", role="student", password=hash_password("pw")))
+        session.commit()
+        yield session
+
+
+def test_login_rehashes_when_cost_changes(db, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    assert login_user(db, "s@student.com", "pw", "student")["role"] == "student"
+    stored = db.query(User.password).filter(User.email_id == "s@student.com").scalar()
+    assert hash_rounds(stored) == 5
+    assert security.verify_password("pw", stored)
+
+
+def test_unknown_email_still_verifies_a_hash(db, monkeypatch):
+    calls = []
+    real_verify = security.verify_password
+    monkeypatch.setattr(security, "verify_password", lambda p, h: calls.append(h) or real_verify(p, h))
+    with pytest.raises(HTTPException) as exc:
+        login_user(db, "nobody@student.com", "pw", "student")
+    assert exc.value.status_code == 401
+    assert len(calls) == 1 and hash_rounds(calls[0]) == 4
+
+
+def test_role_mismatch(db, monkeypatch):
+    with pytest.raises(HTTPException) as exc:
+        login_user(db, "s@student.com", "wrong", "admin")
+    assert exc.value.status_code == 401
+
+    monkeypatch.setattr(settings, "LOGIN_REJECT_ROLE_MISMATCH_EARLY", True)
+    with pytest.raises(HTTPException) as exc:
+        login_user(db, "s@student.com", "wrong", "admin")
+    assert exc.value.status_code == 403
+
+
+def test_refresh_rotates_and_detects_reuse(db):
+    first = login_user(db, "s@student.com", "pw", "student")["refresh_token"]
+    second = refresh_session(db, first)
+    assert second["role"] == "student" and second["refresh_token"] != first
+
+    # Replaying the rotated-away token ends the session for both holders.
+    with pytest.raises(HTTPException):
+        refresh_session(db, first)
+    with pytest.raises(HTTPException):
+        refresh_session(db, second["refresh_token"])
+    assert db.query(UserSession).count() == 0
+
+
+def test_logout_revokes_refresh_token(db):
+    token = login_user(db, "s@student.com", "pw", "student")["refresh_token"]
+    revoke_session(db, token)
+    with pytest.raises(HTTPException) as exc:
+        refresh_session(db, token)
+    assert exc.value.status_code == 401
@@ -0,0 +1,87 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, encodings=["gzip"], minimum_size=100)
+
+
+@app.get("/large")
+async def large():
+    return [{"student_id": i, "country": "India"} for i in range(200)]
+
+
+@app.get("/small")
+async def small():
+    return {"ok": True}
+
+
+@app.get("/stream")
+async def stream():
+    async def rows():
+        for i in range(50):
+            yield f'{{"row": {i}}}\n'.encode()
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+@app.get("/file")
+async def file():
+    return FileResponse(app.state.file, media_type="text/plain", headers={"ETag": '"abc"'})
+
+
+client = TestClient(app)
+
+
+def test_large_response_is_gzipped():
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 200
+
+
+def test_compressed_response_gets_a_weak_etag(tmp_path):
+    app.state.file = tmp_path / "notes.txt"
+    app.state.file.write_text("lecture notes\n" * 1000)
+    response = client.get("/file", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"abc"'
+
+
+def test_partial_response_is_not_compressed(tmp_path):
+    app.state.file = tmp_path / "notes.txt"
+    app.state.file.write_text("lecture notes\n" * 1000)
+    response = client.get("/file", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-4999"})
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-range"] == "bytes 0-4999/14000"
+    assert response.headers["etag"] == '"abc"'
+    assert len(response.content) == 5000
+
+
+def test_small_response_is_not_compressed():
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+
+def test_identity_when_not_accepted():
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+def test_streaming_response_is_compressed():
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw).count(b"\n") == 50
+
+
+def test_negotiation_respects_q_values():
+    assert negotiate_encoding("gzip, br", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("br;q=0", ["br"]) is None
+    assert negotiate_encoding("*", ["zstd", "gzip"]) == "zstd"
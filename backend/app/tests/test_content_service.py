@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.database import Base, get_read_db
+from app.models import Content, Course, University
+from app.routers import content
+from app.services import content_service, link_checker
+
+
+def test_signed_urls_reject_tampering_and_expiry():
+    expires = int(time.time()) + 60
+    signature = content_service._signature(7, expires)
+
+    assert content_service.verify_signature(7, expires, signature)
+    assert not content_service.verify_signature(8, expires, signature)
+    assert not content_service.verify_signature(7, expires + 1, signature)
+    assert not content_service.verify_signature(7, int(time.time()) - 1, content_service._signature(7, int(time.time()) - 1))
+
+
+def make_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(University(university_id=1, name="U", country="IN"))
+        for course_id in (1, 2):
+            db.add(Course(course_id=course_id, course_name="C", duration="8 weeks",
+                          program_type="Degree", university_id=1))
+        db.commit()
+    return engine
+
+
+def test_stored_file_serves_ranges_and_revalidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONTENT_STORAGE_DIR", str(tmp_path / "files"))
+    engine = make_engine(tmp_path / "content.db")
+    data = bytes(range(256)) * 4
+    (tmp_path / "files" / "1").mkdir(parents=True)
+    (tmp_path / "files" / "1" / "a.bin").write_bytes(data)
+    with Session(engine) as db:
+        db.add(Content(content_id=1, course_id=1, type="pdf", content_url="/api/content/files/1",
+                       file_path="1/a.bin", file_name="a.bin", file_size=len(data),
+                       media_type="application/octet-stream", checksum="abc"))
+        db.commit()
+
+    api = FastAPI()
+    api.include_router(content.router, prefix="/api/content")
+    api.dependency_overrides[get_read_db] = lambda: Session(engine)
+    api.dependency_overrides[get_current_user] = lambda: {"user_id": 1, "role": "student"}
+    client = TestClient(api)
+    url = client.get("/api/content/1").json()[0]["content_url"]
+
+    full = client.get(url)
+    assert full.status_code == 200 and full.content == data
+    assert full.headers["etag"] == '"abc"'
+    part = client.get(url, headers={"Range": "bytes=10-19"})
+    assert part.status_code == 206 and part.content == data[10:20]
+    assert client.get(url, headers={"If-None-Match": '"abc"'}).status_code == 304
+    assert client.get(url.replace("signature=", "signature=0")).status_code == 403
+
+
+def test_link_checker_falls_back_to_get_and_caches_by_url(tmp_path, monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "down.example":
+            raise httpx.ConnectError("refused", request=request)
+        if request.url.host == "nohead.example" and request.method == "HEAD":
+            return httpx.Response(405)
+        return httpx.Response(206 if request.method == "GET" else 200)
+
+    engine = make_engine(tmp_path / "links.db")
+    monkeypatch.setattr(link_checker, "SessionLocal", sessionmaker(bind=engine))
+    with Session(engine) as db:
+        for course_id, url in [(1, "https://ok.example/a"), (2, "https://ok.example/a"),
+                               (1, "https://nohead.example/b"), (1, "https://down.example/c")]:
+            db.add(Content(course_id=course_id, type="link", content_url=url))
+        db.commit()
+
+    checker = link_checker.LinkChecker(concurrency=4, per_host=2, timeout=1)
+    urls = link_checker.claim_stale_urls(100)
+    assert sorted(urls) == ["https://down.example/c", "https://nohead.example/b", "https://ok.example/a"]
+    # A checker in another worker finds nothing left to take.
+    assert link_checker.claim_stale_urls(100) == []
+    results = asyncio.run(checker.check(urls, transport=httpx.MockTransport(handler)))
+    assert results == {"https://ok.example/a": 200, "https://nohead.example/b": 206, "https://down.example/c": 0}
+
+    link_checker.save_results(results)
+    assert link_checker.claim_stale_urls(100) == []
+    with Session(engine) as db:
+        assert db.scalars(select(Content.link_status).order_by(Content.content_id)).all() == [200, 200, 206, 0]
+
+
+def test_link_checker_marks_malformed_urls_unreachable():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200)
+
+    checker = link_checker.LinkChecker(concurrency=4, per_host=2, timeout=1)
+    urls = ["http://[bad", "https://ok.example/a\x00b", "https://ok.example/a"]
+    results = asyncio.run(checker.check(urls, transport=httpx.MockTransport(handler)))
+    assert results == {"http://[bad": 0, "https://ok.example/a\x00b": 0, "https://ok.example/a": 200}
@@ -0,0 +1,82 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Content, Course, University
+from app.schemas.course import ContentManifest
+from app.services.content_sync import sync_content
+
+
+def make_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(University(university_id=1, name="U", country="IN"))
+        for course_id, name in ((1, "Python"), (2, "SQL"), (3, "Web")):
+            db.add(Course(course_id=course_id, course_name=name, duration="8 weeks",
+                          program_type="Degree", university_id=1))
+        db.commit()
+    return engine
+
+
+def manifest(*courses):
+    return ContentManifest.model_validate({"courses": [
+        {"course_name": name, "content": [{"type": t, "url": u} for t, u in items]}
+        for name, items in courses
+    ]})
+
+
+def contents(db):
+    return {
+        (row.course_id, row.content_url): (row.content_id, row.type)
+        for row in db.execute(select(Content.content_id, Content.course_id, Content.content_url, Content.type))
+    }
+
+
+def test_sync_is_idempotent_and_only_touches_changed_rows(tmp_path):
+    engine = make_engine(tmp_path / "sync.db")
+    first = manifest(
+        ("Python", [("video", "https://x/a"), ("article", "https://x/b")]),
+        ("SQL", [("link", "https://x/c")]),
+    )
+    with Session(engine) as db:
+        assert sync_content(db, first) == {"inserted": 3, "updated": 0, "deleted": 0, "unchanged": 0}
+        db.commit()
+        before = contents(db)
+
+        assert sync_content(db, first) == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 3}
+        assert contents(db) == before
+
+        changed = manifest(
+            ("Python", [("video", "https://x/a"), ("pdf", "https://x/b")]),
+            ("SQL", [("link", "https://x/d")]),
+        )
+        assert sync_content(db, changed, dry_run=True) == {"inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1}
+        assert contents(db) == before
+        sync_content(db, changed)
+        db.commit()
+        after = contents(db)
+
+    assert after[(1, "https://x/a")] == before[(1, "https://x/a")]
+    assert after[(1, "https://x/b")] == (before[(1, "https://x/b")][0], "pdf")
+    assert (2, "https://x/c") not in after
+    assert (2, "https://x/d") in after
+
+
+def test_sync_keeps_uploads_and_prunes_unlisted_courses(tmp_path):
+    engine = make_engine(tmp_path / "sync.db")
+    with Session(engine) as db:
+        db.add_all([
+            Content(course_id=1, type="pdf", content_url="/api/content/files/1", file_path="1/a.pdf"),
+            Content(course_id=1, type="link", content_url="https://x/old"),
+            Content(course_id=3, type="link", content_url="https://x/web"),
+        ])
+        db.commit()
+
+        only_python = manifest(("Python", [("video", "https://x/a")]))
+        assert sync_content(db, only_python) == {"inserted": 1, "updated": 0, "deleted": 1, "unchanged": 0}
+        assert (3, "https://x/web") in contents(db)
+
+        assert sync_content(db, only_python, prune=True)["deleted"] == 1
+        db.commit()
+        assert set(contents(db)) == {(1, "/api/content/files/1"), (1, "https://x/a")}
@@ -0,0 +1,115 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Course, Enrollment, Student, University, User, WaitlistEntry
+from app.schemas.enrollment import EnrollmentCreate
+from app.services.enroll_service import drop_student, enroll_student, set_capacity
+
+STUDENTS = 1000
+CAPACITY = 100
+
+
+def sqlite_engine(tmp_path):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'capacity.db'}",
+        connect_args={"timeout": 120, "check_same_thread": False},
+        pool_size=50,
+    )
+
+
+def postgres_engine(tmp_path):
+    # Set TEST_DATABASE_URL to a scratch Postgres database to run these
+    # against real row locks; its tables are dropped and recreated.
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+    engine = create_engine(url, pool_size=50, max_overflow=0, pool_timeout=120)
+    Base.metadata.drop_all(engine)
+    return engine
+
+
+@pytest.fixture(params=[sqlite_engine, postgres_engine], ids=["sqlite", "postgresql"])
+def engine(request, tmp_path):
+    engine = request.param(tmp_path)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(University), [{"university_id": 1, "name": "U", "country": "IN"}])
+        conn.execute(insert(Course), [
+            {"course_id": 1, "course_name": "Rush", "duration": "8 weeks", "program_type": "Degree",
+             "university_id": 1, "capacity": CAPACITY},
+            {"course_id": 2, "course_name": "Open", "duration": "8 weeks", "program_type": "Degree",
+             "university_id": 1, "capacity": None},
+        ])
+        conn.execute(insert(User), [
+            {"user_id": i, "email_id": f"s{i}@x.com", "password": "x", "role": "student"}
+            for i in range(1, STUDENTS + 1)
+        ])
+        conn.execute(insert(Student), [
+            {"student_id": i, "user_id": i, "age": 20, "skill_level": "Beginner", "category": "UG", "country": "IN"}
+            for i in range(1, STUDENTS + 1)
+        ])
+    yield engine
+    if engine.dialect.name == "postgresql":
+        Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def attempt(engine, start: threading.Event, student_id: int, course_id: int):
+    start.wait()
+    with Session(engine) as db:
+        try:
+            result = enroll_student(db, EnrollmentCreate(student_id=student_id, course_id=course_id))
+            outcome = "waitlisted" if isinstance(result, dict) else "enrolled"
+            db.commit()
+            return outcome
+        except HTTPException as exc:
+            db.rollback()
+            return exc.status_code
+
+
+def rush(engine, requests: list[tuple[int, int]]) -> list:
+    start = threading.Event()
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        futures = [pool.submit(attempt, engine, start, s, c) for s, c in requests]
+        start.set()
+        return [f.result() for f in futures]
+
+
+def seats(db, course_id):
+    return db.execute(
+        select(Course.seats_taken, select(func.count()).where(Enrollment.course_id == course_id).scalar_subquery())
+        .where(Course.course_id == course_id)
+    ).one()
+
+
+def test_rush_fills_exactly_capacity_and_promotes_in_order(engine):
+    outcomes = rush(engine, [(s, 1) for s in range(1, STUDENTS + 1)])
+
+    assert outcomes.count("enrolled") == CAPACITY
+    assert outcomes.count("waitlisted") == STUDENTS - CAPACITY
+    with Session(engine) as db:
+        assert tuple(seats(db, 1)) == (CAPACITY, CAPACITY)
+        queue = db.scalars(select(WaitlistEntry.student_id).order_by(WaitlistEntry.entry_id)).all()
+        assert len(queue) == STUDENTS - CAPACITY
+
+        enrolled = db.scalars(select(Enrollment.student_id).where(Enrollment.course_id == 1)).all()
+        assert drop_student(db, enrolled[0], 1) == queue[:1]
+        assert set_capacity(db, 1, CAPACITY + 2)["promoted"] == queue[1:3]
+        db.commit()
+        assert tuple(seats(db, 1)) == (CAPACITY + 2, CAPACITY + 2)
+
+
+def test_duplicate_requests_enroll_once(engine):
+    outcomes = rush(engine, [(7, 2)] * 20)
+
+    assert outcomes.count("enrolled") == 1
+    assert outcomes.count(400) == 19
+    with Session(engine) as db:
+        assert tuple(seats(db, 2)) == (1, 1)
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import create_engine, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import Base
+from app.models import Course, Enrollment, Student, University, User
+from app.models.grading_policy import GradingPolicy
+from app.schemas.grading import GradingPolicyCreate
+from app.services.grading_service import (
+    delete_policy, ensure_default_policy, letter_grade_expr, refresh_passed_flags, resolve_policy, save_policy,
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'grading.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(insert(University), [{"university_id": 1, "name": "U", "country": "IN"}])
+        db.execute(insert(Course), [
+            {"course_id": 1, "course_name": "C1", "duration": "8 weeks", "program_type": "Degree", "university_id": 1},
+            {"course_id": 2, "course_name": "C2", "duration": "8 weeks", "program_type": "Degree", "university_id": 1},
+            {"course_id": 3, "course_name": "C3", "duration": "4 weeks", "program_type": "Certificate", "university_id": 1},
+        ])
+        db.execute(insert(User), [{"user_id": 1, "email_id": "s1@x.com", "password": "x", "role": "student"}])
+        db.execute(insert(Student), [
+            {"student_id": 1, "user_id": 1, "age": 20, "skill_level": "Beginner", "category": "UG", "country": "IN"}
+        ])
+        db.execute(insert(Enrollment), [
+            {"student_id": 1, "course_id": c, "evaluation_score": 55.0} for c in (1, 2, 3)
+        ])
+        ensure_default_policy(db)
+        db.flush()
+        yield db
+
+
+def passed(db) -> dict:
+    return dict(db.execute(select(Enrollment.course_id, Enrollment.passed).order_by(Enrollment.course_id)).all())
+
+
+def test_most_specific_policy_decides_who_passes(db):
+    assert refresh_passed_flags(db) == 3
+    assert passed(db) == {1: True, 2: True, 3: True}  # default threshold 40
+
+    save_policy(db, GradingPolicyCreate(name="Degree", program_type="Degree", pass_threshold=60))
+    assert resolve_policy(db, 1).name == "Degree"
+    assert resolve_policy(db, 3).name == "Default"
+    assert passed(db) == {1: False, 2: False, 3: True}
+
+    course = save_policy(db, GradingPolicyCreate(name="Lenient", course_id=2, pass_threshold=50))
+    assert resolve_policy(db, 2).name == "Lenient"
+    assert passed(db) == {1: False, 2: True, 3: True}
+
+    # The threshold is inclusive.
+    save_policy(db, GradingPolicyCreate(name="Exact", course_id=1, pass_threshold=55))
+    assert passed(db) == {1: True, 2: True, 3: True}
+
+    delete_policy(db, course["policy_id"])
+    assert resolve_policy(db, 2).name == "Degree"
+    assert passed(db) == {1: True, 2: False, 3: True}
+
+    # With no stored policy at all, DEFAULT_PASS_THRESHOLD applies.
+    for policy_id in db.scalars(select(GradingPolicy.policy_id)).all():
+        delete_policy(db, policy_id)
+    assert resolve_policy(db, 1) is None
+    assert passed(db) == {c: 55.0 >= settings.DEFAULT_PASS_THRESHOLD for c in (1, 2, 3)}
+
+
+def letters(db, policy, scores) -> list:
+    return [db.scalar(select(letter_grade_expr(policy, literal(score)))) for score in scores]
+
+
+def test_band_boundaries_and_scores_below_the_lowest_band(db):
+    assert letters(db, None, [100, 85, 84.9, 70, 55, 40, 39.9, 0]) == ["A", "A", "B", "B", "C", "D", "F", "F"]
+
+    save_policy(db, GradingPolicyCreate(
+        name="Honours", course_id=1, pass_threshold=50,
+        bands=[{"letter": "Pass", "min_score": 50}, {"letter": "Distinction", "min_score": 80}],
+    ))
+    policy = resolve_policy(db, 1)
+    assert letters(db, policy, [80, 79.9, 50, 49.9, 0]) == ["Distinction", "Pass", "Pass", None, None]
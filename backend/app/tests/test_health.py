@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from sqlalchemy import create_engine
+
+from app.services import health_service
+from app.services.health_service import CachedProbe, check_database
+
+
+def test_probe_result_is_shared_for_max_age():
+    calls = []
+
+    async def check():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"n": len(calls)}
+
+    async def scenario():
+        probe = CachedProbe(check, max_age=0.2)
+        # Concurrent probes wait for the one check in flight.
+        results = await asyncio.gather(*(probe.get() for _ in range(20)))
+        assert results == [{"n": 1}] * 20
+        await asyncio.sleep(0.25)
+        assert await probe.get() == {"n": 2}
+
+    asyncio.run(scenario())
+
+
+def test_database_check_fails_fast_on_exhausted_pool_and_slow_database(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'health.db'}", pool_size=1, max_overflow=0)
+    assert asyncio.run(check_database(engine, 1.0))["ok"]
+
+    with engine.connect():
+        started = time.monotonic()
+        result = asyncio.run(check_database(engine, 1.0))
+        assert (result["ok"], result["error"]) == (False, "connection pool exhausted")
+        assert time.monotonic() - started < 0.5
+
+    monkeypatch.setattr(health_service, "ping", lambda eng, timeout: time.sleep(1))
+    result = asyncio.run(check_database(engine, 0.1))
+    assert (result["ok"], result["error"]) == (False, "no answer within 0.1s")
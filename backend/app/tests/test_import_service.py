@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import bcrypt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401 - registers every mapper User relates to
+from app.core.config import settings
+from app.models.user import User
+from app.models.student import Student
+from app.models.instructor import Instructor
+from app.services.import_service import import_users
+
+
+def run_import(engine, kind, payload: str, fmt: str, batch_size: int = 2) -> list[dict]:
+    async def chunks():
+        # Split mid-line to exercise line reassembly.
+        data = payload.encode()
+        for i in range(0, len(data), 7):
+            yield data[i:i + 7]
+
+    async def collect():
+        return [json.loads(e) async for e in import_users(engine, kind, chunks(), fmt, batch_size, hash_workers=1)]
+
+    return asyncio.run(collect())
+
+
+def make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    for model in (User, Student, Instructor):
+        model.__table__.create(engine)
+    with Session(engine) as db:
+        db.add(User(email_id="taken@quintet.com", password="x", role="instructor"))
+        db.commit()
+    return engine
+
+
+def test_csv_import_reports_row_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_BCRYPT_ROUNDS", 4)
+    engine = make_engine(tmp_path)
+    payload = "\n".join([
+        "email_id,password,name,expertise",
+        "a@quintet.com,pw-a,Ada,Compilers",
+        "taken@quintet.com,pw,Dup,X",
+        "a@quintet.com,pw,Again,X",
+        "b@quintet.com,,NoPassword,X",
+        "c@quintet.com,pw-c,Cy,Databases",
+    ])
+    events = run_import(engine, "instructors", payload, "csv")
+
+    errors = sorted((e["line"], e["detail"]) for e in events if e["type"] == "error")
+    assert errors == [
+        (3, "Email already registered"),
+        (4, "Duplicate email in this file"),
+        (5, "password or password_hash is required"),
+    ]
+    assert events[-1] == {"type": "summary", "processed": 5, "imported": 2, "failed": 3}
+
+    with Session(engine) as db:
+        user = db.query(User).filter(User.email_id == "a@quintet.com").one()
+        assert user.role == "instructor" and user.instructor.name == "Ada"
+        assert bcrypt.checkpw(b"pw-a", user.password.encode())
+
+
+def test_ndjson_import_keeps_prehashed_passwords(tmp_path):
+    engine = make_engine(tmp_path)
+    hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+    payload = json.dumps({
+        "email_id": "s@student.com", "password_hash": hashed,
+        "age": 21, "skill_level": "Beginner", "category": "Undergraduate", "country": "India",
+    })
+    events = run_import(engine, "students", payload, "ndjson")
+
+    assert events[-1]["imported"] == 1
+    with Session(engine) as db:
+        user = db.query(User).filter(User.email_id == "s@student.com").one()
+        assert user.password == hashed and user.student.age == 21
+
+
+def test_email_registered_during_the_import_is_a_row_error(tmp_path, monkeypatch):
+    from app.services import import_service
+
+    engine = make_engine(tmp_path)
+    # As if taken@ signed up between the duplicate check and the insert.
+    monkeypatch.setattr(import_service, "_existing_emails", lambda conn, emails: set())
+    hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+    payload = "\n".join(
+        json.dumps({"email_id": email, "password_hash": hashed, "name": "N", "expertise": "X"})
+        for email in ("taken@quintet.com", "new@quintet.com")
+    )
+    events = run_import(engine, "instructors", payload, "ndjson")
+
+    assert [(e["line"], e["detail"]) for e in events if e["type"] == "error"] == [
+        (1, "Email was registered during the import"),
+    ]
+    assert events[-1] == {"type": "summary", "processed": 2, "imported": 1, "failed": 1}
+    with Session(engine) as db:
+        assert db.query(User).filter(User.email_id == "taken@quintet.com").one().role == "instructor"
+        assert db.query(Instructor).count() == 1
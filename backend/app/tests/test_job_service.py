@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.report_job import ReportJob
+from app.schemas.jobs import ReportJobCreate
+from app.services import job_service
+
+
+@pytest.fixture
+def factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    ReportJob.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(job_service, "SessionLocal", factory)
+    monkeypatch.setattr(job_service, "open_read_session", factory)
+    monkeypatch.setattr(job_service, "close_read_session", lambda db: db.close())
+    return factory
+
+
+def submit(factory, report="statistics", **params) -> str:
+    with factory() as db:
+        job = job_service.submit_job(db, 7, ReportJobCreate(report=report, **params))
+        db.commit()
+    return job["job_id"]
+
+
+def test_job_runs_once_and_serves_result(factory, monkeypatch):
+    monkeypatch.setitem(job_service.REPORTS, "statistics", (lambda db: {"total": 3}, ()))
+    job_id = submit(factory)
+
+    assert job_service.run_next_job() is True
+    assert job_service.run_next_job() is False
+    with factory() as db:
+        assert job_service.get_job(db, job_id, 7)["status"] == "succeeded"
+        assert job_service.get_job_result(db, job_id, 7) == {"total": 3}
+        with pytest.raises(HTTPException) as exc:
+            job_service.get_job(db, job_id, 8)
+        assert exc.value.status_code == 404
+
+
+def test_failed_and_expired_jobs(factory, monkeypatch):
+    def boom(db, course_id):
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    monkeypatch.setitem(job_service.REPORTS, "course_detail", (boom, ("course_id",)))
+    failed = submit(factory, "course_detail", course_id=1)
+    job_service.run_next_job()
+
+    with factory() as db:
+        assert job_service.get_job(db, failed, 7)["error"] == "Course not found"
+        db.query(ReportJob).update({ReportJob.status: "succeeded", ReportJob.expires_at: datetime.now(timezone.utc) - timedelta(seconds=1)})
+        db.commit()
+        with pytest.raises(HTTPException) as exc:
+            job_service.get_job_result(db, failed, 7)
+        assert exc.value.status_code == 410
+        assert job_service.purge_expired_jobs(db) == 1
+
+
+def test_running_job_is_taken_over_only_after_its_lease_expires(factory, monkeypatch):
+    monkeypatch.setitem(job_service.REPORTS, "statistics", (lambda db: {"total": 3}, ()))
+    job_id = submit(factory)
+    with factory() as db:
+        assert job_service.claim_next_job(db)[0] == job_id
+        # Another worker polling while the first one holds the lease finds nothing.
+        assert job_service.claim_next_job(db) is None
+
+        stale = datetime.now(timezone.utc) - timedelta(seconds=job_service.settings.JOB_LEASE_SECONDS + 1)
+        db.query(ReportJob).update({ReportJob.heartbeat_at: stale})
+        db.commit()
+        # A live worker renews the lease in time.
+        job_service.heartbeat(job_id)
+        assert job_service.claim_next_job(db) is None
+
+        # A dead one doesn't, and the lease runs out.
+        db.query(ReportJob).update({ReportJob.heartbeat_at: stale})
+        db.commit()
+
+    assert job_service.run_next_job() is True
+    with factory() as db:
+        assert job_service.get_job(db, job_id, 7)["status"] == "succeeded"
@@ -0,0 +1,30 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database import Base, engine_options
+from app.models import Course, Enrollment, Instructor, Student, University, User
+from app.services import lookups
+
+
+def test_cached_lookups_bind_fresh_values_each_call():
+    engine = create_engine("sqlite://", **engine_options("sqlite://"))
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(University(university_id=1, name="U", country="IN"))
+        for i in (1, 2):
+            db.add(User(user_id=i, email_id=f"s{i}@x.com", password="x", role="student"))
+            db.add(User(user_id=10 + i, email_id=f"i{i}@x.com", password="x", role="instructor"))
+            db.add(Student(student_id=i, user_id=i, age=20, skill_level="Beginner", category="UG", country="IN"))
+            db.add(Instructor(instructor_id=i, user_id=10 + i, name=f"I{i}", expertise="x"))
+            db.add(Course(course_id=i, course_name=f"C{i}", duration="8 weeks", program_type="Degree", university_id=1))
+        db.add(Enrollment(student_id=1, course_id=2, evaluation_score=0.0))
+        db.flush()
+
+        # The same cached statement must not keep returning the first row.
+        assert [lookups.student_by_user_id(db, i).student_id for i in (1, 2)] == [1, 2]
+        assert [lookups.instructor_by_user_id(db, 10 + i).instructor_id for i in (1, 2)] == [1, 2]
+        assert [lookups.course_by_id(db, i).course_name for i in (2, 1)] == ["C2", "C1"]
+        assert lookups.course_by_id(db, 3) is None
+        assert lookups.enrollment_preconditions(db, 1, 2) == (True, True, True)
+        assert lookups.enrollment_preconditions(db, 2, 2) == (True, True, False)
+        assert lookups.enrollment_preconditions(db, 3, 1) == (False, True, False)
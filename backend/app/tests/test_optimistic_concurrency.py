@@ -0,0 +1,75 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.preconditions import if_match_version
+from app.database import Base
+from app.models import Course, Enrollment, EnrollmentEvent, Instructor, Student, University, User
+from app.services.course_service import assign_instructor
+from app.services.enroll_service import grade_student
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'occ.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(University(university_id=1, name="U", country="IN"))
+        db.add_all([
+            User(user_id=1, email_id="s@x.com", password="x", role="student"),
+            User(user_id=2, email_id="i1@x.com", password="x", role="instructor"),
+            User(user_id=3, email_id="i2@x.com", password="x", role="instructor"),
+        ])
+        db.add(Student(student_id=1, user_id=1, age=20, skill_level="Beginner", category="UG", country="IN"))
+        db.add_all([
+            Instructor(instructor_id=1, user_id=2, name="A", expertise="x"),
+            Instructor(instructor_id=2, user_id=3, name="B", expertise="x"),
+        ])
+        db.add(Course(course_id=1, course_name="C", duration="8 weeks", program_type="Degree", university_id=1))
+        db.add(Enrollment(student_id=1, course_id=1, evaluation_score=0.0))
+        db.commit()
+    return engine
+
+
+def test_if_match_header_parsing():
+    assert if_match_version(None) is None
+    assert if_match_version("*") is None
+    assert if_match_version('"3"') == 3
+    assert if_match_version('W/"3"') == 3
+    for bad in ('3', '"abc"', '"1", "2"'):
+        with pytest.raises(HTTPException) as exc:
+            if_match_version(bad)
+        assert exc.value.status_code == 400
+
+
+def test_stale_grade_gets_409_with_current_etag(engine):
+    with Session(engine) as first, Session(engine) as second:
+        assert grade_student(first, 1, 1, 70.0, expected_version=1)["version"] == 2
+        first.commit()
+
+        with pytest.raises(HTTPException) as exc:
+            grade_student(second, 1, 1, 40.0, expected_version=1)
+        assert exc.value.status_code == 409
+        assert exc.value.headers["ETag"] == '"2"'
+
+        # Without If-Match the write still goes through, and the event log
+        # records the score it really replaced.
+        assert grade_student(second, 1, 1, 40.0)["version"] == 3
+        second.commit()
+        assert second.scalars(select(EnrollmentEvent.previous_score).order_by(EnrollmentEvent.event_id)).all() == [0.0, 70.0]
+
+
+def test_stale_course_edit_gets_409(engine):
+    with Session(engine) as db:
+        course = assign_instructor(db, 1, 1, expected_version=1)
+        assert (course.instructor_id, course.version) == (1, 2)
+        db.commit()
+
+        with pytest.raises(HTTPException) as exc:
+            assign_instructor(db, 1, 2, expected_version=1)
+        assert exc.value.status_code == 409
+        with pytest.raises(HTTPException) as exc:
+            assign_instructor(db, 99, 2, expected_version=1)
+        assert exc.value.status_code == 404
+        assert db.get(Course, 1).instructor_id == 1
@@ -0,0 +1,85 @@
+import json
+import os
+import re
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import Base
+from app.migrations import enrollment_partitions, partition_enrollments, run_migrations
+from app.models import Course, Enrollment, Student, University, User
+from app.schemas.enrollment import EnrollmentCreate
+from app.services.analyst_service import get_course_detail_for_analyst
+from app.services.enroll_service import drop_student, enroll_student, get_enrollments_by_course, grade_student
+
+
+def seed(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(University), [{"university_id": 1, "name": "U", "country": "IN"}])
+        conn.execute(insert(Course), [
+            {"course_id": c, "course_name": f"C{c}", "duration": "8 weeks", "program_type": "Degree",
+             "university_id": 1, "capacity": None}
+            for c in range(1, 21)
+        ])
+        conn.execute(insert(User), [
+            {"user_id": i, "email_id": f"s{i}@x.com", "password": "x", "role": "student"} for i in range(1, 51)
+        ])
+        conn.execute(insert(Student), [
+            {"student_id": i, "user_id": i, "age": 20, "skill_level": "Beginner", "category": "UG", "country": "IN"}
+            for i in range(1, 51)
+        ])
+        conn.execute(insert(Enrollment), [
+            {"student_id": s, "course_id": c, "evaluation_score": 50.0}
+            for s in range(1, 51) for c in range(1, 21) if (s + c) % 3
+        ])
+
+
+def test_partitioning_is_a_no_op_off_postgres(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ENROLLMENT_PARTITIONS", 4)
+    engine = create_engine(f"sqlite:///{tmp_path / 'parts.db'}")
+    Base.metadata.create_all(engine)
+    seed(engine)
+    run_migrations(engine)
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).select_from(Enrollment)) == 666
+
+
+def test_enrollments_partitioned_by_course_prune_per_course_queries(monkeypatch):
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    try:
+        seed(engine)
+        monkeypatch.setattr(settings, "ENROLLMENT_PARTITIONS", 4)
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            assert enrollment_partitions(conn) == 4
+            plan = conn.execute(text(
+                "EXPLAIN (FORMAT JSON) SELECT count(*) FROM enrollments WHERE course_id = 7"
+            )).scalar()
+            assert len(re.findall(r'"Relation Name": "enrollments_p', json.dumps(plan))) == 1
+
+        with Session(engine) as db:
+            assert db.scalar(select(func.count()).select_from(Enrollment)) == 666
+            assert len(get_enrollments_by_course(db, 7)) == 33
+            enroll_student(db, EnrollmentCreate(student_id=2, course_id=7))
+            assert grade_student(db, 7, 2, 90.0)["passed"]
+            assert len(get_course_detail_for_analyst(db, 7)["enrolled_students"]) == 34
+            drop_student(db, 1, 7)
+            db.commit()
+            assert len(get_enrollments_by_course(db, 7)) == 33
+
+        # Deleting a student still cascades into every partition.
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM students WHERE student_id = 3"))
+            partition_enrollments(conn, 0)
+            assert enrollment_partitions(conn) == 0
+            assert conn.execute(select(func.count()).select_from(Enrollment)).scalar() == 652
+    finally:
+        Base.metadata.drop_all(engine)
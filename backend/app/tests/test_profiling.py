@@ -0,0 +1,46 @@
+import json
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.profiling import ProfileStore, ProfilingMiddleware
+
+pytest.importorskip("pyinstrument")
+
+
+async def slow(request):
+    deadline = time.perf_counter() + 0.02
+    while time.perf_counter() < deadline:
+        pass
+    return PlainTextResponse("done")
+
+
+def test_only_requests_matching_the_rule_are_profiled_and_kept(tmp_path):
+    store = ProfileStore(str(tmp_path), keep=2)
+    app = Starlette(routes=[Route("/slow", slow), Route("/other", slow)])
+    app.add_middleware(ProfilingMiddleware, store=store)
+    client = TestClient(app)
+
+    client.get("/slow")
+    assert store.profiles() == []
+
+    store.set_rule({"pattern": "^/slow$", "method": "GET", "until": time.time() + 60,
+                    "sample_rate": 1.0, "interval_ms": 1.0})
+    time.sleep(1.1)  # the middleware re-reads the rule once a second
+    for path in ("/slow", "/other", "/slow", "/slow"):
+        client.get(path)
+
+    profiles = store.profiles()
+    assert [(p["path"], p["status_code"]) for p in profiles] == [("/slow", 200)] * 2
+    speedscope = json.loads(store.render(profiles[0]["id"], "speedscope"))
+    assert any(frame["name"] == "slow" for frame in speedscope["shared"]["frames"])
+    assert store.render("../rule", "text") is None
+
+    store.set_rule(None)
+    time.sleep(1.1)
+    client.get("/slow")
+    assert len(store.profiles()) == 2
@@ -0,0 +1,57 @@
+import asyncio
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core import pubsub
+
+
+def test_events_publish_after_commit_and_drop_on_rollback():
+    async def scenario():
+        broker = pubsub.EventBroker(queue_size=10)
+        everything = broker.subscribe()
+        one_course = broker.subscribe(course_id=1)
+        engine = create_engine("sqlite://")
+        original = pubsub.backend
+        pubsub.backend = pubsub.LocalBackend(broker)
+        try:
+            with Session(engine) as db:
+                db.execute(text("SELECT 1"))
+                pubsub.queue_event(db, "enrollment.created", course_id=1, student_id=5)
+                pubsub.queue_event(db, "content.added", course_id=2, content_id=9)
+                await asyncio.sleep(0)
+                assert everything.queue.empty()
+                db.commit()
+
+                db.execute(text("SELECT 1"))
+                pubsub.queue_event(db, "enrollment.dropped", course_id=1, student_id=5)
+                db.rollback()
+        finally:
+            pubsub.backend = original
+
+        await asyncio.sleep(0)
+        assert [everything.queue.get_nowait()["type"] for _ in range(everything.queue.qsize())] == [
+            "enrollment.created",
+            "content.added",
+        ]
+        assert one_course.queue.qsize() == 1
+        assert one_course.queue.get_nowait()["student_id"] == 5
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_reset_and_stream_closes():
+    async def scenario():
+        broker = pubsub.EventBroker(queue_size=2)
+        subscription = broker.subscribe()
+        for n in range(5):
+            broker.dispatch({"type": "enrollment.created", "course_id": n})
+        await asyncio.sleep(0)
+
+        frames = [frame async for frame in pubsub.event_stream(subscription, heartbeat=1)]
+        assert frames[0] == "retry: 3000\n\n"
+        assert frames[-1].startswith("event: reset\n")
+        assert len(frames) == 3
+        assert subscription not in broker._subscriptions
+
+    asyncio.run(scenario())
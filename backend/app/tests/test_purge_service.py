@@ -0,0 +1,151 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.database import Base
+from app.models import Content, Course, Enrollment, Student, University, User, WaitlistEntry
+from app.services import purge_service
+from app.services.analyst_service import get_courses_summary, get_general_statistics
+from app.services.analytics_engine import build_table
+from app.services.auth_service import login_user, remove_student
+from app.services.course_service import delete_course, get_all_courses
+from app.services.lookups import course_by_id
+from app.services.purge_service import purge_batch
+from app.services.recommendation_service import load_model
+from app.services.trend_service import backfill_enrollment_events, get_enrollment_trend
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONTENT_STORAGE_DIR", str(tmp_path / "files"))
+    engine = create_engine(f"sqlite:///{tmp_path / 'purge.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(University), [{"university_id": 1, "name": "U", "country": "IN"}])
+        conn.execute(insert(Course), [
+            {"course_id": c, "course_name": f"C{c}", "duration": "8 weeks", "program_type": "Degree",
+             "university_id": 1, "capacity": 250, "seats_taken": 250 if c == 1 else 1}
+            for c in (1, 2)
+        ])
+        conn.execute(insert(User), [
+            {"user_id": i, "email_id": f"s{i}@x.com", "password": "x", "role": "student"} for i in range(1, 252)
+        ])
+        conn.execute(insert(Student), [
+            {"student_id": i, "user_id": i, "age": 20, "skill_level": "Beginner", "category": "UG", "country": "IN"}
+            for i in range(1, 252)
+        ])
+        conn.execute(insert(Enrollment), [
+            {"student_id": i, "course_id": 1, "evaluation_score": 0.0} for i in range(1, 251)
+        ] + [{"student_id": 1, "course_id": 2, "evaluation_score": 0.0}])
+        conn.execute(insert(WaitlistEntry), [{"student_id": 251, "course_id": 1}])
+        conn.execute(insert(Content), [
+            {"course_id": 1, "type": "pdf", "content_url": "/api/content/files/1", "file_path": "1/a.pdf"},
+        ])
+    (tmp_path / "files" / "1").mkdir(parents=True)
+    (tmp_path / "files" / "1" / "a.pdf").write_bytes(b"%PDF")
+    monkeypatch.setattr(purge_service, "SessionLocal", sessionmaker(bind=engine))
+    return engine
+
+
+def test_deleted_course_disappears_at_once_and_is_purged_in_batches(engine, tmp_path):
+    with Session(engine) as db:
+        delete_course(db, 1)
+        db.commit()
+        assert course_by_id(db, 1) is None
+        assert [c.course_id for c in get_all_courses(db)] == [2]
+        with pytest.raises(HTTPException):
+            delete_course(db, 1)
+
+        batches = []
+        while deleted := purge_batch(db, 100):
+            batches.append(deleted)
+            db.commit()
+        assert batches == [100, 100, 50, 1, 1, 1]
+        assert db.get(Course, 1) is None
+        assert db.scalar(select(func.count()).select_from(Enrollment)) == 1
+    assert not (tmp_path / "files" / "1" / "a.pdf").exists()
+
+
+def test_removed_student_cannot_log_in_and_frees_seats_on_purge(engine):
+    with Session(engine) as db:
+        remove_student(db, 1)
+        db.commit()
+        with pytest.raises(HTTPException) as exc:
+            login_user(db, "s1@x.com", "x", "student")
+        assert exc.value.status_code == 401
+        # Seats are held until the purge hands them back.
+        assert db.scalar(select(Course.seats_taken).where(Course.course_id == 1)) == 250
+        assert 1 not in load_model(db).enrolled
+
+    assert purge_service.Purger(batch_size=1).sweep() == 3
+    with Session(engine) as db:
+        assert db.get(User, 1) is None
+        assert db.scalars(select(Course.seats_taken).order_by(Course.course_id)).all() == [250, 0]
+        # The freed seat in the full course went to the waitlist.
+        assert db.scalar(select(func.count()).where(Enrollment.student_id == 251)) == 1
+
+
+def test_deleted_course_leaves_the_statistics_before_it_is_purged(engine):
+    with Session(engine) as db:
+        delete_course(db, 1)
+        remove_student(db, 251)
+        db.commit()
+
+        stats = get_general_statistics(db)
+        assert (stats["total_courses"], stats["total_enrollments"], stats["total_contents"]) == (1, 1, 0)
+        assert stats["total_students"] == 250
+        assert [c["course_id"] for c in get_courses_summary(db)] == [2]
+        assert build_table(db, "courses").columns["course_id"].values.tolist() == [2]
+        assert build_table(db, "enrollments").num_rows == 1
+
+
+def test_purged_enrollments_are_recorded_as_drops(engine):
+    with Session(engine) as db:
+        assert backfill_enrollment_events(db) == 251
+        delete_course(db, 1)
+        remove_student(db, 1)
+        db.commit()
+
+    purge_service.Purger(batch_size=100).sweep()
+    with Session(engine) as db:
+        today = datetime.now(timezone.utc).date()
+        trend = get_enrollment_trend(db, "day", today, today)["series"][0]
+        # 250 enrollments went with course 1, and student 1's in course 2 with them.
+        assert (trend["enrolled"], trend["dropped"], trend["active_enrollments"]) == (251, 251, 0)
+
+
+def test_overlapping_purges_release_each_seat_once(engine):
+    with Session(engine) as db:
+        backfill_enrollment_events(db)
+        remove_student(db, 1)
+        db.commit()
+
+    # The second purger has already read student 1's enrollments when the
+    # first one deletes them all and commits.
+    overlapped = []
+
+    def purge_first(conn, cursor, statement, *args):
+        if statement.startswith("DELETE FROM enrollments") and not overlapped:
+            overlapped.append(True)
+            with Session(engine) as first:
+                assert purge_batch(first, 100) == 2
+                first.commit()
+
+    event.listen(engine, "before_cursor_execute", purge_first)
+    try:
+        with Session(engine) as second:
+            purge_batch(second, 100)
+            second.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", purge_first)
+
+    with Session(engine) as db:
+        assert overlapped
+        assert db.scalars(select(Course.seats_taken).order_by(Course.course_id)).all() == [250, 0]
+        assert db.scalar(select(func.count()).where(Enrollment.course_id == 1)) == 250
+        today = datetime.now(timezone.utc).date()
+        assert get_enrollment_trend(db, "day", today, today)["series"][0]["dropped"] == 2
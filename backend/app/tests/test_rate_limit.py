@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+
+from app.core.rate_limit import InMemoryBackend, parse_rate, set_backend
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_parse_rate():
+    assert parse_rate("20/minute") == (20, 20 / 60)
+    assert parse_rate("5/seconds") == (5, 5.0)
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    backend = InMemoryBackend()
+    now = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.monotonic", lambda: now[0])
+
+    assert all(backend.consume("k", 2, 1.0)[0] for _ in range(2))
+    allowed, retry_after = backend.consume("k", 2, 1.0)
+    assert not allowed and retry_after == 1.0
+
+    now[0] += 1.0
+    assert backend.consume("k", 2, 1.0)[0]
+
+
+def test_login_is_throttled_before_password_check():
+    backend = InMemoryBackend()
+    set_backend(backend)
+    try:
+        for _ in range(5):
+            backend.consume("login:email:victim@student.com", 5, 5 / 60)
+        response = client.post(
+            "/api/auth/student/login",
+            json={"email_id": "Victim@student.com", "password": "guess"},
+        )
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+    finally:
+        set_backend(None)
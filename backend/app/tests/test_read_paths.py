@@ -0,0 +1,48 @@
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Course, Enrollment, Instructor, Student, University, User
+from app.schemas.course import CourseResponse
+from app.schemas.enrollment import CourseEnrollment, EnrollmentWithDetails
+from app.schemas.user import InstructorProfile, StudentProfile
+from app.services.auth_service import get_all_instructors, get_all_students
+from app.services.course_service import get_all_courses
+from app.services.enroll_service import get_enrollments_by_course, get_enrollments_by_student
+
+
+def dump(model, rows):
+    adapter = TypeAdapter(list[model])
+    return adapter.dump_python(adapter.validate_python(rows, from_attributes=True))
+
+
+def test_list_reads_return_rows_that_fit_the_response_models():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(University(university_id=1, name="U", country="IN"))
+        db.add(User(user_id=1, email_id="s@x.com", password="x", role="student"))
+        db.add(User(user_id=2, email_id="i@x.com", password="x", role="instructor"))
+        db.add(Student(student_id=1, user_id=1, age=20, skill_level="Beginner", category="UG", country="IN"))
+        db.add(Instructor(instructor_id=1, user_id=2, name="I", expertise="x"))
+        db.add(Course(course_id=1, course_name="C1", duration="8 weeks", program_type="Degree",
+                      instructor_id=1, university_id=1))
+        db.add(Course(course_id=2, course_name="C2", duration="8 weeks", program_type="Degree", university_id=1))
+        db.add(Enrollment(student_id=1, course_id=1, evaluation_score=72.5))
+        db.flush()
+
+        assert dump(StudentProfile, get_all_students(db))[0]["email_id"] == "s@x.com"
+        assert dump(InstructorProfile, get_all_instructors(db))[0]["email_id"] == "i@x.com"
+        assert [c["instructor_id"] for c in dump(CourseResponse, get_all_courses(db))] == [1, None]
+        assert dump(EnrollmentWithDetails, get_enrollments_by_student(db, 1)) == [
+            {"student_id": 1, "course_id": 1, "course_name": "C1", "evaluation_score": 72.5}
+        ]
+        assert dump(CourseEnrollment, get_enrollments_by_course(db, 1)) == [{
+            "student_id": 1,
+            "course_id": 1,
+            "evaluation_score": 72.5,
+            "student_name": "s@x.com",
+            "student_email": "s@x.com",
+            "version": 1,
+        }]
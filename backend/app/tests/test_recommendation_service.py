@@ -0,0 +1,48 @@
+import numpy as np
+
+from app.services.recommendation_service import RecommendationModel
+
+COURSES = [(i, f"Course {i}", "Certificate", "8 weeks") for i in range(1, 6)]
+TOPICS = [(1, 10), (2, 10), (3, 11), (4, 11), (4, 10), (5, 12)]
+ENROLLMENTS = [
+    (1, 1, "Beginner"),
+    (1, 2, "Beginner"),
+    (2, 1, "Advanced"),
+    (2, 2, "Advanced"),
+    (2, 3, "Advanced"),
+    (3, 3, "Advanced"),
+    (3, 4, "Advanced"),
+]
+
+
+def test_ranks_co_enrolled_courses_first_and_skips_enrolled():
+    model = RecommendationModel(COURSES, TOPICS, ENROLLMENTS)
+
+    ranked = model.recommend([1], "Beginner", limit=10)
+
+    assert [r["course_id"] for r in ranked][:2] == [2, 3]
+    assert 1 not in [r["course_id"] for r in ranked]
+    assert len(ranked) == 4
+    assert ranked[0]["signals"]["co_enrollment"] > 0
+    assert ranked[0]["signals"]["topics"] > 0
+
+
+def test_incremental_updates_match_a_fresh_build():
+    model = RecommendationModel(COURSES, TOPICS, ENROLLMENTS)
+    events = [
+        {"type": "enrollment.created", "student_id": 4, "course_id": 1},
+        {"type": "enrollment.created", "student_id": 4, "course_id": 5},
+        {"type": "enrollment.created", "student_id": 4, "course_id": 5},
+        {"type": "enrollment.dropped", "student_id": 2, "course_id": 3},
+        {"type": "enrollment.graded", "student_id": 1, "course_id": 1},
+    ]
+    for payload in events:
+        model.apply(payload)
+    after = [e for e in ENROLLMENTS if e[:2] != (2, 3)] + [(4, 1, "Beginner"), (4, 5, "Beginner")]
+    fresh = RecommendationModel(COURSES, TOPICS, after)
+
+    scores = lambda m: [(r["course_id"], r["signals"]["co_enrollment"]) for r in m.recommend([1], None, 10)]
+    assert scores(model) == scores(fresh)
+    model._fold()
+    assert np.array_equal(model.co_enrollment.toarray(), fresh.co_enrollment.toarray())
+    assert np.array_equal(model.counts, fresh.counts)
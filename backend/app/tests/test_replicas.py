@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.database import ReplicaRouter, open_read_session, close_read_session
+from app.models.topic import Topic
+
+
+def make_db(path, name):
+    db_engine = create_engine(f"sqlite:///{path}")
+    with db_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE whoami (name TEXT)"))
+        conn.execute(text("INSERT INTO whoami VALUES (:name)"), {"name": name})
+    return f"sqlite:///{path}"
+
+
+def whoami(router):
+    db = open_read_session(router)
+    try:
+        return db.execute(text("SELECT name FROM whoami")).scalar()
+    finally:
+        close_read_session(db)
+
+
+@pytest.fixture
+def primary(tmp_path):
+    return create_engine(make_db(tmp_path / "primary.db", "primary"))
+
+
+def test_round_robin_across_replicas(tmp_path, primary):
+    router = ReplicaRouter(
+        [make_db(tmp_path / "r1.db", "r1"), make_db(tmp_path / "r2.db", "r2")], primary
+    )
+    assert [whoami(router) for _ in range(4)] == ["r1", "r2", "r1", "r2"]
+
+
+def test_unreachable_replica_is_skipped_then_retried(tmp_path, primary):
+    router = ReplicaRouter(
+        ["sqlite:////nonexistent/dir/r0.db", make_db(tmp_path / "r1.db", "r1")],
+        primary,
+        retry_after=60,
+    )
+    assert [whoami(router) for _ in range(3)] == ["r1", "r1", "r1"]
+    assert not router.is_healthy(0)
+
+    router.retry_after = 0
+    router.mark_down(0)
+    assert router.is_healthy(0)
+
+
+def test_falls_back_to_primary(primary):
+    assert whoami(ReplicaRouter([], primary)) == "primary"
+    assert whoami(ReplicaRouter(["sqlite:////nonexistent/dir/r0.db"], primary)) == "primary"
+
+
+def test_read_session_rejects_writes(primary):
+    db = open_read_session(ReplicaRouter([], primary))
+    try:
+        db.add(Topic(topic_name="Databases"))
+        with pytest.raises(RuntimeError):
+            db.flush()
+    finally:
+        close_read_session(db)
@@ -0,0 +1,69 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+from app.core import tracing
+from app.core.config import settings
+
+engine = create_engine("sqlite://")
+
+
+@tracing.traced("lookups.answer")
+def answer() -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT 42")).scalar()
+
+
+app = FastAPI()
+app.add_middleware(tracing.TracingMiddleware, sample_rate=0.0)
+
+
+@app.get("/answer/{n}", response_class=PlainTextResponse)
+@app.get("/health/live", response_class=PlainTextResponse)
+async def endpoint():
+    return str(answer())
+
+
+def exported_spans(path) -> list[dict]:
+    return [
+        span
+        for line in path.read_text().splitlines()
+        for resource in json.loads(line)["resourceSpans"]
+        for scope in resource["scopeSpans"]
+        for span in scope["spans"]
+    ]
+
+
+def test_request_service_and_sql_spans_nest_under_the_callers_trace(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "file")
+    monkeypatch.setattr(settings, "TRACING_FILE", str(tmp_path / "traces.jsonl"))
+    tracing.exporter.flush()
+    client = TestClient(app)
+    tracing.instrument_sql()
+    try:
+        parent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+        response = client.get("/answer/1", headers={"traceparent": parent})
+        # Unsampled callers, probes and (at rate 0) requests without context are skipped.
+        client.get("/answer/2", headers={"traceparent": parent[:-2] + "00"})
+        client.get("/answer/3")
+        client.get("/health/live", headers={"traceparent": parent})
+    finally:
+        for name, fn in (("before_cursor_execute", tracing._before_cursor_execute),
+                         ("after_cursor_execute", tracing._after_cursor_execute),
+                         ("handle_error", tracing._handle_error)):
+            event.remove(engine.__class__, name, fn)
+    assert response.text == "42"
+    assert tracing.exporter.flush() == 3
+
+    root, service, sql = sorted(exported_spans(tmp_path / "traces.jsonl"), key=lambda s: int(s["startTimeUnixNano"]))
+    assert {s["traceId"] for s in (root, service, sql)} == {"0af7651916cd43dd8448eb211c80319c"}
+    assert response.headers["traceresponse"] == f"00-{root['traceId']}-{root['spanId']}-01"
+    assert (root["name"], root["kind"], root["parentSpanId"]) == ("GET /answer/{n}", 2, "b7ad6b7169203331")
+    assert (service["name"], service["parentSpanId"]) == ("lookups.answer", root["spanId"])
+    assert (sql["name"], sql["kind"], sql["parentSpanId"]) == ("SELECT", 3, service["spanId"])
+    attributes = {a["key"]: a["value"] for a in root["attributes"]}
+    assert attributes["http.route"] == {"stringValue": "/answer/{n}"}
+    assert attributes["http.response.status_code"] == {"intValue": "200"}
@@ -0,0 +1,112 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Course, Enrollment, Student, University, User
+from app.models.enrollment_event import EnrollmentRollup
+from app.services.trend_service import (
+    DROPPED, ENROLLED, GRADED,
+    backfill_enrollment_events, get_enrollment_trend, get_score_trend, record_drops, record_event,
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'trends.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        yield db
+
+
+def at(day: int) -> datetime:
+    # October 2026: the 5th and the 12th are Mondays.
+    return datetime(2026, 10, day, 9, 30, tzinfo=timezone.utc)
+
+
+def rollups(db, granularity: str) -> list[tuple]:
+    return [tuple(r) for r in db.execute(
+        select(
+            EnrollmentRollup.bucket_start, EnrollmentRollup.course_id, EnrollmentRollup.enrollments,
+            EnrollmentRollup.drops, EnrollmentRollup.grades, EnrollmentRollup.score_sum,
+        )
+        .where(EnrollmentRollup.granularity == granularity)
+        .order_by(EnrollmentRollup.bucket_start, EnrollmentRollup.course_id)
+    )]
+
+
+def test_events_add_up_in_daily_and_weekly_rollups(db):
+    record_event(db, ENROLLED, 1, 10, occurred_at=at(5))
+    record_event(db, ENROLLED, 2, 10, occurred_at=at(5))
+    record_event(db, ENROLLED, 3, 10, occurred_at=at(7))
+    record_event(db, ENROLLED, 1, 20, occurred_at=at(7))
+    record_event(db, GRADED, 1, 10, score=80.0, previous_score=0.0, occurred_at=at(7))
+    record_event(db, GRADED, 2, 10, score=65.0, previous_score=0.0, occurred_at=at(11))
+    record_event(db, DROPPED, 3, 10, previous_score=0.0, occurred_at=at(12))
+    db.flush()
+
+    assert rollups(db, "day") == [
+        (date(2026, 10, 5), 10, 2, 0, 0, 0.0),
+        (date(2026, 10, 7), 10, 1, 0, 1, 80.0),
+        (date(2026, 10, 7), 20, 1, 0, 0, 0.0),
+        (date(2026, 10, 11), 10, 0, 0, 1, 65.0),
+        (date(2026, 10, 12), 10, 0, 1, 0, 0.0),
+    ]
+    assert rollups(db, "week") == [
+        (date(2026, 10, 5), 10, 3, 0, 2, 145.0),
+        (date(2026, 10, 5), 20, 1, 0, 0, 0.0),
+        (date(2026, 10, 12), 10, 0, 1, 0, 0.0),
+    ]
+
+    # The trend starts after the first enrollments: they are the baseline.
+    trend = get_enrollment_trend(db, "day", date(2026, 10, 6), date(2026, 10, 12))
+    assert [(b["bucket_start"], b["enrolled"], b["dropped"], b["active_enrollments"]) for b in trend["series"]] == [
+        ("2026-10-06", 0, 0, 2),
+        ("2026-10-07", 2, 0, 4),
+        ("2026-10-08", 0, 0, 4),
+        ("2026-10-09", 0, 0, 4),
+        ("2026-10-10", 0, 0, 4),
+        ("2026-10-11", 0, 0, 4),
+        ("2026-10-12", 0, 1, 3),
+    ]
+    weekly = get_enrollment_trend(db, "week", date(2026, 10, 7), date(2026, 10, 18), course_id=10)
+    assert [(b["bucket_start"], b["net"], b["active_enrollments"]) for b in weekly["series"]] == [
+        ("2026-10-05", 3, 3),
+        ("2026-10-12", -1, 2),
+    ]
+    scores = get_score_trend(db, "week", date(2026, 10, 5), date(2026, 10, 12), course_id=10)
+    assert [(b["grades_given"], b["average_score"]) for b in scores["series"]] == [(2, 72.5), (0, None)]
+
+
+def test_backfill_counts_existing_enrollments_once(db):
+    db.execute(insert(University), [{"university_id": 1, "name": "U", "country": "IN"}])
+    db.execute(insert(Course), [
+        {"course_id": c, "course_name": f"C{c}", "duration": "8 weeks", "program_type": "Degree", "university_id": 1}
+        for c in (1, 2)
+    ])
+    db.execute(insert(User), [{"user_id": i, "email_id": f"s{i}@x.com", "password": "x", "role": "student"} for i in (1, 2, 3)])
+    db.execute(insert(Student), [
+        {"student_id": i, "user_id": i, "age": 20, "skill_level": "Beginner", "category": "UG", "country": "IN"}
+        for i in (1, 2, 3)
+    ])
+    db.execute(insert(Enrollment), [
+        {"student_id": 1, "course_id": 1, "evaluation_score": 0.0, "enrolled_at": at(5)},
+        {"student_id": 2, "course_id": 1, "evaluation_score": 0.0, "enrolled_at": None},
+        {"student_id": 3, "course_id": 2, "evaluation_score": 0.0, "enrolled_at": at(6)},
+    ])
+    # Enrolled after events started: already has its event.
+    db.execute(insert(Enrollment), [{"student_id": 1, "course_id": 2, "evaluation_score": 0.0, "enrolled_at": at(7)}])
+    record_event(db, ENROLLED, 1, 2, occurred_at=at(7))
+
+    assert backfill_enrollment_events(db) == 3
+    assert backfill_enrollment_events(db) == 0
+    today = datetime.now(timezone.utc).date()
+    trend = get_enrollment_trend(db, "day", date(2026, 10, 4), today)
+    assert trend["series"][-1]["active_enrollments"] == 4
+    assert [b["enrolled"] for b in trend["series"][:4]] == [0, 1, 1, 1]
+
+    record_drops(db, [(1, 1, 0.0), (2, 1, 0.0)])
+    trend = get_enrollment_trend(db, "day", date(2026, 10, 4), today, course_id=1)
+    assert trend["series"][-1]["active_enrollments"] == 0
@@ -0,0 +1,32 @@
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import database
+from app.database import get_db
+from app.models.topic import Topic
+
+api = FastAPI()
+
+
+@api.post("/topics/{name}")
+def add_topic(name: str, fail: bool = False, db: Session = Depends(get_db, scope="function")):
+    db.add(Topic(topic_name=name))
+    db.flush()
+    if fail:
+        raise HTTPException(status_code=400, detail="rejected")
+    return {"ok": True}
+
+
+def test_request_commits_once_or_rolls_back(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'uow.db'}")
+    Topic.__table__.create(engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    client = TestClient(api)
+
+    assert client.post("/topics/kept").status_code == 200
+    assert client.post("/topics/dropped", params={"fail": True}).status_code == 400
+
+    with Session(engine) as db:
+        assert [t.topic_name for t in db.query(Topic).all()] == ["kept"]
@@ -0,0 +1,137 @@
+"""Bytes-on-wire and CPU cost of response compression per endpoint payload.
+
+    python -m benchmarks.compression                  # synthetic payloads
+    python -m benchmarks.compression --rows 20000
+    python -m benchmarks.compression --from-db        # real payloads via the services
+"""
+import argparse
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.compression import COMPRESSORS
+
+LEVELS = {
+    "gzip": [1, 4, 6, 9],
+    "br": [1, 4, 6, 9, 11],
+    "zstd": [1, 3, 6, 12, 19],
+}
+
+COUNTRIES = ["India", "USA", "China", "UK", "Germany", "Brazil", "Canada", "Japan"]
+SKILLS = ["Beginner", "Intermediate", "Advanced"]
+CATEGORIES = ["Undergraduate", "Postgraduate", "Professional"]
+
+
+def synthetic_students(rows: int) -> list[dict]:
+    rng = random.Random(7)
+    return [
+        {
+            "student_id": i,
+            "user_id": i + 100,
+            "email_id": f"student{i}@student.com",
+            "age": rng.randint(18, 45),
+            "skill_level": rng.choice(SKILLS),
+            "category": rng.choice(CATEGORIES),
+            "country": rng.choice(COUNTRIES),
+        }
+        for i in range(1, rows + 1)
+    ]
+
+
+def synthetic_course_detail(rows: int) -> dict:
+    rng = random.Random(11)
+    students = synthetic_students(rows)
+    return {
+        "course_id": 1,
+        "course_name": "Machine Learning",
+        "program_type": "Certificate",
+        "enrollment_count": rows,
+        "topics": ["Regression", "Neural Networks", "Clustering"],
+        "enrolled_students": [
+            {
+                "student_id": s["student_id"],
+                "email": s["email_id"],
+                "age": s["age"],
+                "country": s["country"],
+                "skill_level": s["skill_level"],
+                "category": s["category"],
+                "evaluation_score": round(rng.uniform(0, 100), 2),
+            }
+            for s in students
+        ],
+    }
+
+
+def db_payloads() -> dict[str, object]:
+    from sqlalchemy import func
+    from app.database import SessionLocal
+    from app.models.enrollment import Enrollment
+    from app.services.auth_service import get_all_students
+    from app.services.analyst_service import get_course_detail_for_analyst
+
+    db = SessionLocal()
+    try:
+        busiest = (
+            db.query(Enrollment.course_id)
+            .group_by(Enrollment.course_id)
+            .order_by(func.count().desc())
+            .limit(1)
+            .scalar()
+        )
+        return {
+            "/api/admin/students": get_all_students(db),
+            f"/api/analyst/courses/{busiest}": get_course_detail_for_analyst(db, busiest),
+        }
+    finally:
+        db.close()
+
+
+def measure(body: bytes, encoding: str, level: int, repeats: int) -> tuple[int, float]:
+    timings = []
+    size = 0
+    for _ in range(repeats):
+        start = time.process_time()
+        compressor = COMPRESSORS[encoding](level)
+        out = compressor.compress(body) + compressor.finish()
+        timings.append(time.process_time() - start)
+        size = len(out)
+    timings.sort()
+    return size, timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--from-db", action="store_true")
+    args = parser.parse_args()
+
+    if args.from_db:
+        payloads = db_payloads()
+    else:
+        payloads = {
+            "/api/admin/students": synthetic_students(args.rows),
+            "/api/analyst/courses/{id}": synthetic_course_detail(args.rows),
+        }
+
+    for endpoint, payload in payloads.items():
+        body = json.dumps(jsonable_encoder(payload)).encode("utf-8")
+        print(f"\n{endpoint}  identity={len(body):,} bytes")
+        print(f"  {'encoding':<8} {'level':>5} {'bytes':>10} {'ratio':>7} {'cpu ms':>8} {'MB/s':>8}")
+        for encoding, levels in LEVELS.items():
+            if encoding not in COMPRESSORS:
+                print(f"  {encoding:<8} (not installed)")
+                continue
+            for level in levels:
+                size, cpu = measure(body, encoding, level, args.repeats)
+                mbps = len(body) / cpu / 1e6 if cpu else float("inf")
+                print(
+                    f"  {encoding:<8} {level:>5} {size:>10,} {len(body) / size:>6.1f}x "
+                    f"{cpu * 1000:>8.2f} {mbps:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
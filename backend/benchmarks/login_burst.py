@@ -0,0 +1,112 @@
+"""Latency of ordinary API traffic while attackers burst the login route.
+
+Run the API with forwarded-for trust on so each simulated client gets its own
+IP budget, then point this at it:
+
+    RATE_LIMIT_TRUST_FORWARDED_FOR=true uvicorn app.main:app --port 8000
+    python -m benchmarks.login_burst --base-url http://localhost:8000
+    python -m benchmarks.login_burst --attackers 100 --attack-rate 200
+
+Run it once more against a server started with RATE_LIMIT_ENABLED=false to
+see what the same burst costs without the limiter.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+LOGIN = "/api/auth/student/login"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def legitimate_user(client: httpx.AsyncClient, index: int, args, stop: float, latencies: list, statuses: dict):
+    headers = {"X-Forwarded-For": f"10.1.{index // 250}.{index % 250 + 1}"}
+    while time.monotonic() < stop:
+        started = time.perf_counter()
+        response = await client.get(args.path, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        await asyncio.sleep(args.think_time)
+
+
+async def attacker(client: httpx.AsyncClient, index: int, victim: str, interval: float, stop: float, statuses: dict):
+    # One spoofed source per attacker, guessing passwords for a single victim.
+    # Requests are fired on a fixed schedule so a slow server does not lower
+    # the offered load.
+    headers = {"X-Forwarded-For": f"203.0.{index // 250}.{index % 250 + 1}"}
+    pending = []
+
+    async def attempt(n: int):
+        body = {"email_id": victim, "password": f"guess-{index}-{n}"}
+        try:
+            response = await client.post(LOGIN, json=body, headers=headers)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        except httpx.HTTPError:
+            statuses["error"] = statuses.get("error", 0) + 1
+
+    n = 0
+    while time.monotonic() < stop:
+        n += 1
+        pending.append(asyncio.create_task(attempt(n)))
+        await asyncio.sleep(interval)
+    await asyncio.gather(*pending)
+
+
+async def run_phase(args, attackers: int) -> dict:
+    latencies: list[float] = []
+    legit_statuses: dict = {}
+    attack_statuses: dict = {}
+    limits = httpx.Limits(max_connections=args.users + attackers + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        stop = time.monotonic() + args.duration
+        tasks = [legitimate_user(client, i, args, stop, latencies, legit_statuses) for i in range(args.users)]
+        interval = attackers / args.attack_rate if attackers else 0
+        tasks += [attacker(client, i, args.victim, interval, stop, attack_statuses) for i in range(attackers)]
+        await asyncio.gather(*tasks)
+    return {
+        "requests": len(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.fmean(latencies) if latencies else 0.0,
+        "legit_statuses": legit_statuses,
+        "attack_statuses": attack_statuses,
+    }
+
+
+def report(label: str, result: dict) -> None:
+    print(
+        f"{label:<14} n={result['requests']:<6} p50={result['p50']:7.1f}ms "
+        f"p95={result['p95']:7.1f}ms p99={result['p99']:7.1f}ms"
+    )
+    print(f"{'':<14} legitimate statuses: {result['legit_statuses']}")
+    if result["attack_statuses"]:
+        print(f"{'':<14} attacker statuses:   {result['attack_statuses']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/courses/", help="route the legitimate clients call")
+    parser.add_argument("--users", type=int, default=4, help="concurrent legitimate clients")
+    parser.add_argument("--think-time", type=float, default=0.5, help="seconds between a user's requests")
+    parser.add_argument("--victim", default="priya.patel@student.com", help="existing account to guess against")
+    parser.add_argument("--attackers", type=int, default=50, help="attacking clients, one IP each")
+    parser.add_argument("--attack-rate", type=float, default=50.0, help="login attempts per second across all attackers")
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    report("baseline", asyncio.run(run_phase(args, attackers=0)))
+    report("under burst", asyncio.run(run_phase(args, attackers=args.attackers)))
+
+
+if __name__ == "__main__":
+    main()
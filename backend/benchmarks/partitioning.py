@@ -0,0 +1,165 @@
+"""Per-course enrollment queries on a plain vs. hash-partitioned table.
+
+Needs PostgreSQL. Works in a scratch schema (dropped afterwards) of the
+database at --url, seeds --students students with --per-student
+enrollments each, times the per-course service calls, rebuilds enrollments
+with --partitions hash partitions and times them again. Every statement a
+call sends that touches enrollments is EXPLAINed to count the partitions
+the planner (or executor, for generic plans) actually scans:
+
+    python -m benchmarks.partitioning --url postgresql://postgres@localhost/scratch
+    python -m benchmarks.partitioning --url ... --students 200000 --partitions 32
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.migrations import partition_enrollments
+from app.services.analyst_service import get_course_detail_for_analyst, get_courses_summary
+from app.services.enroll_service import drop_student, get_enrollments_by_course, grade_student
+
+SCHEMA = "bench_partitioning"
+
+CASES = [
+    ("enroll: course roster", lambda db, c, s: get_enrollments_by_course(db, c)),
+    ("enroll: grade", lambda db, c, s: grade_student(db, c, s, 50.0)),
+    ("enroll: drop", lambda db, c, s: drop_student(db, s, c)),
+    ("analyst: course detail", lambda db, c, s: get_course_detail_for_analyst(db, c)),
+    ("analyst: courses summary", lambda db, c, s: get_courses_summary(db)),
+]
+
+
+def seed(engine, students: int, courses: int, per_student: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO universities (university_id, name, country) VALUES (1, 'U', 'IN')"))
+        conn.execute(text(
+            "INSERT INTO courses (course_id, course_name, duration, program_type, university_id) "
+            "SELECT g, 'C' || g, '8 weeks', 'Degree', 1 FROM generate_series(1, :n) g"
+        ), {"n": courses})
+        conn.execute(text(
+            "INSERT INTO users (user_id, email_id, password, role) "
+            "SELECT g, 's' || g || '@x.com', 'x', 'student' FROM generate_series(1, :n) g"
+        ), {"n": students})
+        conn.execute(text(
+            "INSERT INTO students (student_id, user_id, age, skill_level, category, country) "
+            "SELECT g, g, 20, 'Beginner', 'UG', 'IN' FROM generate_series(1, :n) g"
+        ), {"n": students})
+        # 104729 is prime, so a student's per_student courses are distinct.
+        conn.execute(text(
+            "INSERT INTO enrollments (student_id, course_id, evaluation_score) "
+            "SELECT s, (s * 7919 + k * 104729) % :courses + 1, random() * 100 "
+            "FROM generate_series(1, :students) s, generate_series(1, :per) k"
+        ), {"students": students, "courses": courses, "per": per_student})
+        conn.execute(text("ANALYZE"))
+
+
+def enrolled_student(engine, course_id: int) -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT min(student_id) FROM enrollments WHERE course_id = :c"), {"c": course_id}
+        ).scalar()
+
+
+def scanned(plan: dict, found: set) -> tuple[set, int]:
+    removed = plan.get("Subplans Removed", 0)
+    # The target of an UPDATE/DELETE also names the parent table; only scans count.
+    if plan.get("Relation Name", "").startswith("enrollments") and plan["Node Type"].endswith("Scan"):
+        found.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        removed += scanned(child, found)[1]
+    return found, removed
+
+
+def partitions_scanned(engine, fn, course_id: int, student_id: int) -> int:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "enrollments" in statement and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as db:
+            fn(db, course_id, student_id)
+            db.rollback()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    widest = 0
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+            plan = plan if isinstance(plan, list) else json.loads(plan)
+            found, removed = scanned(plan[0]["Plan"], set())
+            widest = max(widest, len(found) - removed)
+        conn.rollback()
+    return widest
+
+
+def median_ms(engine, fn, calls: int, courses: int) -> float:
+    timings = []
+    for i in range(calls):
+        course_id = (i * 37) % courses + 1
+        student_id = enrolled_student(engine, course_id)
+        with Session(engine) as db:
+            started = time.perf_counter()
+            fn(db, course_id, student_id)
+            timings.append((time.perf_counter() - started) * 1000)
+            db.rollback()
+    return statistics.median(timings)
+
+
+def run(engine, calls: int, courses: int) -> dict:
+    student_id = enrolled_student(engine, 1)
+    return {
+        name: (median_ms(engine, fn, calls, courses), partitions_scanned(engine, fn, 1, student_id))
+        for name, fn in CASES
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.environ.get("TEST_DATABASE_URL"))
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--per-student", type=int, default=10)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=30)
+    args = parser.parse_args()
+    if not args.url:
+        parser.error("--url (or TEST_DATABASE_URL) must point at a PostgreSQL database")
+
+    with create_engine(args.url).begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    engine = create_engine(args.url, connect_args={
+        "options": f"-c search_path={SCHEMA} -c enable_partitionwise_aggregate=on",
+    })
+    try:
+        Base.metadata.create_all(engine)
+        seed(engine, args.students, args.courses, args.per_student)
+        plain = run(engine, args.calls, args.courses)
+        with engine.begin() as conn:
+            partition_enrollments(conn, args.partitions)
+        partitioned = run(engine, args.calls, args.courses)
+    finally:
+        engine.dispose()
+        with create_engine(args.url).begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    rows = args.students * args.per_student
+    print(f"{rows:,} enrollments over {args.courses:,} courses, {args.partitions} partitions")
+    print(f"{'call':<26} {'plain':>9} {'partitioned':>12} {'partitions scanned':>20}")
+    for name, (before, _) in plain.items():
+        after, widest = partitioned[name]
+        print(f"{name:<26} {before:>7.2f}ms {after:>10.2f}ms {widest:>12} of {args.partitions}")
+
+
+if __name__ == "__main__":
+    main()
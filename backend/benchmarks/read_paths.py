@@ -0,0 +1,141 @@
+"""Rows per second for the list endpoints: ORM instances vs. plain rows.
+
+Seeds a SQLite file with --rows students, enrollments in one course and
+content items in one course, then times each read path twice: the previous
+ORM version (full instances, attribute copies into dicts, lazy loads) and
+the current column select. "fetch" is the service call alone; "+ json" adds
+the response serialization FastAPI does for that route.
+
+    python -m benchmarks.read_paths
+    python -m benchmarks.read_paths --rows 100000 --db /tmp/read_paths.db
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Content, Course, Enrollment, Student, University, User
+from app.schemas.course import ContentResponse
+from app.schemas.enrollment import CourseEnrollment
+from app.schemas.user import StudentProfile
+from app.services.auth_service import get_all_students
+from app.services.enroll_service import get_enrollments_by_course
+
+
+def seed(engine, rows: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(University), [{"university_id": 1, "name": "U", "country": "IN"}])
+        conn.execute(insert(Course), [{
+            "course_id": 1, "course_name": "C", "duration": "8 weeks",
+            "program_type": "Degree", "university_id": 1,
+        }])
+        conn.execute(insert(User), [
+            {"user_id": i, "email_id": f"s{i}@x.com", "password": "x", "role": "student"}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Student), [
+            {"student_id": i, "user_id": i, "age": 20, "skill_level": "Beginner",
+             "category": "UG", "country": "IN"}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Enrollment), [
+            {"student_id": i, "course_id": 1, "evaluation_score": 50.0, "passed": True}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Content), [
+            {"content_id": i, "course_id": 1, "type": "video", "content_url": f"https://x/{i}"}
+            for i in range(1, rows + 1)
+        ])
+
+
+def orm_students(db):
+    return [
+        {
+            "student_id": s.student_id,
+            "user_id": s.user_id,
+            "email_id": s.user.email_id,
+            "age": s.age,
+            "skill_level": s.skill_level,
+            "category": s.category,
+            "country": s.country,
+        }
+        for s in db.query(Student).all()
+    ]
+
+
+def orm_course_enrollments(db):
+    return [
+        {
+            "student_id": e.student_id,
+            "course_id": e.course_id,
+            "evaluation_score": e.evaluation_score,
+            "student_name": e.student.user.email_id if e.student and e.student.user else None,
+            "student_email": e.student.user.email_id if e.student and e.student.user else None,
+        }
+        for e in db.query(Enrollment).filter(Enrollment.course_id == 1).all()
+    ]
+
+
+def orm_content(db):
+    return [
+        {"content_id": c.content_id, "course_id": c.course_id, "type": c.type, "content_url": c.content_url}
+        for c in db.query(Content).filter(Content.course_id == 1).all()
+    ]
+
+
+def row_content(db):
+    return db.execute(
+        select(Content.content_id, Content.course_id, Content.type, Content.content_url)
+        .where(Content.course_id == 1)
+    ).all()
+
+
+CASES = [
+    ("admin students", orm_students, get_all_students, StudentProfile),
+    ("course enrollments", orm_course_enrollments, lambda db: get_enrollments_by_course(db, 1), CourseEnrollment),
+    ("course content", orm_content, row_content, ContentResponse),
+]
+
+
+def timed(engine, fetch, serialize) -> tuple[float, float]:
+    with Session(engine) as db:
+        started = time.perf_counter()
+        result = fetch(db)
+        fetched = time.perf_counter() - started
+        serialize(result)
+        total = time.perf_counter() - started
+    return fetched, total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "read_paths.db")
+    engine = create_engine(f"sqlite:///{path}")
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        Base.metadata.create_all(engine)
+        seed(engine, args.rows)
+
+    print(f"{'path':<20} {'ORM fetch':>12} {'rows fetch':>12} {'ORM + json':>12} {'rows + json':>12}")
+    for name, before, after, model in CASES:
+        adapter = TypeAdapter(list[model])
+        old_fetch, old_total = timed(engine, before, jsonable_encoder)
+        new_fetch, new_total = timed(
+            engine, after,
+            lambda rows: adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json"),
+        )
+        rate = lambda seconds: f"{args.rows / seconds / 1000:,.0f}k/s"
+        print(f"{name:<20} {rate(old_fetch):>12} {rate(new_fetch):>12} {rate(old_total):>12} {rate(new_total):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Build and query cost of the course recommendation model.
+
+Generates a synthetic catalog in memory (no database needed), builds the
+model once, then times top-k queries and incremental enrollment updates:
+
+    python -m benchmarks.recommendations
+    python -m benchmarks.recommendations --courses 5000 --students 200000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.recommendation_service import RecommendationModel
+
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def synthetic(args, rng: random.Random):
+    courses = [(i, f"Course {i}", "Certificate", "8 weeks") for i in range(1, args.courses + 1)]
+    course_topics = [
+        (course_id, topic)
+        for course_id, *_ in courses
+        for topic in rng.sample(range(args.topics), rng.randint(1, 4))
+    ]
+    # Popularity is skewed: a few courses take most of the enrollments.
+    weights = [1 / (rank + 1) ** 0.8 for rank in range(args.courses)]
+    enrollments = []
+    student_courses = {}
+    for student_id in range(1, args.students + 1):
+        level = rng.choice(LEVELS)
+        picks = set(rng.choices(range(1, args.courses + 1), weights, k=rng.randint(1, args.per_student)))
+        student_courses[student_id] = (level, sorted(picks))
+        enrollments.extend((student_id, course_id, level) for course_id in picks)
+    return courses, course_topics, enrollments, student_courses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--per-student", type=int, default=12)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    courses, course_topics, enrollments, student_courses = synthetic(args, rng)
+    print(f"{len(courses)} courses, {len(student_courses)} students, {len(enrollments)} enrollments")
+
+    started = time.perf_counter()
+    model = RecommendationModel(courses, course_topics, enrollments)
+    print(f"build: {time.perf_counter() - started:.2f} s, "
+          f"{model.co_enrollment.nnz} co-enrollment pairs, {model.topic_similarity.nnz} topic pairs")
+
+    students = rng.sample(sorted(student_courses), min(args.queries, len(student_courses)))
+    latencies = []
+    for student_id in students:
+        level, enrolled = student_courses[student_id]
+        started = time.perf_counter()
+        model.recommend(enrolled, level, args.limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"top-{args.limit}: p50 {statistics.median(latencies):.2f} ms, "
+          f"p99 {percentile(latencies, 99):.2f} ms")
+
+    started = time.perf_counter()
+    for _ in range(args.queries):
+        model.apply({
+            "type": "enrollment.created",
+            "student_id": rng.choice(students),
+            "course_id": rng.randint(1, args.courses),
+        })
+    per_event = (time.perf_counter() - started) * 1e6 / args.queries
+    print(f"incremental update: {per_event:.1f} us per enrollment")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Per-call Python overhead of the hot lookups, before and after caching.
+
+Runs against in-memory SQLite so the database round trip is close to free
+and what remains is statement construction, cache-key generation and result
+processing in SQLAlchemy:
+
+    python -m benchmarks.statement_cache
+    python -m benchmarks.statement_cache --calls 50000
+"""
+import argparse
+import time
+
+from sqlalchemy import create_engine, exists, select
+from sqlalchemy.orm import Session
+
+from app.database import Base, engine_options
+from app.models import Course, Enrollment, Instructor, Student, University, User
+from app.services import lookups
+
+
+def seed(engine, rows: int) -> None:
+    with Session(engine) as db:
+        db.add(University(university_id=1, name="U", country="IN"))
+        for i in range(1, rows + 1):
+            db.add(User(user_id=i, email_id=f"s{i}@x.com", password="x", role="student"))
+            db.add(User(user_id=rows + i, email_id=f"i{i}@x.com", password="x", role="instructor"))
+            db.add(Student(student_id=i, user_id=i, age=20, skill_level="Beginner", category="UG", country="IN"))
+            db.add(Instructor(instructor_id=i, user_id=rows + i, name=f"I{i}", expertise="x"))
+            db.add(Course(course_id=i, course_name=f"C{i}", duration="8 weeks", program_type="Degree",
+                          instructor_id=i, university_id=1))
+        db.commit()
+
+
+CASES = [
+    (
+        "student by user_id",
+        lambda db, i: db.query(Student).filter(Student.user_id == i).first(),
+        lambda db, i: lookups.student_by_user_id(db, i),
+    ),
+    (
+        "course by id",
+        lambda db, i: db.query(Course).filter(Course.course_id == i).first(),
+        lambda db, i: lookups.course_by_id(db, i),
+    ),
+    (
+        "enrollment preconditions",
+        lambda db, i: db.execute(select(
+            exists().where(Student.student_id == i),
+            exists().where(Course.course_id == i),
+            exists().where(Enrollment.student_id == i, Enrollment.course_id == i),
+        )).one(),
+        lambda db, i: lookups.enrollment_preconditions(db, i, i),
+    ),
+]
+
+
+def per_call_us(engine, fn, calls: int, rows: int) -> float:
+    with Session(engine) as db:
+        for i in range(200):
+            fn(db, i % rows + 1)
+        started = time.perf_counter()
+        for i in range(calls):
+            fn(db, i % rows + 1)
+        return (time.perf_counter() - started) * 1e6 / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=100)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", **engine_options("sqlite://"))
+    Base.metadata.create_all(engine)
+    seed(engine, args.rows)
+
+    print(f"{'lookup':<26} {'Query':>10} {'cached':>10} {'saved':>10}")
+    for name, before, after in CASES:
+        old = per_call_us(engine, before, args.calls, args.rows)
+        new = per_call_us(engine, after, args.calls, args.rows)
+        print(f"{name:<26} {old:>8.1f}us {new:>8.1f}us {old - new:>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Requests per second a running server sustains under concurrent load.
+
+Start the server the way it will run in production, then point this at it:
+
+    python main.py --workers 4
+    python -m benchmarks.throughput --base-url http://localhost:8000
+    python -m benchmarks.throughput --path /api/courses/1 --concurrency 128
+
+Each client sends its next request as soon as the previous one returns, so
+the result is the server's capacity, not an offered rate.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.login_burst import percentile
+
+
+async def client_loop(client: httpx.AsyncClient, path: str, stop: float, latencies: list, statuses: dict):
+    while time.monotonic() < stop:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        except httpx.HTTPError:
+            statuses["error"] = statuses.get("error", 0) + 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        # Warm up connections and any per-worker caches first.
+        warmup = time.monotonic() + args.warmup
+        await asyncio.gather(*(client_loop(client, args.path, warmup, [], {}) for _ in range(args.concurrency)))
+
+        latencies: list[float] = []
+        statuses: dict = {}
+        started = time.monotonic()
+        stop = started + args.duration
+        await asyncio.gather(*(
+            client_loop(client, args.path, stop, latencies, statuses) for _ in range(args.concurrency)
+        ))
+        elapsed = time.monotonic() - started
+
+    print(f"GET {args.path}  concurrency {args.concurrency}, {args.duration:.0f}s")
+    print(f"  throughput {len(latencies) / elapsed:,.0f} req/s")
+    print(f"  latency    p50 {percentile(latencies, 50):.1f} ms, p99 {percentile(latencies, 99):.1f} ms")
+    print(f"  statuses   {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/courses/")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
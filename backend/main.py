@@ -1,4 +1,101 @@
+"""Start the API.
+
+    python main.py                 # WORKERS processes (default: one per CPU)
+    python main.py --workers 4 --port 9000
+    python main.py --reload        # one process, restarts on code changes
+
+With gunicorn installed (the `server` extra) it supervises uvicorn workers
+and the app is imported once, before forking. Without it, uvicorn's own
+process manager is used. Either way, tables, migrations and the admin seed
+are handled once here instead of in every worker. SIGHUP restarts the
+workers gracefully. Under gunicorn that keeps the preloaded code; to pick
+up new code, send USR2 and then QUIT the old master.
+"""
+import argparse
+import os
+from importlib.util import find_spec
+
+parser = argparse.ArgumentParser(description="Run the Quintet DBMS API.")
+parser.add_argument("--host")
+parser.add_argument("--port", type=int)
+parser.add_argument("--workers", type=int, help="worker processes (default: WORKERS, or one per CPU)")
+parser.add_argument("--reload", action="store_true", help="single process with auto-reload, for development")
+args = parser.parse_args()
+if args.workers:
+    # Read by Settings, which sizes each worker's connection pool from it.
+    os.environ["WORKERS"] = str(args.workers)
+
 import uvicorn
 
+from app.core.config import settings
+
+HOST = args.host or settings.HOST
+PORT = args.port or settings.PORT
+LOOP = "uvloop" if find_spec("uvloop") else "asyncio"
+HTTP = "httptools" if find_spec("httptools") else "h11"
+
+
+def prepare() -> None:
+    # The workers skip this in their startup event.
+    from app.database import engine, replicas
+    from app.main import prepare_database
+
+    if settings.PREPARE_DATABASE_ON_STARTUP:
+        prepare_database()
+    settings.PREPARE_DATABASE_ON_STARTUP = False
+    os.environ["PREPARE_DATABASE_ON_STARTUP"] = "false"
+    # Connections must not be shared with the forked workers.
+    engine.dispose()
+    for replica in replicas.replicas:
+        replica.dispose()
+
+
+def run_gunicorn() -> None:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+
+    class Worker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": LOOP, "http": HTTP}
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in {
+                "bind": f"{HOST}:{PORT}",
+                "workers": settings.worker_count,
+                "worker_class": Worker,
+                "preload_app": True,
+                "timeout": settings.WORKER_TIMEOUT,
+                "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+                "keepalive": settings.KEEPALIVE_SECONDS,
+                "max_requests": settings.MAX_REQUESTS,
+                "max_requests_jitter": settings.MAX_REQUESTS // 10,
+            }.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            prepare()
+            return app
+
+    Server().run()
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    if args.reload:
+        uvicorn.run("app.main:app", host=HOST, port=PORT, reload=True)
+    elif find_spec("gunicorn"):
+        run_gunicorn()
+    else:
+        prepare()
+        uvicorn.run(
+            "app.main:app",
+            host=HOST,
+            port=PORT,
+            workers=settings.worker_count,
+            loop=LOOP,
+            http=HTTP,
+            timeout_keep_alive=settings.KEEPALIVE_SECONDS,
+            timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+            limit_max_requests=settings.MAX_REQUESTS or None,
+        )
@@ -0,0 +1,21 @@
+import argparse
+
+from app.core.config import settings
+from app.database import engine
+from app.migrations import enrollment_partitions, partition_enrollments
+
+parser = argparse.ArgumentParser(description="Rebuild the enrollments table with hash partitions on course_id.")
+parser.add_argument(
+    "--partitions", type=int, default=settings.ENROLLMENT_PARTITIONS,
+    help="number of partitions, 0 for a plain table (default: ENROLLMENT_PARTITIONS)",
+)
+args = parser.parse_args()
+
+if engine.dialect.name != "postgresql":
+    parser.error("partitioning needs PostgreSQL")
+
+with engine.begin() as conn:
+    before = enrollment_partitions(conn)
+    partition_enrollments(conn, args.partitions)
+
+print(f" enrollments: {before} -> {args.partitions} partitions")
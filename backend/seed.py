@@ -12,8 +12,12 @@ from app.models.topic import Topic
 from app.models.textbook import Textbook
 from app.models.course_topic import CourseTopic
 from app.models.textbook_used import TextbookUsed
+from app.migrations import count_seats_taken, run_migrations
+from app.services.grading_service import refresh_passed_flags
+from app.services.trend_service import backfill_enrollment_events
 
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 db = SessionLocal()
 
@@ -252,6 +256,9 @@ try:
     for e in enrollments_data:
         db.add(Enrollment(**e))
     db.flush()
+    refresh_passed_flags(db)
+    count_seats_taken(db)
+    backfill_enrollment_events(db)
     print(f"Created {len(enrollments_data)} enrollments")
 
     db.commit()
@@ -0,0 +1,115 @@
+import argparse
+import json
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from app.core.config import settings
+
+parser = argparse.ArgumentParser(description="Show where the slowest traced requests spent their time.")
+parser.add_argument("--file", default=settings.TRACING_FILE, help="OTLP/JSON lines file (default: TRACING_FILE)")
+parser.add_argument("--slowest", type=int, default=5, help="number of traces to show")
+parser.add_argument("--trace", help="show only this trace id")
+parser.add_argument("--route", help="only traces whose root span name contains this")
+parser.add_argument(
+    "--listen", type=int, metavar="PORT",
+    help="instead, accept OTLP/HTTP JSON on PORT/v1/traces and append it to --file",
+)
+args = parser.parse_args()
+
+
+def duration(span: dict) -> float:
+    return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+
+def attribute(span: dict, key: str):
+    for attr in span.get("attributes", []):
+        if attr["key"] == key:
+            return next(iter(attr["value"].values()))
+    return None
+
+
+def load(path: Path) -> dict[str, list[dict]]:
+    traces = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    for span in scope["spans"]:
+                        traces[span["traceId"]].append(span)
+    return traces
+
+
+def show(spans: list[dict]) -> None:
+    ids = {s["spanId"] for s in spans}
+    children = defaultdict(list)
+    for span in spans:
+        # A parent outside this file (the caller's span) makes a local root.
+        children[span.get("parentSpanId") if span.get("parentSpanId") in ids else None].append(span)
+    self_time = defaultdict(float)
+    calls = defaultdict(int)
+
+    def walk(span: dict, depth: int) -> None:
+        kids = sorted(children[span["spanId"]], key=lambda s: int(s["startTimeUnixNano"]))
+        own = duration(span) - sum(duration(k) for k in kids)
+        name = "SQL " + span["name"] if span["kind"] == 3 else span["name"]
+        self_time[name] += own
+        calls[name] += 1
+        status = f"  [{attribute(span, 'exception.type')}]" if attribute(span, "exception.type") else ""
+        print(f"  {duration(span):9.2f} ms {own:9.2f} ms  {'  ' * depth}{span['name']}{status}")
+        for kid in kids:
+            walk(kid, depth + 1)
+
+    print("       total       self")
+    for root in children[None]:
+        walk(root, 0)
+    print("  self time by operation:")
+    for name, ms in sorted(self_time.items(), key=lambda item: -item[1])[:8]:
+        print(f"  {ms:9.2f} ms  {calls[name]:4d}x  {name}")
+
+
+class Collector(BaseHTTPRequestHandler):
+    # Stands in for an OpenTelemetry collector: accepts OTLP/HTTP JSON and
+    # appends each batch as one line, the same format the file exporter writes.
+    def do_POST(self):
+        if self.path != "/v1/traces":
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            batch = json.loads(body)
+        except json.JSONDecodeError:
+            self.send_error(400)
+            return
+        with open(args.file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(batch, separators=(",", ":")) + "\n")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *values):
+        pass
+
+
+if args.listen:
+    Path(args.file).parent.mkdir(parents=True, exist_ok=True)
+    print(f" collecting on http://localhost:{args.listen}/v1/traces into {args.file}")
+    ThreadingHTTPServer(("", args.listen), Collector).serve_forever()
+
+traces = load(Path(args.file))
+roots = []
+for trace_id, spans in traces.items():
+    if args.trace and trace_id != args.trace:
+        continue
+    root = max(spans, key=duration)
+    if args.route and args.route not in root["name"]:
+        continue
+    roots.append((duration(root), trace_id, root["name"]))
+
+print(f" {len(traces)} traces in {args.file}")
+for total, trace_id, name in sorted(roots, reverse=True)[:args.slowest]:
+    print(f"\n {name}  {total:.2f} ms  trace {trace_id}")
+    show(traces[trace_id])
@@ -21,7 +21,7 @@ export default function AdminLogin() {
     setLoading(true)
     try {
       const res = await loginAdmin(email, password)
-      login(res.access_token, res.role, res.user_id)
+      login(res.access_token, res.role, res.user_id, res.refresh_token)
       router.push("/admin/dashboard")
     } catch (err: unknown) {
       setError(err instanceof Error ? err.message : "Login failed")
@@ -21,7 +21,7 @@ export default function AnalystLogin() {
     setLoading(true)
     try {
       const res = await loginAnalyst(email, password)
-      login(res.access_token, res.role, res.user_id)
+      login(res.access_token, res.role, res.user_id, res.refresh_token)
       router.push("/analyst/dashboard")
     } catch (err: unknown) {
       setError(err instanceof Error ? err.message : "Login failed")
@@ -21,7 +21,7 @@ export default function InstructorLogin() {
     setLoading(true)
     try {
       const res = await loginInstructor(email, password)
-      login(res.access_token, res.role, res.user_id)
+      login(res.access_token, res.role, res.user_id, res.refresh_token)
       router.push("/instructor/dashboard")
     } catch (err: unknown) {
       setError(err instanceof Error ? err.message : "Login failed")
@@ -21,7 +21,7 @@ export default function StudentLogin() {
     setLoading(true)
     try {
       const res = await loginStudent(email, password)
-      login(res.access_token, res.role, res.user_id)
+      login(res.access_token, res.role, res.user_id, res.refresh_token)
       router.push("/student/dashboard")
     } catch (err: unknown) {
       setError(err instanceof Error ? err.message : "Login failed")
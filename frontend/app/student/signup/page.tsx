@@ -38,7 +38,7 @@ export default function StudentSignup() {
         category: form.category,
         country: form.country,
       })
-      login(res.access_token, res.role, res.user_id)
+      login(res.access_token, res.role, res.user_id, res.refresh_token)
       router.push("/student/dashboard")
     } catch (err: unknown) {
       setError(err instanceof Error ? err.message : "Signup failed")
@@ -1,8 +1,38 @@
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8000";
 
+let refreshing: Promise<boolean> | null = null;
+
+// Trades the stored refresh token for a new token pair. Concurrent callers
+// share one request, since the server rotates the token on every refresh.
+function refreshAccessToken(): Promise<boolean> {
+  if (!refreshing) {
+    refreshing = (async () => {
+      const refreshToken = localStorage.getItem("refresh_token");
+      if (!refreshToken) return false;
+      const res = await fetch(`${API_BASE}/api/auth/refresh`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      });
+      if (!res.ok) {
+        localStorage.removeItem("refresh_token");
+        return false;
+      }
+      const body: TokenResponse = await res.json();
+      localStorage.setItem("token", body.access_token);
+      if (body.refresh_token) localStorage.setItem("refresh_token", body.refresh_token);
+      return true;
+    })().finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+}
+
 export async function apiFetch<T = unknown>(
   endpoint: string,
   options: RequestInit = {},
+  retry = true,
 ): Promise<T> {
   const token =
     typeof window !== "undefined" ? localStorage.getItem("token") : null;
@@ -21,6 +51,10 @@ export async function apiFetch<T = unknown>(
     headers,
   });
 
+  if (res.status === 401 && token && retry && (await refreshAccessToken())) {
+    return apiFetch<T>(endpoint, options, false);
+  }
+
   if (!res.ok) {
     const body = await res.json().catch(() => ({}));
     throw new Error(body.detail || `API error ${res.status}`);
@@ -36,6 +70,14 @@ export interface TokenResponse {
   token_type: string;
   role: string;
   user_id: number;
+  refresh_token?: string;
+}
+
+export function logoutSession(refresh_token: string) {
+  return apiFetch("/api/auth/logout", {
+    method: "POST",
+    body: JSON.stringify({ refresh_token }),
+  });
 }
 
 export function loginStudent(email_id: string, password: string) {
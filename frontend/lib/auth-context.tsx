@@ -2,6 +2,7 @@
 
 import React, { createContext, useContext, useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
+import { logoutSession } from "@/lib/api";
 
 interface AuthUser {
   user_id: number;
@@ -12,7 +13,7 @@ interface AuthUser {
 interface AuthContextValue {
   user: AuthUser | null;
   token: string | null;
-  login: (token: string, role: string, user_id: number) => void;
+  login: (token: string, role: string, user_id: number, refreshToken?: string) => void;
   logout: () => void;
   isLoading: boolean;
 }
@@ -41,19 +42,23 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
     setIsLoading(false);
   }, []);
 
-  function login(accessToken: string, role: string, user_id: number) {
+  function login(accessToken: string, role: string, user_id: number, refreshToken?: string) {
     const u: AuthUser = { user_id, role };
     setToken(accessToken);
     setUser(u);
     localStorage.setItem("token", accessToken);
     localStorage.setItem("user", JSON.stringify(u));
+    if (refreshToken) localStorage.setItem("refresh_token", refreshToken);
   }
 
   function logout() {
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (refreshToken) logoutSession(refreshToken).catch(() => {});
     setToken(null);
     setUser(null);
     localStorage.removeItem("token");
     localStorage.removeItem("user");
+    localStorage.removeItem("refresh_token");
     router.push("/");
   }
 